@@ -1,16 +1,1035 @@
 from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.pipeline import Pipeline
+from sklearn.utils.validation import check_is_fitted
+from scipy import sparse
 import pandas as pd
 import numpy as np
-# --------------------------------------------------------------------- # 
-from datetime import datetime, timedelta
+# --------------------------------------------------------------------- #
+from collections import OrderedDict
+from contextlib import contextmanager
+from copy import deepcopy
+from functools import wraps
+import json
 import re
+import threading
+import time
+import tracemalloc
 from math import ceil
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow é opcional, sem ele a limpeza de strings é feita com regex compilada do Python.
+    pa = pc = None
 
 
 
+
+# Perfis de execução ativos (ver profile). Quando vazio, os métodos instrumentados apenas chamam o método original.
+_ACTIVE_PROFILERS = []
+
+
+# Envolve o fit/transform dos transformadores para registrar as métricas quando há um perfil ativo.
+def _instrumented(method):
+    @wraps(method)
+    def wrapper(self, X, *args, **kwargs):
+        if not _ACTIVE_PROFILERS:
+            return method(self, X, *args, **kwargs)
+        return _ACTIVE_PROFILERS[-1]._record(self, method, X, args, kwargs)
+    return wrapper
+
+
+# Execuções in-place ativas na thread atual (ver _inplace): o estado é por thread e por chamada, sem alterar o copy das
+# etapas, de modo que chamadas concorrentes do mesmo pipeline (ex.: workers do service.py) não interferem entre si.
+_INPLACE = threading.local()
+
+
+# Executa as etapas do ETL chamadas dentro do bloco (na thread atual) sem copiar o DataFrame recebido.
+@contextmanager
+def _inplace():
+    # Quem abre o bloco garante que o DataFrame pertence à execução (cópia do input ou DataFrame que pode ser alterado).
+    _INPLACE.depth = getattr(_INPLACE, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _INPLACE.depth -= 1
+
+
+# Classe base compartilhada por todos os transformadores do ETL.
+class BaseTransformer(BaseEstimator, TransformerMixin):
+
+    """
+    Classe base dos transformadores do ETL.
+
+    Parâmetros:
+    copy: bool (default=True)
+        Quando True o transform trabalha sobre uma cópia do DataFrame recebido.
+        Quando False o DataFrame recebido é alterado diretamente (modo in-place), evitando a cópia completa a cada etapa.
+
+    Atributos de classe:
+    _scope: str
+        Abrangência dos dados que a etapa precisa enxergar: 'row' (apenas a própria linha/coluna), 'customer'
+        (todas as linhas do mesmo Customer_ID) ou 'global' (estatísticas da coluna inteira, aprendidas no fit).
+    _extra_inputs / _extra_outputs: tuple of str
+        Colunas lidas ou criadas pela etapa além das informadas nos parâmetros.
+    _idempotent: bool
+        True quando aplicar a etapa duas vezes seguidas (com os mesmos parâmetros) tem o mesmo resultado de aplicá-la uma vez.
+    _changes_rows: bool
+        True quando a etapa remove ou reordena linhas (ex.: ModifyMonthCreditHistory).
+
+    Métodos:
+    fit: Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
+    partial_fit: Atualiza o fit com um novo bloco de dados. Nas etapas sem estatísticas globais equivale ao fit.
+    _merge: Combina o estado aprendido por outra instância (ajustada em outra partição dos dados) ao desta instância.
+    _get_input: Retorna o DataFrame que será transformado, copiando-o apenas quando copy=True e fora de uma execução in-place (_inplace).
+    _input_columns / _output_columns: Colunas lidas e escritas pela etapa.
+
+    O fit e o transform de cada subclasse são instrumentados automaticamente (ver profile).
+    """
+
+    copy = True
+    _scope = 'row'
+    _extra_inputs = ()
+    _extra_outputs = ()
+    _idempotent = False
+    _changes_rows = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in ('fit', 'transform'):
+            if name in vars(cls):
+                setattr(cls, name, _instrumented(vars(cls)[name]))
+
+    def fit(self, X, y=None):
+        return self
+
+    def partial_fit(self, X, y=None):
+        return self.fit(X, y)
+
+    def _get_input(self, X):
+        # Dentro de uma execução in-place da thread atual (ver _inplace) o DataFrame já pertence à execução.
+        return X.copy() if self.copy and not getattr(_INPLACE, 'depth', 0) else X
+
+    def _learned(self):
+        return {name: value for name, value in vars(self).items() if name.endswith('_') and not name.startswith('__')}
+
+    def _merge(self, other):
+        # Etapas sem estatísticas a combinar mantêm o primeiro estado aprendido.
+        if not self._learned():
+            vars(self).update(other._learned())
+        return self
+
+    def _reset(self):
+        # Removendo os atributos aprendidos (terminados em _) antes de um novo fit.
+        for attribute in self._learned():
+            delattr(self, attribute)
+
+    def _columns(self):
+        if hasattr(self, 'column_names'):
+            return list(self.column_names)
+        return [self.column_name]
+
+    def _input_columns(self):
+        return set(self._columns()) | set(self._extra_inputs)
+
+    def _output_columns(self):
+        return set(self._columns()) | set(self._extra_outputs)
+
+
+# Pipeline que realiza a cópia do input apenas uma vez.
+class ETLPipeline(Pipeline):
+
+    """
+    Pipeline do Scikit-Learn que copia o DataFrame de entrada uma única vez e executa todas as etapas em modo in-place.
+
+    Parâmetros:
+    steps: list of tuple
+        Lista de etapas (nome, transformador), igual ao Pipeline do Scikit-Learn.
+    copy: bool (default=True)
+        Quando True o input é copiado uma vez no início, preservando o DataFrame original.
+        Quando False nenhuma cópia é realizada e o DataFrame recebido pode ser alterado.
+
+    Métodos:
+    fit, transform, fit_transform: Mesmo comportamento do Pipeline, com as etapas executando sem cópia (ver _inplace).
+    """
+
+    def __init__(self, steps, *, copy=True, memory=None, verbose=False):
+        super().__init__(steps, memory=memory, verbose=verbose)
+        self.copy = copy
+
+    def _get_input(self, X):
+        return X.copy() if self.copy else X
+
+    def fit(self, X, y=None, **fit_params):
+        with _inplace():
+            return super().fit(self._get_input(X), y, **fit_params)
+
+    def fit_transform(self, X, y=None, **fit_params):
+        with _inplace():
+            return super().fit_transform(self._get_input(X), y, **fit_params)
+
+    def transform(self, X, **params):
+        with _inplace():
+            return super().transform(self._get_input(X), **params)
+
+
+# Medições de pico de memória em andamento. O tracemalloc tem um único pico por processo: antes de zerar o pico para uma
+# nova medição (ex.: etapa chamada dentro de outra etapa ou em outra thread), o pico atual é repassado às medições abertas.
+_OPEN_MEASUREMENTS = []
+_MEASUREMENTS_LOCK = threading.Lock()
+
+
+# Pico de memória alocada (em relação à memória no início) entre a criação e o stop.
+class _PeakMeasurement:
+
+    def __init__(self):
+        with _MEASUREMENTS_LOCK:
+            current, peak = tracemalloc.get_traced_memory()
+            for measurement in _OPEN_MEASUREMENTS:
+                measurement.peak = max(measurement.peak, peak)
+            tracemalloc.reset_peak()
+            self.start = self.peak = current
+            _OPEN_MEASUREMENTS.append(self)
+
+    def stop(self):
+        with _MEASUREMENTS_LOCK:
+            _OPEN_MEASUREMENTS.remove(self)
+            return max(self.peak, tracemalloc.get_traced_memory()[1]) - self.start
+
+
+# Métricas de execução de cada etapa do pipeline.
+class StepProfiler:
+
+    """
+    Registra, para cada chamada de fit/transform dos transformadores do ETL, o tempo de execução (wall e CPU), o pico de
+    memória alocada durante a chamada, a quantidade de linhas de entrada e saída e a quantidade de nulos das colunas da etapa
+    antes e depois do transform. Criado pelo context manager profile.
+
+    Parâmetros:
+    pipeline: Pipeline (default=None)
+        Pipeline cujos nomes de etapa são utilizados no relatório. Sem pipeline utiliza o nome da classe.
+    callbacks: list of callable
+        Funções chamadas com o registro (dict) de cada etapa assim que ela termina (ex.: envio para o sistema de métricas).
+    memory: bool (default=True)
+        Quando True mede o pico de memória com o tracemalloc (torna a execução mais lenta enquanto o perfil está ativo).
+
+    Métodos:
+    to_dict: Retorna os registros como lista de dict.
+    to_json: Retorna os registros em JSON (e escreve em path, quando informado).
+    to_frame: Retorna um DataFrame com uma linha por registro e o total de nulos antes e depois.
+    null_counts: Retorna um DataFrame com os nulos de cada coluna antes e depois de cada etapa.
+    """
+
+    def __init__(self, pipeline=None, callbacks=(), memory=True):
+        self.names = {id(step): name for name, step in pipeline.steps} if pipeline is not None else {}
+        self.callbacks = list(callbacks)
+        self.memory = memory
+        self.records = []
+        self._running = set()
+
+    @staticmethod
+    def _null_counts(X, columns):
+        if not isinstance(X, pd.DataFrame):
+            return None
+        columns = [column_name for column_name in X.columns if column_name in columns]
+        return {column_name: int(count) for column_name, count in X[columns].isna().sum().items()}
+
+    def _record(self, step, method, X, args, kwargs):
+        # Chamadas aninhadas da mesma etapa (ex.: fit_transform ou super().transform) são registradas apenas uma vez.
+        if id(step) in self._running:
+            return method(step, X, *args, **kwargs)
+
+        # Os nulos são contados apenas no transform e nas colunas da etapa, para manter o custo do perfil baixo.
+        is_transform = method.__name__ == 'transform'
+        columns = step._output_columns()
+        rows_in = len(X) if hasattr(X, '__len__') else None
+        nulls_before = self._null_counts(X, columns) if is_transform else None
+
+        self._running.add(id(step))
+        measurement = _PeakMeasurement() if self.memory else None
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            result = method(step, X, *args, **kwargs)
+        finally:
+            self._running.discard(id(step))
+            peak_memory = measurement.stop() if measurement is not None else None
+        wall_time, cpu_time = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+        record = {
+            'step': self.names.get(id(step), type(step).__name__),
+            'class': type(step).__name__,
+            'method': method.__name__,
+            'wall_time': wall_time,
+            'cpu_time': cpu_time,
+            'peak_memory': peak_memory,
+            'rows_in': rows_in,
+            'rows_out': len(result) if is_transform and hasattr(result, '__len__') else None,
+            'nulls_before': nulls_before,
+            'nulls_after': self._null_counts(result, columns) if is_transform else None,
+        }
+        self.records.append(record)
+        for callback in self.callbacks:
+            callback(record)
+        return result
+
+    def to_dict(self):
+        return [dict(record) for record in self.records]
+
+    def to_json(self, path=None, **json_kwargs):
+        report = json.dumps(self.to_dict(), **json_kwargs)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(report)
+        return report
+
+    def to_frame(self):
+        frame = pd.DataFrame(self.records, columns=['step', 'class', 'method', 'wall_time', 'cpu_time', 'peak_memory',
+                                                    'rows_in', 'rows_out', 'nulls_before', 'nulls_after'])
+        for column_name in ('nulls_before', 'nulls_after'):
+            frame[column_name] = frame[column_name].map(lambda counts: sum(counts.values()) if counts is not None else np.nan)
+        return frame
+
+    def null_counts(self):
+        rows = [(record['step'], record['method'], column_name, before, (record['nulls_after'] or {}).get(column_name))
+                for record in self.records if record['nulls_before'] is not None
+                for column_name, before in record['nulls_before'].items()]
+        return pd.DataFrame(rows, columns=['step', 'method', 'column', 'nulls_before', 'nulls_after'])
+
+
+# Ativa o registro de métricas dos transformadores do ETL.
+@contextmanager
+def profile(pipeline=None, callbacks=(), memory=True):
+
+    """
+    Context manager que registra as métricas de cada etapa executada dentro do bloco. Fora do bloco a instrumentação
+    custa apenas uma verificação por chamada. As métricas de etapas executadas em outros processos (ParallelETL) não são
+    registradas.
+
+    Exemplo:
+    with ETL.profile(str_pipe) as report:
+        str_pipe.fit_transform(df)
+    report.to_frame()
+
+    Parâmetros: os mesmos do StepProfiler.
+    """
+
+    profiler = StepProfiler(pipeline, callbacks, memory)
+    start_tracing = memory and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    _ACTIVE_PROFILERS.append(profiler)
+    try:
+        yield profiler
+    finally:
+        _ACTIVE_PROFILERS.remove(profiler)
+        if start_tracing:
+            tracemalloc.stop()
+
+
+# Motor de estatísticas por grupo (Customer_ID) sem callbacks Python por grupo.
+class GroupStatistics:
+
+    """
+    Fatora a coluna de agrupamento uma única vez e calcula moda, mediana e preenchimento (bfill/ffill) de cada grupo
+    de forma vetorizada, através de ordenações do NumPy. A mesma instância pode ser reutilizada para várias colunas.
+
+    Parâmetros:
+    keys: pandas.Series
+        Coluna de agrupamento (ex.: Customer_ID). Linhas com chave nula não pertencem a nenhum grupo.
+
+    Métodos:
+    mode: Retorna as n primeiras modas de cada grupo (mesma ordem da Series.mode) e a quantidade de modas empatadas.
+    median: Retorna a mediana de cada grupo, ignorando valores nulos.
+    fill: Preenche os nulos de cada grupo pela próxima ou anterior ocorrência de valor (bfill seguido de ffill).
+    cumcount: Retorna a posição de cada linha dentro do seu grupo.
+    broadcast: Distribui um valor por grupo para as linhas correspondentes.
+    """
+
+    def __init__(self, keys):
+        self.codes, self.uniques = pd.factorize(keys, sort=True)
+        self.n_groups = len(self.uniques)
+
+        # Ordenação estável das linhas pelo grupo, preservando a ordem original dentro de cada grupo.
+        self.order = np.argsort(self.codes, kind='stable')
+        self.sorted_codes = self.codes[self.order]
+
+    def cumcount(self):
+        # Posição de cada linha dentro do seu grupo, na ordem original (equivalente ao groupby().cumcount()).
+        n = len(self.codes)
+        position = np.empty(n, dtype=np.int64)
+        position[self.order] = np.arange(n) - np.searchsorted(self.sorted_codes, self.sorted_codes)
+        return position
+
+    def broadcast(self, values, fill_value=np.nan):
+        # Linhas sem grupo (chave nula) recebem fill_value.
+        return pd.api.extensions.take(np.asarray(values), self.codes, allow_fill=True, fill_value=fill_value)
+
+    def mode(self, values, n=1):
+        values = pd.Series(values)
+        value_codes, value_uniques = pd.factorize(values, sort=False)
+        value_uniques = np.asarray(value_uniques, dtype=object if value_uniques.dtype == object else None)
+        n_values = max(len(value_uniques), 1)
+
+        valid = (value_codes >= 0) & (self.codes >= 0)
+        rows = np.flatnonzero(valid)
+
+        # Contando as ocorrências de cada par (grupo, valor) com uma única ordenação.
+        pairs = self.codes[rows].astype(np.int64) * n_values + value_codes[rows]
+        pairs, first_row, counts = np.unique(pairs, return_index=True, return_counts=True)
+        pair_group, pair_value = pairs // n_values, pairs % n_values
+        first_row = rows[first_row]
+
+        # Identificando as modas empatadas de cada grupo.
+        max_count = np.zeros(self.n_groups, dtype=np.int64)
+        np.maximum.at(max_count, pair_group, counts)
+        is_mode = counts == max_count[pair_group]
+        n_modes = np.bincount(pair_group[is_mode], minlength=self.n_groups)
+
+        # Desempate igual ao da Series.mode: valores ordenados e, quando as modas não são comparáveis
+        # entre si (ex.: int e str), a ordem de primeira ocorrência.
+        value_class, value_rank = self._value_ranks(value_uniques)
+        pair_class = value_class[pair_value]
+        mixed = np.zeros(self.n_groups, dtype=bool)
+        if value_class.max(initial=0) > 0:
+            class_min = np.full(self.n_groups, np.iinfo(np.int64).max)
+            class_max = np.full(self.n_groups, -1)
+            np.minimum.at(class_min, pair_group[is_mode], pair_class[is_mode])
+            np.maximum.at(class_max, pair_group[is_mode], pair_class[is_mode])
+            mixed = class_max > class_min
+        tie_break = np.where(mixed[pair_group], first_row, value_rank[pair_value])
+
+        order = np.lexsort((tie_break, ~is_mode, pair_group))
+        pair_group, pair_value = pair_group[order], pair_value[order]
+        group_start = np.searchsorted(pair_group, np.arange(self.n_groups))
+
+        modes = {}
+        for k in range(n):
+            has_mode = n_modes > k
+            position = np.minimum(group_start + k, max(len(pair_value) - 1, 0))
+            codes = np.where(has_mode, pair_value[position] if len(pair_value) else -1, -1)
+            modes[k] = pd.api.extensions.take(value_uniques, codes, allow_fill=True)
+
+        return pd.DataFrame(modes, index=self.uniques), n_modes
+
+    @staticmethod
+    def _value_ranks(uniques):
+        # Ranking dos valores distintos. Valores de tipos não comparáveis recebem classes diferentes.
+        if uniques.dtype != object:
+            return np.zeros(len(uniques), dtype=np.int64), np.argsort(np.argsort(uniques, kind='stable'))
+
+        kinds = [('number' if isinstance(value, (int, float, np.number)) else type(value).__name__) for value in uniques]
+        value_class = pd.factorize(pd.Series(kinds, dtype=object))[0].astype(np.int64)
+        value_rank = np.zeros(len(uniques), dtype=np.int64)
+        for class_id in np.unique(value_class):
+            members = np.flatnonzero(value_class == class_id)
+            try:
+                ranks = np.argsort(np.argsort(uniques[members], kind='stable'))
+            except TypeError:
+                ranks = np.arange(len(members))
+            value_rank[members] = ranks
+        return value_class, value_rank
+
+    def median(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values) & (self.codes >= 0)
+        group, data = self.codes[valid], values[valid]
+
+        # Ordenando os valores dentro de cada grupo e pegando os elementos centrais.
+        order = np.lexsort((data, group))
+        data = data[order]
+        counts = np.bincount(group, minlength=self.n_groups)
+        starts = np.cumsum(counts) - counts
+        has_values = counts > 0
+        low = np.where(has_values, starts + (counts - 1) // 2, 0)
+        high = np.where(has_values, starts + counts // 2, 0)
+
+        median = np.full(self.n_groups, np.nan)
+        if len(data):
+            median[has_values] = (data[low[has_values]] + data[high[has_values]]) / 2
+        return pd.Series(median, index=self.uniques)
+
+    def fill(self, values):
+        values = pd.Series(values)
+        n = len(values)
+        if n == 0:
+            return values
+
+        positions = np.arange(n)
+        sorted_codes = self.sorted_codes
+        valid = ~values.isna().to_numpy()[self.order]
+
+        # Próxima (bfill) e anterior (ffill) posição válida, respeitando o limite de cada grupo.
+        next_valid = np.minimum.accumulate(np.where(valid, positions, n)[::-1])[::-1]
+        previous_valid = np.maximum.accumulate(np.where(valid, positions, -1))
+        use_next = ~valid & (next_valid < n) & (sorted_codes[np.minimum(next_valid, n - 1)] == sorted_codes)
+        use_previous = ~valid & ~use_next & (previous_valid >= 0) & (sorted_codes[np.maximum(previous_valid, 0)] == sorted_codes)
+
+        source = positions.copy()
+        source[use_next] = next_valid[use_next]
+        source[use_previous] = previous_valid[use_previous]
+        source[sorted_codes < 0] = positions[sorted_codes < 0]
+
+        # Voltando para a ordem original das linhas.
+        take_positions = np.empty(n, dtype=np.intp)
+        take_positions[self.order] = self.order[source]
+
+        filled = values.take(take_positions)
+        filled.index = values.index
+        return filled
+
+
+# Agrupamentos por Customer_ID compartilhados entre etapas consecutivas (ver _shared_customer_groups), por thread: cada
+# thread (ex.: workers do service.py) enxerga apenas os seus próprios blocos. Quando vazio, cada etapa fatora o
+# Customer_ID novamente.
+_SHARED_GROUPS = threading.local()
+
+
+# Pilha de blocos de agrupamento compartilhado da thread atual.
+def _shared_groups_stack():
+    if not hasattr(_SHARED_GROUPS, 'stack'):
+        _SHARED_GROUPS.stack = []
+    return _SHARED_GROUPS.stack
+
+
+# Compartilha o agrupamento por Customer_ID entre as etapas executadas dentro do bloco.
+@contextmanager
+def _shared_customer_groups():
+    # Quem abre o bloco garante que as linhas não mudam entre as etapas (ou chama clear() após a mudança).
+    shared = {}
+    stack = _shared_groups_stack()
+    stack.append(shared)
+    try:
+        yield shared
+    finally:
+        stack.pop()
+
+
+# Valores da coluna Customer_ID (o próprio array, sem cópia) usados como chave do agrupamento compartilhado.
+def _customer_keys(X):
+    keys = X['Customer_ID'].array
+    # Colunas do NumPy (ex.: object) vêm em um NumpyExtensionArray novo a cada acesso: o array interno é o mesmo.
+    return np.asarray(keys) if isinstance(keys, pd.arrays.NumpyExtensionArray) or isinstance(keys.dtype, np.dtype) else keys
+
+
+# Hash de cada valor do Customer_ID, usado na comparação das chaves do agrupamento (tipos de nulo diferentes, ex.: None
+# e NaN, têm hashes diferentes e apenas levam a um novo agrupamento).
+def _hash_keys(keys):
+    return pd.util.hash_array(np.asarray(keys, dtype=object), categorize=False)
+
+
+# Verifica se o agrupamento guardado em shared vale para keys. Os arrays já verificados (shared['known']) são
+# reconhecidos pela identidade ou pela mesma memória; um array novo (ex.: coluna copiada na reorganização dos blocos do
+# DataFrame, ou outro DataFrame com o mesmo tamanho) é comparado uma única vez pelo hash dos valores, com o hash das
+# chaves do agrupamento calculado uma única vez.
+def _same_keys(shared, keys):
+    for known in shared['known']:
+        if known is keys:
+            return True
+        if isinstance(known, np.ndarray) and isinstance(keys, np.ndarray):
+            if (known.__array_interface__['data'], known.shape, known.strides, known.dtype) == (keys.__array_interface__['data'], keys.shape, keys.strides, keys.dtype):
+                return True
+
+    if len(shared['known'][0]) != len(keys):
+        return False
+    if 'hash' not in shared:
+        shared['hash'] = _hash_keys(shared['known'][0])
+    if not np.array_equal(shared['hash'], _hash_keys(keys)):
+        return False
+    shared['known'].append(keys)
+    return True
+
+
+# Agrupamento do DataFrame pelo Customer_ID, reaproveitado quando há um bloco de agrupamento compartilhado ativo e o
+# Customer_ID é o mesmo do agrupamento guardado.
+def _customer_groups(X):
+    stack = _shared_groups_stack()
+    if not stack:
+        return GroupStatistics(X['Customer_ID'])
+    shared = stack[-1]
+    keys = _customer_keys(X)
+    if 'known' not in shared or not _same_keys(shared, keys):
+        # A referência às chaves é mantida junto do agrupamento, de modo que a memória não é reaproveitada por outro array.
+        shared.clear()
+        shared['groups'], shared['known'] = GroupStatistics(X['Customer_ID']), [keys]
+    return shared['groups']
+
+
+# Busca dos valores aprendidos no fit para cada linha.
+def _lookup(keys, table, fallback=np.nan):
+    # Chaves não vistas no fit (ou nulas) recebem o valor de fallback.
+    indexer = table.index.get_indexer(keys)
+    return pd.api.extensions.take(table.to_numpy(), indexer, allow_fill=True, fill_value=fallback)
+
+
+# Primeira moda de uma Series, com o mesmo desempate da Series.mode.
+def _first_mode(values):
+    values = pd.Series(values)
+    return GroupStatistics(pd.Series(np.zeros(len(values)))).mode(values)[0][0].iloc[0] if len(values) else np.nan
+
+
+# Soma (sign=1) ou subtração (sign=-1) de contagens de valores (value_counts) de blocos diferentes.
+def _merge_counts(counts, new_counts, sign=1):
+    if counts is None:
+        return new_counts * sign
+    merged = counts.add(new_counts * sign, fill_value=0).astype(np.int64)
+    return merged[merged != 0]
+
+
+# Moda a partir das contagens de valores, com o mesmo desempate da Series.mode (menor valor).
+def _mode_from_counts(counts):
+    if counts is None or len(counts) == 0:
+        return np.nan
+    top = counts.index[counts.to_numpy() == counts.max()]
+    try:
+        return top.sort_values()[0]
+    except TypeError:
+        return top[0]
+
+
+# Contagem de valores (igual ao Series.value_counts) através dos códigos do factorize, sem a tabela de hash por valor.
+def _value_counts(values):
+    if not (isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biuf'):
+        return values.value_counts()
+    codes, uniques = pd.factorize(values, sort=False)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    order = np.argsort(-counts, kind='stable')
+    return pd.Series(counts[order], index=pd.Index(uniques[order], name=values.name), name='count')
+
+
+# Quantis (interpolação linear, igual ao Series.quantile) a partir das contagens de valores.
+# Aceita um quantil ou uma lista de quantis, calculados com uma única ordenação das contagens.
+def _quantile_from_counts(counts, q):
+    counts = counts.sort_index()
+    values = counts.index.to_numpy(dtype=np.float64)
+    cumulative = np.cumsum(counts.to_numpy())
+    if len(values) == 0:
+        return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+    index = (cumulative[-1] - 1) * np.asarray(q, dtype=np.float64)
+    below = np.floor(index)
+    above = np.minimum(below + 1, cumulative[-1] - 1)
+    a = values[np.searchsorted(cumulative, below, side='right')]
+    b = values[np.searchsorted(cumulative, above, side='right')]
+
+    # Mesma fórmula de interpolação utilizada pelo NumPy.
+    t = index - below
+    quantiles = np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+    return quantiles if np.ndim(q) else quantiles.item()
+
+
+# Sketch KLL para quantis aproximados de uma coluna numérica, combinável entre blocos e partições.
+class KLLSketch:
+
+    """
+    Resumo de tamanho limitado (da ordem de 3 * k valores) de uma coluna numérica, com os quantis aproximados pelo
+    algoritmo KLL (Karnin, Lang e Liberty). Os valores ficam em níveis com peso 2 ** nível; quando um nível passa da
+    sua capacidade ele é ordenado e metade dos valores (alternados, a partir de uma posição sorteada) sobe para o nível
+    seguinte com o dobro do peso. A soma dos pesos é sempre igual à quantidade de valores.
+
+    Erro: o rank de cada quantil difere do exato em até aproximadamente 2.7 / k da quantidade de valores (cerca de 1.35%
+    para k=200), com alta probabilidade, independentemente da quantidade de valores e da ordem dos blocos. O mínimo e o
+    máximo são exatos. O valor retornado é um dos valores da coluna (sem a interpolação do Series.quantile).
+
+    Parâmetros:
+    k: int (default=200)
+        Capacidade do maior nível. O erro cai proporcionalmente a 1 / k e a memória cresce proporcionalmente a k.
+    seed: int (default=0)
+        Semente do sorteio das compactações, para resultados reproduzíveis.
+
+    Métodos:
+    update: Adiciona os valores de um bloco (valores nulos são ignorados).
+    update_counts: Adiciona valores a partir das contagens (Series valor -> quantidade, igual ao value_counts).
+    merge: Combina outro sketch (de outro bloco ou partição) a este.
+    quantile: Retorna o quantil aproximado (ou a lista de quantis).
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.min = self.max = np.nan
+        self.levels = [np.empty(0)]
+        self._random = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        return max(int(ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - level))), 2)
+
+    def _add(self, level, values):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+        self.levels[level] = np.concatenate([self.levels[level], values])
+
+    def _compress(self):
+        # Compactando sempre o nível mais baixo acima da capacidade (a capacidade dos níveis cai quando um nível é criado).
+        while True:
+            full = [level for level in range(len(self.levels)) if len(self.levels[level]) > self._capacity(level)]
+            if not full:
+                return self
+            level = full[0]
+            values = np.sort(self.levels[level])
+            odd = len(values) % 2
+            self.levels[level] = values[:odd]  # Com quantidade ímpar um valor permanece no nível.
+            self._add(level + 1, values[odd + self._random.integers(2)::2])
+
+    def _update_range(self, minimum, maximum):
+        self.min = np.fmin(self.min, minimum)
+        self.max = np.fmax(self.max, maximum)
+
+    def update(self, values):
+        values = pd.Series(values).dropna().to_numpy(dtype=np.float64)
+        if len(values):
+            self.n += len(values)
+            self._update_range(values.min(), values.max())
+            self._add(0, values)
+        return self._compress()
+
+    def update_counts(self, counts):
+        counts = counts[counts > 0]
+        values = counts.index.to_numpy(dtype=np.float64)
+        counts = counts.to_numpy(dtype=np.int64)
+        if len(values):
+            self.n += int(counts.sum())
+            self._update_range(values.min(), values.max())
+            # Um valor com contagem c entra em cada nível correspondente a um bit de c (mesmo peso total).
+            for level in range(int(counts.max()).bit_length()):
+                self._add(level, values[(counts >> level) & 1 == 1])
+        return self._compress()
+
+    def merge(self, other):
+        self.n += other.n
+        self._update_range(other.min, other.max)
+        for level, values in enumerate(other.levels):
+            self._add(level, values)
+        return self._compress()
+
+    def quantile(self, q):
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.int64) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, cumulative = values[order], np.cumsum(weights[order])
+
+        # Valor na posição q * (n - 1) da coluna ordenada, com o mínimo e o máximo exatos nas pontas.
+        rank = np.asarray(q, dtype=np.float64) * (self.n - 1)
+        quantiles = values[np.minimum(np.searchsorted(cumulative, rank, side='right'), len(values) - 1)]
+        quantiles = np.clip(quantiles, self.min, self.max)
+        quantiles = np.where(rank <= 0, self.min, np.where(rank >= self.n - 1, self.max, quantiles))
+        return quantiles if np.ndim(q) else quantiles.item()
+
+
+# Sketch de Misra-Gries (heavy hitters) para a moda aproximada de uma coluna, combinável entre blocos e partições.
+class HeavyHitters:
+
+    """
+    Mantém no máximo k contadores de valores. Quando um bloco (ou outro sketch) é somado e passam a existir mais de k
+    valores, a (k+1)-ésima maior contagem é subtraída de todos os contadores e os que ficam sem contagem são removidos.
+
+    Erro: a contagem de cada valor é subestimada em no máximo error (acumulado das subtrações, sempre menor ou igual a
+    n / (k + 1)). A moda é exata quando a sua frequência supera a do segundo valor mais frequente em mais de error;
+    colunas sem um valor dominante (ex.: valores contínuos quase todos distintos) podem ter uma moda diferente da exata.
+
+    Parâmetros:
+    k: int (default=200)
+        Quantidade máxima de contadores.
+
+    Métodos:
+    update: Adiciona os valores de um bloco (valores nulos são ignorados).
+    update_counts: Adiciona valores a partir das contagens (Series valor -> quantidade, igual ao value_counts).
+    merge: Combina outro sketch (de outro bloco ou partição) a este.
+    mode: Retorna a moda aproximada (menor valor entre os contadores empatados, igual à Series.mode).
+    """
+
+    def __init__(self, k=200):
+        self.k = k
+        self.n = 0
+        self.error = 0
+        self.counts = None
+
+    def update(self, values):
+        return self.update_counts(_value_counts(pd.Series(values)))
+
+    def update_counts(self, counts):
+        self.n += int(counts.sum())
+        return self._add(counts)
+
+    def merge(self, other):
+        self.n += other.n
+        self.error += other.error
+        return self._add(other.counts) if other.counts is not None else self
+
+    def _add(self, counts):
+        counts = _merge_counts(self.counts, counts)
+        if len(counts) > self.k:
+            threshold = np.partition(counts.to_numpy(), len(counts) - self.k - 1)[len(counts) - self.k - 1]
+            counts = counts - threshold
+            counts = counts[counts > 0]
+            self.error += int(threshold)
+        self.counts = counts
+        return self
+
+    def mode(self):
+        return _mode_from_counts(self.counts)
+
+
+# Combina os sketches de cada coluna (de um novo bloco ou de outra instância) aos sketches atuais, sem alterar os novos.
+def _merge_sketches(sketches, new_sketches):
+    if sketches is None:
+        return deepcopy(new_sketches)
+    for column_name, sketch in new_sketches.items():
+        sketches[column_name].merge(sketch)
+    return sketches
+
+
+# Substitui os valores acima do limite pelo limite arredondado para cima, com o mesmo resultado (e dtype) do
+# apply(lambda x: ceil(upper_bound) if x > upper_bound else x) em colunas numéricas.
+def _cap_upper(series, upper_bound):
+    if not (isinstance(series.dtype, np.dtype) and series.dtype.kind in 'iuf') or len(series) == 0:
+        return series.apply(lambda x: ceil(upper_bound) if x > upper_bound else x)
+
+    # O apply devolve objetos do Python, inferidos pelo pandas como int64 ou float64.
+    values = series.to_numpy().astype(np.int64 if series.dtype.kind in 'iu' else np.float64, copy=False)
+    if not np.isnan(upper_bound):
+        values = np.where(values > upper_bound, ceil(upper_bound), values).astype(values.dtype, copy=False)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+# Atribui values às linhas da máscara sem a conversão implícita de dtype do pandas (descontinuada, FutureWarning).
+# Em colunas inteiras os valores são convertidos para o dtype da coluna quando cabem nele sem alteração (ex.: tamanhos
+# dos grupos em uma coluna int16 do READ_DTYPES); caso contrário a coluna é convertida antes para um dtype que comporte
+# os valores (ex.: moda float em uma coluna int64), o mesmo resultado da conversão implícita.
+def _assign(X, mask, column_name, values):
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return
+    column = X[column_name]
+    values = np.asarray(values)
+    if isinstance(column.dtype, np.dtype) and column.dtype.kind in 'iu' and values.dtype.kind in 'iuf':
+        with np.errstate(invalid='ignore', over='ignore'):
+            converted = values.astype(column.dtype)
+        if (converted == values).all():
+            values = converted
+        else:
+            X[column_name] = column.astype(np.result_type(column.dtype, values.dtype))
+    X.loc[mask, column_name] = values
+
+
+# Padrões (Python, RE2/pyarrow) que marcam um valor como NaN no TransformToNull: caracteres especiais ou NM (Not Mentioned).
+_SPECIAL_CHARS = (re.compile(r'[()\$#@!%&*]|NM'), r'[()\$#@!%&*]|NM')
+_SPECIAL_CHARS_ONLY = (re.compile(r'\A[^a-zA-Z0-9]*[()\-_$#@!%&*][^a-zA-Z0-9]*\Z|NM'), r'^[^a-zA-Z0-9]*[()\-_$#@!%&*][^a-zA-Z0-9]*$|NM')
+_NOT_DIGITS = (re.compile(r'[^0-9]'), r'[^0-9]')
+
+
+# Verifica se a coluna é de strings armazenadas em pyarrow (string[pyarrow] ou ArrowDtype de string).
+def _is_arrow_string(series):
+    dtype = series.dtype
+    if isinstance(dtype, pd.StringDtype):
+        return dtype.storage == 'pyarrow'
+    return isinstance(dtype, pd.ArrowDtype) and (pa.types.is_string(dtype.pyarrow_dtype) or pa.types.is_large_string(dtype.pyarrow_dtype))
+
+
+# Verifica se a coluna pode conter strings a serem limpas (object ou dtype de string do pandas).
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series) or isinstance(series.dtype, pd.StringDtype) or _is_arrow_string(series)
+
+
+# Converte a coluna para um array pyarrow de strings (None quando o pyarrow não está disponível ou há valores que não são str).
+# Colunas string[pyarrow] são utilizadas diretamente, sem conversão.
+def _arrow_strings(series):
+    if pa is None:
+        return None
+    if _is_arrow_string(series):
+        return pa.array(series)
+    try:
+        return pa.array(series.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+
+# Classifica cada valor uma única vez (mantém / NaN / NA) e escreve o valor limpo.
+def _clean_null_strings(series, patterns):
+    strings = _arrow_strings(series)
+
+    if strings is not None:
+        is_na = pc.or_kleene(strings.is_null(), pc.equal(pc.utf8_trim_whitespace(strings), ''))
+        is_nan = pc.match_substring_regex(strings, patterns[1]).fill_null(False)
+        if _is_arrow_string(series):
+            # Colunas string[pyarrow] continuam em pyarrow: NaN e NA viram o nulo do próprio dtype.
+            return pd.array(pc.if_else(pc.or_(is_nan, is_na), None, strings), dtype=series.dtype)
+
+        cleaned = series.to_numpy(dtype=object).copy()
+        cleaned[np.asarray(is_nan)] = np.nan
+        cleaned[np.asarray(is_na)] = pd.NA
+        return cleaned
+
+    values = series.to_numpy(dtype=object)
+    cleaned = values.copy()
+    search = patterns[0].search
+    for i, value in enumerate(values):
+        if isinstance(value, str):
+            if search(value):
+                cleaned[i] = np.nan
+            elif not value.strip():
+                cleaned[i] = pd.NA
+        elif pd.isna(value):
+            cleaned[i] = pd.NA
+    return cleaned
+
+
+# Retira os caracteres não numéricos de cada valor em uma única passada e converte para numérico.
+# Retorna None quando nenhum valor da coluna contém números (valores que não são str viram NaN).
+def _clean_not_numbers(series):
+    strings = _arrow_strings(series)
+
+    if strings is not None:
+        digits = pc.replace_substring_regex(strings, _NOT_DIGITS[1], '')
+        if not pc.any(pc.greater(pc.utf8_length(digits), 0)).as_py():
+            return None
+        try:
+            return pc.cast(pc.if_else(pc.equal(digits, ''), None, digits), pa.int64()).to_numpy(zero_copy_only=False)
+        except pa.ArrowInvalid:  # valores fora do intervalo do int64 seguem a conversão do pandas.
+            return pd.to_numeric(digits.to_numpy(zero_copy_only=False), errors='coerce')
+
+    values = series.to_numpy(dtype=object)
+    sub = _NOT_DIGITS[0].sub
+    digits = np.array([sub('', value) if isinstance(value, str) else np.nan for value in values], dtype=object)
+    if not any(isinstance(value, str) and value != '' for value in digits):
+        return None
+    return pd.to_numeric(digits, errors='coerce')
+
+
+# Resultados das regras por valor distinto, mantidos entre lotes quando o cache está ativo (ver set_value_cache).
+# Cada regra (com os seus parâmetros) possui o seu próprio LRU.
+# O acesso é protegido por locks: o cache é compartilhado entre as threads (ex.: workers do service.py).
+_VALUE_CACHES = {}
+_VALUE_CACHE_SIZE = 0
+_VALUE_CACHES_LOCK = threading.Lock()
+
+
+# Ativa ou desativa o cache dos resultados por valor distinto.
+def set_value_cache(maxsize=10_000):
+
+    """
+    Ativa (maxsize > 0) ou desativa (maxsize=0) o cache dos resultados por valor distinto das regras de texto
+    (TransformToNull, CleaningNotNumbers, CreateDateCreditHistoryColumn, CreateMonthNumberColumn e
+    TransformToBinaryValues). Com o cache ativo, cada regra guarda os resultados dos últimos maxsize valores (str)
+    distintos, reaproveitados nos lotes seguintes (ex.: micro-lotes do service.py ou blocos do StreamingETL): apenas os
+    valores ainda não vistos são avaliados. Os caches existentes são descartados.
+
+    Parâmetros:
+    maxsize: int (default=10000)
+        Quantidade máxima de valores guardados por regra.
+    """
+
+    global _VALUE_CACHE_SIZE
+    with _VALUE_CACHES_LOCK:
+        _VALUE_CACHE_SIZE = maxsize
+        _VALUE_CACHES.clear()
+
+
+# Quantidade de acertos, de valores avaliados e de valores guardados no cache de cada regra.
+def value_cache_info():
+    with _VALUE_CACHES_LOCK:
+        caches = list(_VALUE_CACHES.items())
+    info = {}
+    for rule, cache in caches:
+        with cache.lock:
+            info[rule] = {'hits': cache.hits, 'misses': cache.misses, 'size': len(cache.entries)}
+    return info
+
+
+# Marca de valor ausente no cache (o resultado guardado pode ser None ou NaN).
+_MISSING = object()
+
+
+# Cache LRU (valor distinto -> resultado) de uma regra.
+class _ValueCache:
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+
+    def map(self, uniques, function):
+        # Resultado de cada valor distinto: os valores guardados vêm do cache e os demais são avaliados juntos.
+        # A regra é avaliada fora do lock; apenas a consulta e a gravação das entradas são exclusivas.
+        results = np.empty(len(uniques), dtype=object)
+        missing = []
+        with self.lock:
+            for i, value in enumerate(uniques):
+                result = self.entries.get(value, _MISSING) if isinstance(value, str) else _MISSING
+                if result is _MISSING:
+                    missing.append(i)
+                else:
+                    self.entries.move_to_end(value)
+                    results[i] = result
+            self.hits += len(uniques) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            mapped = function(pd.Series(uniques[missing], dtype=object))
+            if mapped is None:
+                # A regra não se aplica aos valores novos (ex.: nenhum contém números): avaliando todos os valores juntos.
+                return function(pd.Series(uniques, dtype=object))
+            results[missing] = list(mapped)
+            with self.lock:
+                for i, result in zip(missing, results[missing]):
+                    if isinstance(uniques[i], str):
+                        self.entries[uniques[i]] = result
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        return results
+
+
+# Converte os resultados por valor distinto para o dtype da regra: 'object', 'numeric' (int64, ou float64 quando há
+# nulos, igual ao pd.to_numeric) ou 'datetime' (datetime64[ns]).
+def _as_kind(values, kind):
+    if kind == 'numeric':
+        return pd.to_numeric(np.asarray(values, dtype=object)) if np.asarray(values).dtype == object else np.asarray(values)
+    if kind == 'datetime':
+        return np.asarray(values, dtype='datetime64[ns]')
+    return np.asarray(values, dtype=object)
+
+
+# Aplica uma regra determinística uma única vez por valor distinto da coluna e distribui o resultado pelas linhas com
+# take (códigos do factorize ou, em colunas categóricas, das categorias): o custo depende da quantidade de valores
+# distintos e não da quantidade de linhas. A função recebe uma Series object com os valores distintos (incluindo um
+# nulo, quando houver, exceto em colunas categóricas, em que as linhas nulas recebem o nulo do resultado).
+# Retorna None quando a função retorna None (ex.: nenhum valor contém números).
+def _map_unique(series, function, kind='object', rule=None):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+        uniques = np.asarray(uniques, dtype=object)
+    else:
+        codes, uniques = pd.factorize(series)
+        uniques = np.asarray(uniques, dtype=object)
+        nulls = codes < 0
+        if nulls.any():
+            # As linhas nulas recebem o resultado da regra para o nulo, avaliado como mais um valor distinto.
+            codes[nulls] = len(uniques)
+            uniques = np.append(uniques, np.nan)
+
+    cache = None
+    if _VALUE_CACHE_SIZE > 0 and rule is not None:
+        with _VALUE_CACHES_LOCK:
+            if _VALUE_CACHE_SIZE > 0:
+                if rule not in _VALUE_CACHES:
+                    _VALUE_CACHES[rule] = _ValueCache(_VALUE_CACHE_SIZE)
+                cache = _VALUE_CACHES[rule]
+    if cache is not None:
+        mapped = cache.map(uniques, function)
+    else:
+        mapped = function(pd.Series(uniques, dtype=object))
+    if mapped is None:
+        return None
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return pd.api.extensions.take(_as_kind(mapped, kind), codes, allow_fill=True)  # Linhas nulas (código -1).
+    return _as_kind(mapped, kind).take(codes)
+
+
 # Transformar dados inconsistentes para NaN
-class TransformToNull(BaseEstimator, TransformerMixin):
+class TransformToNull(BaseTransformer):
     """
     Transforma valores irregulares em nulos.
     
@@ -23,39 +1042,41 @@ class TransformToNull(BaseEstimator, TransformerMixin):
     transform: Aplica a transformação para valores nulos nas colunas especificadas.
     """
 
-    def __init__(self, column_names):
+    def __init__(self, column_names, copy=True):
         self.column_names = column_names
+        self.copy = copy
     
     def fit(self, X, y=None):
         return self
 
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
 
         for column_name in self.column_names:
-            if pd.api.types.is_object_dtype(X_transformed[column_name]):
-                # Preenchendo valores nulos com vazios para prevenir erros.
-                X_transformed[column_name] = X_transformed[column_name].fillna('')
-               
+            column = X_transformed[column_name]
+            if _is_text(column) or isinstance(column.dtype, pd.CategoricalDtype):
                 # # Verificando se contém caracteres especiais para SSN.
                 if column_name == 'SSN' or column_name == 'Payment_Behaviour':
-                    special_chars_mask = X_transformed[column_name].str.contains(r'[()\$#@!%&*]', na=False)
+                    patterns = _SPECIAL_CHARS
                 else:
                     # Verificando se contém apenas caracteres especiais ou caracteres especiais com números.
-                    special_chars_mask = X_transformed[column_name].str.contains(r'[()\-_$#@!%&*]', na=False) & ~X_transformed[column_name].str.contains(r'[a-zA-Z0-9]', na=False)
-
-                X_transformed.loc[special_chars_mask, column_name] = np.nan
-
-                # Verificando se possui o valor NM (Not Mentioned).
-                X_transformed.loc[X_transformed[column_name].str.contains("NM", na=False), column_name] = np.nan
-
-                # Verificando valores vazios e transformando em nulos.
-                X_transformed.loc[X_transformed[column_name].str.strip().eq(''), column_name] = pd.NA
+                    patterns = _SPECIAL_CHARS_ONLY
+
+                # Caracteres especiais e NM (Not Mentioned) viram NaN, valores vazios ou nulos viram NA, uma vez por valor distinto.
+                clean = lambda values: _clean_null_strings(values, patterns)
+                if isinstance(column.dtype, pd.CategoricalDtype):
+                    # Colunas categóricas: limpeza apenas das categorias, mantendo o dtype (NaN e NA viram nulo da categoria).
+                    X_transformed[column_name] = pd.Categorical(_map_unique(column, clean))
+                elif _is_arrow_string(column):
+                    # Colunas string[pyarrow] são limpas diretamente no pyarrow, mantendo o dtype.
+                    X_transformed[column_name] = _clean_null_strings(column, patterns)
+                else:
+                    X_transformed[column_name] = _map_unique(column, clean, rule=('TransformToNull', patterns[1]))
 
         return X_transformed
 
 # Realizando tratamento dos dados nulos da coluna Num_Credit_Card.
-class CleaningMissingCreditCard(BaseEstimator, TransformerMixin):
+class CleaningMissingCreditCard(BaseTransformer):
     
     """
     Transforma valores menores ou igual a 0 para 1.
@@ -68,14 +1089,17 @@ class CleaningMissingCreditCard(BaseEstimator, TransformerMixin):
     transform: Aplica a transformação na coluna especificada.
     """
 
-    def __init__(self, column_name):
+    _idempotent = True
+
+    def __init__(self, column_name, copy=True):
         self.column_name = column_name
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self  
     
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
         X_transformed.loc[X_transformed[self.column_name] <= 0, self.column_name] = 1
                 
@@ -83,7 +1107,7 @@ class CleaningMissingCreditCard(BaseEstimator, TransformerMixin):
 
 
 # Realizando tratamento dos dados nulos da coluna Type_of_Loan.
-class CleaningMissingTypeOfLoan(BaseEstimator, TransformerMixin):
+class CleaningMissingTypeOfLoan(BaseTransformer):
 
     """
     Transforma valores nulos para a str (Not Specified).
@@ -96,22 +1120,29 @@ class CleaningMissingTypeOfLoan(BaseEstimator, TransformerMixin):
     transform: Aplica a transformação na coluna especificada.
     """
 
-    def __init__(self, column_name):
+    _idempotent = True
+
+    def __init__(self, column_name, copy=True):
         self.column_name = column_name
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self  
     
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
-        X_transformed[self.column_name].fillna("Not Specified", inplace=True)
+        column = X_transformed[self.column_name]
+        if isinstance(column.dtype, pd.CategoricalDtype) and "Not Specified" not in column.cat.categories:
+            column = column.cat.add_categories("Not Specified")  # Em colunas categóricas o valor precisa existir como categoria.
+
+        X_transformed[self.column_name] = column.fillna("Not Specified")
                 
         return X_transformed
     
 
 # Realizando tratamento dos dados nulos da coluna Num_of_Delayed_Payment.
-class CleaningMissingDelayedPayment(BaseEstimator, TransformerMixin):
+class CleaningMissingDelayedPayment(BaseTransformer):
 
     """
     Transforma valores nulos agrupados pela coluna Customer_ID e preenchendo os valores pela moda de cada Customer_ID.
@@ -120,22 +1151,45 @@ class CleaningMissingDelayedPayment(BaseEstimator, TransformerMixin):
     column: Num_of_Delayed_Payment
 
     Métodos:
-    fit:  Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
+    fit: Aprende a moda de cada Customer_ID (customer_modes_) e a moda dessas modas (global_mode_), usada para Customer_ID não vistos no fit.
+    _merge: Concatena as tabelas por Customer_ID aprendidas por outra instância (ajustada em outros clientes).
     transform: Aplica a transformação na coluna especificada.
     """
 
-    def __init__(self, column_name):
+    _scope = 'customer'
+    _extra_inputs = ('Customer_ID', 'Delay_from_due_date')
+
+    def __init__(self, column_name, copy=True):
         self.column_name = column_name
+        self.copy = copy
 
     def fit(self, X, y=None):
-        return self  
-    
+        groups = _customer_groups(X)
+        self.customer_modes_ = groups.mode(self._fill_zero(X[self.column_name]))[0][0]
+        self.global_mode_ = _first_mode(self.customer_modes_)
+        return self
+
+    @staticmethod
+    def _fill_zero(column):
+        if isinstance(column.dtype, pd.StringDtype) or _is_arrow_string(column):
+            column = column.astype(object)  # O dtype de string não aceita o preenchimento com 0.
+        return column.fillna(0)
+
+    def _merge(self, other):
+        # Partições com Customer_ID distintos: as modas de cada cliente são apenas concatenadas.
+        if hasattr(self, 'customer_modes_'):
+            self.customer_modes_ = pd.concat([self.customer_modes_, other.customer_modes_]).sort_index()
+            self.global_mode_ = _first_mode(self.customer_modes_)
+            return self
+        return super()._merge(other)
+
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        check_is_fitted(self)
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
-        X_transformed[self.column_name].fillna(0, inplace=True)
-        mode_num_delayed_payment = X_transformed.groupby("Customer_ID")[self.column_name].apply(lambda x: x.mode().iloc[0])
-        X_transformed.loc[X_transformed[self.column_name] == 0, self.column_name] = X_transformed["Customer_ID"].map(mode_num_delayed_payment)
+        X_transformed[self.column_name] = self._fill_zero(X_transformed[self.column_name])
+        mode_num_delayed_payment = _lookup(X_transformed["Customer_ID"], self.customer_modes_, self.global_mode_)
+        X_transformed.loc[X_transformed[self.column_name] == 0, self.column_name] = pd.Series(mode_num_delayed_payment, index=X_transformed.index)
         X_transformed.loc[(X_transformed[self.column_name] == 0) & X_transformed['Delay_from_due_date'] > 0, self.column_name] = 1
 
 
@@ -144,7 +1198,7 @@ class CleaningMissingDelayedPayment(BaseEstimator, TransformerMixin):
 
 
 # Realizando tratamento dos dados nulos da coluna Monthly_Inhand_Salary.
-class CleaningMissingMonthlySalary(BaseEstimator, TransformerMixin):
+class CleaningMissingMonthlySalary(BaseTransformer):
 
     """
     Transforma valores nulos agrupados pela coluna Customer_ID e preenchendo os valores pela media de cada Customer_ID.
@@ -153,38 +1207,49 @@ class CleaningMissingMonthlySalary(BaseEstimator, TransformerMixin):
     column: Monthly_Inhand_Salary
 
     Métodos:
-    fit:  Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
+    fit: Aprende a mediana de cada Customer_ID (customer_medians_) e a mediana dessas medianas (global_median_), usada para Customer_ID não vistos no fit.
+    _merge: Concatena as tabelas por Customer_ID aprendidas por outra instância (ajustada em outros clientes).
     transform: Aplica a transformação na coluna especificada.
 
     """
 
-    def __init__(self, column_name):
+    _scope = 'customer'
+    _extra_inputs = ('Customer_ID',)
+
+    def __init__(self, column_name, copy=True):
         self.column_name = column_name
+        self.copy = copy
 
     def fit(self, X, y=None):
-        return self  
-    
-    def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
-        
-        # pegando os customer_id que possuem NaN na coluna
-        monthly_salaray_nan = X_transformed[X_transformed[self.column_name].isna()]['Customer_ID'].unique()  
+        # calculando a mediana de cada Customer_ID em uma única passada
+        groups = _customer_groups(X)
+        self.customer_medians_ = groups.median(X[self.column_name])
+        self.global_median_ = self.customer_medians_.median()
+        return self
 
-        # buscando apenas os customer_id que estejam na variavel para verificar se ele possui algum valor em outro mês   
-        customers_id = X_transformed[X_transformed['Customer_ID'].isin(monthly_salaray_nan)]
+    def _merge(self, other):
+        # Partições com Customer_ID distintos: as medianas de cada cliente são apenas concatenadas.
+        if hasattr(self, 'customer_medians_'):
+            self.customer_medians_ = pd.concat([self.customer_medians_, other.customer_medians_]).sort_index()
+            self.global_median_ = self.customer_medians_.median()
+            return self
+        return super()._merge(other)
 
-        #colocando a media para cada Customer_id na coluna de salario
-        mean_salary  = customers_id.groupby("Customer_ID")[self.column_name].apply(lambda x:  x.median())
-        mean_salary = pd.DataFrame(mean_salary) # transformando em um df
+    def transform(self, X):
+        check_is_fitted(self)
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
+        
+        mean_salary = _lookup(X_transformed["Customer_ID"], self.customer_medians_, self.global_median_)
 
-        X_transformed.loc[X_transformed[self.column_name].isna(), self.column_name] = customers_id["Customer_ID"].map(mean_salary[self.column_name])
+        #colocando a mediana de cada Customer_id nas linhas com NaN na coluna de salario
+        X_transformed.loc[X_transformed[self.column_name].isna(), self.column_name] = pd.Series(mean_salary, index=X_transformed.index)
         
                 
         return X_transformed
     
 
 # Realizando tratamento dos dados nulos da coluna Num_Bank_Accounts.
-class CleaningNumBankAccounts(BaseEstimator, TransformerMixin):
+class CleaningNumBankAccounts(BaseTransformer):
 
     """
     Transforma valores nulos agrupados pela coluna Customer_ID e preenche os valores pela quantidade de ocorrências de cada Customer_ID.
@@ -198,60 +1263,104 @@ class CleaningNumBankAccounts(BaseEstimator, TransformerMixin):
 
     """
 
-    def __init__(self, column_name):
+    _scope = 'customer'
+    _extra_inputs = ('Customer_ID',)
+    _idempotent = True
+
+    def __init__(self, column_name, copy=True):
         self.column_name = column_name
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self  
     
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
-        # agrupando pelo costumerID e verificando quais possuem valores nulos
-        num_bank_account_null=  X_transformed.groupby('Customer_ID').apply(lambda x: x[(x[self.column_name] <= 0)]) 
-        index_bank_account_null = num_bank_account_null.droplevel(-1).index #pegando os customer_id
-
-        # pegando apenas os dados que possuem o customer_id contido na variavel num_bank_account_null
-        filtered_df = X_transformed[X_transformed['Customer_ID'].isin(index_bank_account_null)] 
-        count_per_customer_id = filtered_df['Customer_ID'].value_counts() #pegar a quantidade de customer_id para realizar o replace
+        # Linhas com valor menor ou igual a 0 recebem a quantidade de linhas do seu Customer_ID (contagem vetorizada por grupo,
+        # sem o groupby().apply). Linhas sem Customer_ID são mantidas.
+        groups = _customer_groups(X_transformed)
+        group_size = groups.broadcast(np.bincount(groups.codes[groups.codes >= 0], minlength=groups.n_groups), fill_value=0)
+        replace = (X_transformed[self.column_name] <= 0).to_numpy() & (groups.codes >= 0)
 
-        X_transformed.loc[X_transformed['Customer_ID'].isin(index_bank_account_null) & (X_transformed[self.column_name] <= 0), self.column_name] = X_transformed['Customer_ID'].map(count_per_customer_id) 
+        _assign(X_transformed, replace, self.column_name, group_size[replace])
 
         return X_transformed
 
 
 
 # Realizando tratamento dos dados nulos da coluna Monthly_Balance.
-class CleaningMissingMonthlyBalance(BaseEstimator, TransformerMixin):
+class CleaningMissingMonthlyBalance(BaseTransformer):
 
     """
     Transforma valores nulos da coluna especificada para a moda da coluna.
     
     Parâmetros:
     column: Monthly_Balance
+    approximate: bool (default=False)
+        Quando True a moda é aproximada por um sketch de Misra-Gries (sketches_, ver HeavyHitters), com memória limitada
+        a sketch_size contadores, em vez das contagens de todos os valores distintos.
+    sketch_size: int (default=200)
+        Quantidade de contadores do sketch (apenas com approximate=True).
 
     Métodos:
-    fit:  Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
+    fit: Aprende a moda da coluna (mode_) a partir das contagens de valores (value_counts_) ou do sketch (sketches_).
+    partial_fit: Soma as contagens (ou o sketch) de um novo bloco de dados e atualiza a moda.
+    _merge / _remove: Soma ou subtrai as contagens aprendidas por outra instância (os sketches apenas são somados).
     transform: Aplica a transformação na coluna especificada.
 
     """
 
-    def __init__(self, column_name):
+    _scope = 'global'
+
+    def __init__(self, column_name, copy=True, approximate=False, sketch_size=200):
         self.column_name = column_name
+        self.copy = copy
+        self.approximate = approximate
+        self.sketch_size = sketch_size
 
     def fit(self, X, y=None):
-        return self  
-    
+        self._reset()
+        return self.partial_fit(X)
+
+    def partial_fit(self, X, y=None):
+        if self.approximate:
+            return self._update_sketches({self.column_name: HeavyHitters(self.sketch_size).update(X[self.column_name])})
+        return self._update_counts(_value_counts(X[self.column_name]))
+
+    def _merge(self, other):
+        if self.approximate:
+            return self._update_sketches(other.sketches_)
+        return self._update_counts(other.value_counts_)
+
+    def _remove(self, other):
+        if self.approximate:
+            raise NotImplementedError('O sketch de Misra-Gries não permite retirar linhas: ajuste a etapa novamente (fit).')
+        return self._update_counts(other.value_counts_, sign=-1)
+
+    def _update_counts(self, counts, sign=1):
+        if self.approximate:
+            return self._update_sketches({self.column_name: HeavyHitters(self.sketch_size).update_counts(counts)})
+        self.value_counts_ = _merge_counts(getattr(self, 'value_counts_', None), counts, sign)
+        self.mode_ = _mode_from_counts(self.value_counts_)
+        return self
+
+    def _update_sketches(self, sketches):
+        self.sketches_ = _merge_sketches(getattr(self, 'sketches_', None), sketches)
+        self.mode_ = self.sketches_[self.column_name].mode()
+        return self
+
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        check_is_fitted(self)
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
-        X_transformed.loc[X_transformed[self.column_name].isna(), self.column_name] = X_transformed[self.column_name].mode().iloc[0]
+        _assign(X_transformed, X_transformed[self.column_name].isna(), self.column_name, self.mode_)
                 
         return X_transformed
 
 
 # Realizando tratamento dos dados nulos.
-class CleaningMissingValues(BaseEstimator, TransformerMixin):
+class CleaningMissingValues(BaseTransformer):
 
     """
     Transforma valores nulos pela (próxima ou anterior) ocorrência de valor agrupado pelo Customer_ID.
@@ -266,24 +1375,32 @@ class CleaningMissingValues(BaseEstimator, TransformerMixin):
 
     """
     
-    def __init__(self, column_names):
+    _scope = 'customer'
+    _extra_inputs = ('Customer_ID',)
+    _idempotent = True
+
+    def __init__(self, column_names, copy=True):
         self.column_names = column_names
+        self.copy = copy
     
     def fit(self, X, y=None):
         return self   
 
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
+        # Fatorando o Customer_ID uma única vez para todas as colunas.
+        groups = _customer_groups(X_transformed)
+
         for column_name in self.column_names:
             #Outras colunas serão tratadas dessa forma.
-            X_transformed[column_name] = X_transformed.groupby('Customer_ID')[column_name].transform(lambda x: x.bfill().ffill())
+            X_transformed[column_name] = groups.fill(X_transformed[column_name])
 
         return X_transformed
 
 
 # Retirando caracteres não numéricos de colunas "numéricas"
-class CleaningNotNumbers(BaseEstimator, TransformerMixin): 
+class CleaningNotNumbers(BaseTransformer): 
 
     """
     Retira valores inconsistentes de colunas "númericas" e realiza a conversão do dtype.
@@ -298,23 +1415,26 @@ class CleaningNotNumbers(BaseEstimator, TransformerMixin):
     
     """
 
-    def __init__(self, column_names):
+    _idempotent = True
+
+    def __init__(self, column_names, copy=True):
         self.column_names = column_names
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self  
     
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
         for column_name in self.column_names:
-            # Verificando se a coluna é do tipo Object.
-            if pd.api.types.is_object_dtype(X_transformed[column_name]):
-                if X_transformed[column_name].str.contains(r'\d', regex=True).any():  # Verificando se contém algum valor numérico.
-                    # Realizando a limpeza de caracteres inválidos.
-                    X_transformed[column_name] = X_transformed[column_name].str.replace(r'[^0-9]', '', regex=True)
-                    # Converter a coluna para numérico
-                    X_transformed[column_name] = pd.to_numeric(X_transformed[column_name], errors='coerce')
+            # Verificando se a coluna é do tipo Object (ou string) ou categórica.
+            column = X_transformed[column_name]
+            if _is_text(column) or isinstance(column.dtype, pd.CategoricalDtype):
+                # Realizando a limpeza de caracteres inválidos e a conversão para numérico uma vez por valor distinto.
+                numbers = _map_unique(column, _clean_not_numbers, 'numeric', rule='CleaningNotNumbers')
+                if numbers is not None:  # Verificando se contém algum valor numérico.
+                    X_transformed[column_name] = numbers
             else:
                 # Se é do tipo float ou int
                 X_transformed[column_name] = X_transformed[column_name].abs()
@@ -322,13 +1442,16 @@ class CleaningNotNumbers(BaseEstimator, TransformerMixin):
         return X_transformed
 
 # Ajustando os meses contidos na string.    
-class ModifyMonthCreditHistory(BaseEstimator, TransformerMixin):
+class ModifyMonthCreditHistory(BaseTransformer):
 
     """
     Substitui os meses adequando a sequência correta.
+    O resultado é ordenado pelo Customer_ID (mantendo a ordem original dentro de cada cliente) e o índice é reiniciado.
     
     Parâmetros:
     column: Credit_History_Age
+    add_numeric_columns: bool (default=False)
+        Quando True cria as colunas numéricas {column}_Years e {column}_Months com o ano e o mês já ajustado.
 
     Métodos:
     fit: Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
@@ -337,85 +1460,108 @@ class ModifyMonthCreditHistory(BaseEstimator, TransformerMixin):
     """
      
 
-    def __init__(self, column_name):
+    _scope = 'customer'
+    _extra_inputs = ('Customer_ID',)
+    _pattern = r'^(.*?) and \s*\S+(.*?)(?: and .*)?$'  # Anos | número do mês | restante ("22 Years and 1 Months").
+    _changes_rows = True  # Ordena pelo Customer_ID e descarta as linhas sem Customer_ID.
+
+    def __init__(self, column_name, add_numeric_columns=False, copy=True):
         self.column_name = column_name
+        self.add_numeric_columns = add_numeric_columns
+        self.copy = copy
     
     def fit(self, X, y=None):
         return self   
-    
-    def modify_month(self, df_group):
-        for i in range(len(df_group)):
-            value = df_group.iloc[i][self.column_name]
-            # Verifica se o valor é uma string antes de tentar dividi-lo
-            if isinstance(value, str):
-                parts = value.split(' and ')
-                if len(parts) > 1:
-                    months_part = parts[1].split()
-                    months_part[0] = str(i + 1)  # Adicionando o valor para o mês com o índice mais 1.
-                    df_group.at[df_group.index[i], self.column_name] = f"{parts[0]} and {' '.join(months_part)}"
-        return df_group
 
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
-        # chamando a função criada para realizar as alterações
-        X_transformed = X_transformed.groupby('Customer_ID').apply(self.modify_month).reset_index(drop=True) 
+        groups = _customer_groups(X_transformed)
+        month_number = groups.cumcount() + 1  # Adicionando o valor para o mês com o índice mais 1.
+
+        # Separando a parte dos anos e o restante da parte dos meses (ex.: "22 Years" | " Months").
+        # A extração é feita uma vez por valor distinto da coluna e distribuída para as linhas.
+        column = X_transformed[self.column_name]
+        codes, uniques = pd.factorize(column)
+        uniques = pd.Series(np.asarray(uniques, dtype=object))
+        parts = uniques.where(uniques.map(type) == str).str.extract(self._pattern)
+        head = pd.api.extensions.take(parts[0].to_numpy(), codes, allow_fill=True)
+        tail = pd.api.extensions.take(parts[1].to_numpy(), codes, allow_fill=True)
+        matched = pd.notna(head)
+
+        values = column.to_numpy(dtype=object, copy=True)
+        values[matched] = head[matched] + ' and ' + month_number[matched].astype(str).astype(object) + tail[matched]
+        X_transformed[self.column_name] = values
+
+        if self.add_numeric_columns:
+            years = pd.to_numeric(parts[0].str.extract(r'(\d+)', expand=False), errors='coerce').to_numpy(dtype=np.float64)
+            X_transformed[f'{self.column_name}_Years'] = pd.api.extensions.take(years, codes, allow_fill=True)
+            X_transformed[f'{self.column_name}_Months'] = np.where(matched, month_number, np.nan)
+
+        # Ordenando pelo Customer_ID, como no resultado do groupby, e descartando linhas sem Customer_ID.
+        rows = groups.order[groups.sorted_codes >= 0]
+        X_transformed = X_transformed.take(rows).reset_index(drop=True)
 
         return X_transformed
 
 
 # Criando uma nova coluna no dataframe contendo apenas o ano e mês.
-class CreateDateCreditHistoryColumn(BaseEstimator, TransformerMixin):
+class CreateDateCreditHistoryColumn(BaseTransformer):
 
     """
     Realiza a criação de uma nova coluna (Credit_History_Age_Date) contendo apenas o mês e ano respctivos da coluna (Credit_History_Age).
+    A data é calculada subtraindo os anos e meses da data de referência (aritmética inteira de meses) e retornada como datetime64
+    no primeiro dia do mês. Valores fora do formato "X Years and Y Months" resultam em NaT.
     
     Parâmetros:
     column: Credit_History_Age
+    reference_date: str, datetime ou None (default=None)
+        Data de referência para o cálculo. Quando None, utiliza a data atual no momento do fit.
 
     Métodos:
-    fit: Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
+    fit: Fixa o mês de referência (reference_month_), garantindo o mesmo resultado em reexecuções do transform.
     transform: Aplica a transformação para valores nulos nas colunas especificadas.
     
     """
 
 
-    def __init__(self, column_name):
+    _extra_outputs = ('Credit_History_Age_Date',)
+    _pattern = r'^(\d+) Years and (\d+) Months'
+
+    def __init__(self, column_name, reference_date=None, copy=True):
         self.column_name = column_name
+        self.reference_date = reference_date
+        self.copy = copy
 
     def fit(self, X, y=None):
-        return self  
-    
+        reference = pd.Timestamp.now() if self.reference_date is None else pd.Timestamp(self.reference_date)
+        self.reference_month_ = reference.year * 12 + reference.month - 1
+        return self
 
-    # fazer alteração da string para uma data
-    def convert_to_datetime(self, duration_str):
-        #realizando a divisão em 2 grupos, o primeiro com o valor do ano e o segundo com o valor do Mês
-        match = re.match(r'(\d+) Years and (\d+) Months', duration_str)
-        if match:
-            years = int(match.group(1))
-            months = int(match.group(2))
-        
-        
-        base_date = datetime.now()
-        
-        # Realizando a diferença entre a data atual e a data de ingressão do usuário.
-        new_date = base_date - timedelta(days=years*365 + months*30)
-        
-        # Retornar a data no formato YYYY-MM
-        return new_date.strftime('%Y-%m')
-    
-    
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        check_is_fitted(self)
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
-        # aplicando a função e criando uma nova coluna no dataframe.
-        X_transformed['Credit_History_Age_Date'] = X_transformed[self.column_name].apply(self.convert_to_datetime) 
+        # criando a nova coluna no dataframe (data calculada uma vez por valor distinto).
+        X_transformed['Credit_History_Age_Date'] = _map_unique(X_transformed[self.column_name], self._dates, 'datetime',
+                                                               rule=('CreateDateCreditHistoryColumn', self.reference_month_))
                 
         return X_transformed
+
+    def _dates(self, values):
+        # realizando a divisão em 2 grupos, o primeiro com o valor do ano e o segundo com o valor do Mês
+        parts = values.where(values.map(type) == str).str.extract(self._pattern).astype(np.float64)
+
+        # Realizando a diferença em meses entre a data de referência e a data de ingressão do usuário.
+        months = self.reference_month_ - (parts[0] * 12 + parts[1])
+        matched = months.notna().to_numpy()
+        dates = np.full(len(months), np.datetime64('NaT'), dtype='datetime64[M]')
+        dates[matched] = (months[matched].to_numpy(dtype=np.int64) - 1970 * 12).astype('datetime64[M]')
+        return dates.astype('datetime64[ns]')
     
 
 # Criando uma coluna númerica para os meses
-class CreateMonthNumberColumn(BaseEstimator, TransformerMixin):
+class CreateMonthNumberColumn(BaseTransformer):
 
     """
     Realiza a criação de uma nova coluna (Credit_History_Age_Date) contendo apenas o mês e ano respctivos da coluna (Credit_History_Age).
@@ -430,27 +1576,31 @@ class CreateMonthNumberColumn(BaseEstimator, TransformerMixin):
     """
 
 
-    def __init__(self, column_name):
+    _extra_outputs = ('Number_Month',)
+    _idempotent = True
+    month_dic = { 'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+                    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12 }
+
+    def __init__(self, column_name, copy=True):
         self.column_name = column_name
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self  
         
     
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
-        month_dic = { 'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
-                        'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12 }
-        
-        # Criação da coluna para indentificar os meses em números
-        X_transformed["Number_Month"] = X_transformed[self.column_name].str.lower().map(month_dic) 
+        # Criação da coluna para indentificar os meses em números (uma vez por valor distinto)
+        X_transformed["Number_Month"] = _map_unique(X_transformed[self.column_name], lambda values: values.str.lower().map(self.month_dic),
+                                                    'numeric', rule=('CreateMonthNumberColumn', tuple(self.month_dic.items())))
                 
         return X_transformed
     
 
 # Alterando a coluna para binário (yes: 1) (no: 0)
-class TransformToBinaryValues(BaseEstimator, TransformerMixin):
+class TransformToBinaryValues(BaseTransformer):
 
     """
     Realiza a conversão da coluna (Payment_of_Min_Amount) para valor binário { Yes: 1, No: 0 }.
@@ -464,23 +1614,28 @@ class TransformToBinaryValues(BaseEstimator, TransformerMixin):
     
     """
 
-    def __init__(self, column_name):
+    binary_dic = {'Yes': 1, 'No': 0}
+
+    def __init__(self, column_name, copy=True):
         self.column_name = column_name
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self  
     
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
 
-        X_transformed[self.column_name] = X_transformed[self.column_name].map({'Yes': 1, 'No': 0}) # transformando os dados para binário
+        # transformando os dados para binário (uma vez por valor distinto; em colunas categóricas o resultado também é numérico)
+        X_transformed[self.column_name] = _map_unique(X_transformed[self.column_name], lambda values: values.map(self.binary_dic),
+                                                      'numeric', rule=('TransformToBinaryValues', tuple(self.binary_dic.items())))
                 
         return X_transformed
 
 
 # Convertendo as colunas possíveis para o dtype int ou float.
-class ConvertDtypeToNumeric(BaseEstimator, TransformerMixin):
+class ConvertDtypeToNumeric(BaseTransformer):
 
     """
     Realiza a conversão da colunas específicadas para o dtype numérico.
@@ -496,18 +1651,24 @@ class ConvertDtypeToNumeric(BaseEstimator, TransformerMixin):
     """
      
 
-    def __init__(self, column_names):
+    _idempotent = True
+
+    def __init__(self, column_names, copy=True):
         self.column_names = column_names
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self  
     
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
         for column_name in self.column_names:
             if pd.api.types.is_object_dtype(X_transformed[column_name]):
-                if X_transformed[column_name].str.contains(r'\d', regex=True).any():
+                # Coluna object sem strings (ex.: um bloco do modo streaming em que os valores já são numéricos).
+                if pd.api.types.infer_dtype(X_transformed[column_name], skipna=True) in ('integer', 'floating', 'mixed-integer-float'):
+                    X_transformed[column_name] = pd.to_numeric(X_transformed[column_name], errors='coerce')
+                elif X_transformed[column_name].str.contains(r'\d', regex=True).any():
                     X_transformed[column_name] = pd.to_numeric(X_transformed[column_name], errors='coerce')
             else:
                 pass
@@ -518,7 +1679,7 @@ class ConvertDtypeToNumeric(BaseEstimator, TransformerMixin):
 # CLASSES DE TRATAMENTO DE OUTLIERS.
 
 
-class TreatingOutliersWithQuantile(BaseEstimator, TransformerMixin):
+class TreatingOutliersWithQuantile(BaseTransformer):
 
     """
     Realiza o tratamento de outliers através de um limitador gerado pelo quartill/quadrante.
@@ -527,40 +1688,95 @@ class TreatingOutliersWithQuantile(BaseEstimator, TransformerMixin):
     columns: list of float/int
         Nomes das colunas no DataFrame a serem transformadas.
 
+    approximate: bool (default=False)
+        Quando True os quantis são aproximados por sketches KLL (sketches_, ver KLLSketch), com memória limitada pelo
+        sketch_size, em vez das contagens de todos os valores distintos.
+    sketch_size: int (default=200)
+        Parâmetro k dos sketches (apenas com approximate=True).
+
     Métodos:
-    fit: Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
+    fit: Aprende o limite superior de cada coluna (upper_bounds_) a partir das contagens de valores (value_counts_) ou dos sketches (sketches_).
+    partial_fit: Soma as contagens (ou os sketches) de um novo bloco de dados e recalcula os limites.
+    _merge / _remove: Soma ou subtrai as contagens aprendidas por outra instância (os sketches apenas são somados).
     transform: Aplica a transformação para valores nulos nas colunas especificadas.
     
     """
 
-    def __init__(self, column_names):
+    _scope = 'global'
+
+    def __init__(self, column_names, copy=True, approximate=False, sketch_size=200):
         self.column_names = column_names
+        self.copy = copy
+        self.approximate = approximate
+        self.sketch_size = sketch_size
 
     def fit(self, X, y=None):
-        return self  
-    
-    def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
-        
+        self._reset()
+        return self.partial_fit(X)
+
+    def partial_fit(self, X, y=None):
+        if self.approximate:
+            return self._update_sketches({column_name: KLLSketch(self.sketch_size).update(X[column_name])
+                                          for column_name in self.column_names})
+        return self._update_counts({column_name: _value_counts(X[column_name]) for column_name in self.column_names})
+
+    def _merge(self, other):
+        if self.approximate:
+            return self._update_sketches(other.sketches_)
+        return self._update_counts(other.value_counts_)
+
+    def _remove(self, other):
+        if self.approximate:
+            raise NotImplementedError('Os sketches KLL não permitem retirar linhas: ajuste a etapa novamente (fit).')
+        return self._update_counts(other.value_counts_, sign=-1)
+
+    def _update_counts(self, counts, sign=1):
+        if self.approximate:
+            return self._update_sketches({column_name: KLLSketch(self.sketch_size).update_counts(counts[column_name])
+                                          for column_name in self.column_names})
+        value_counts = getattr(self, 'value_counts_', {})
+        self.value_counts_ = {column_name: _merge_counts(value_counts.get(column_name), counts[column_name], sign)
+                              for column_name in self.column_names}
+        # Os três quantis utilizados são calculados juntos, com uma única ordenação das contagens.
+        return self._update_bounds({column_name: _quantile_from_counts(self.value_counts_[column_name], [0.25, 0.75, 0.95])
+                                    for column_name in self.column_names})
+
+    def _update_sketches(self, sketches):
+        self.sketches_ = _merge_sketches(getattr(self, 'sketches_', None), sketches)
+        return self._update_bounds({column_name: self.sketches_[column_name].quantile([0.25, 0.75, 0.95])
+                                    for column_name in self.column_names})
+
+    def _update_bounds(self, quantiles):
+        self.upper_bounds_ = {}
+
         for column_name in self.column_names:
-            Q1 = X_transformed[column_name].quantile(0.25) # primeiro quartil (pega os valores de 25% para baixo)
-            Q3 = X_transformed[column_name].quantile(0.95) # terceiro quartil (pega os valores de 95% para baixo)
+            Q1, Q75, Q95 = quantiles[column_name]
+            Q3 = Q95 # terceiro quartil (pega os valores de 95% para baixo)
 
             if(column_name == 'Outstanding_Debt' or column_name == 'Amount_invested_monthly'):
-                Q3 = X_transformed[column_name].quantile(0.75) # terceiro quartil (pega os valores de 75% para baixo)
+                Q3 = Q75 # terceiro quartil (pega os valores de 75% para baixo)
            
             
             IQR = Q3 - Q1 # calcula a diferença entre o primeiro e o terceiro quartil
 
-            upper_bound = Q3 + 1.5 * IQR
+            self.upper_bounds_[column_name] = Q3 + 1.5 * IQR
 
-            X_transformed[column_name] = X_transformed[column_name].apply(lambda x:  ceil(upper_bound) if x > upper_bound else x) # Alteração de outliers
+        return self
+
+    def transform(self, X):
+        check_is_fitted(self)
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
+        
+        for column_name in self.column_names:
+            upper_bound = self.upper_bounds_[column_name]
+
+            X_transformed[column_name] = _cap_upper(X_transformed[column_name], upper_bound) # Alteração de outliers
                 
         return X_transformed
 
 
 
-class TreatingOutliersWithMode(BaseEstimator, TransformerMixin):
+class TreatingOutliersWithMode(BaseTransformer):
     
     """
     Realiza o tratamento de outliers aplicando a moda da coluna.
@@ -569,30 +1785,82 @@ class TreatingOutliersWithMode(BaseEstimator, TransformerMixin):
     columns: list of float/int
         Nomes das colunas no DataFrame a serem transformadas.
 
+    approximate: bool (default=False)
+        Quando True as modas são aproximadas por sketches de Misra-Gries (sketches_, ver HeavyHitters), com memória
+        limitada a sketch_size contadores por coluna, em vez das contagens de todos os valores distintos.
+    sketch_size: int (default=200)
+        Quantidade de contadores de cada sketch (apenas com approximate=True).
+
     Métodos:
-    fit: Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
+    fit: Aprende a moda de cada coluna (modes_) a partir das contagens de valores (value_counts_) ou dos sketches (sketches_).
+    partial_fit: Soma as contagens (ou os sketches) de um novo bloco de dados e atualiza as modas.
+    _merge / _remove: Soma ou subtrai as contagens aprendidas por outra instância (os sketches apenas são somados).
     transform: Aplica a transformação para valores nulos nas colunas especificadas.
     
     """
 
-    def __init__(self, column_names):
+    _scope = 'global'
+
+    def __init__(self, column_names, copy=True, approximate=False, sketch_size=200):
         self.column_names = column_names
+        self.copy = copy
+        self.approximate = approximate
+        self.sketch_size = sketch_size
 
     def fit(self, X, y=None):
-        return self  
-    
+        self._reset()
+        return self.partial_fit(X)
+
+    def partial_fit(self, X, y=None):
+        if self.approximate:
+            return self._update_sketches({column_name: HeavyHitters(self.sketch_size).update(X[column_name])
+                                          for column_name in self.column_names})
+        return self._update_counts({column_name: _value_counts(X[column_name]) for column_name in self.column_names})
+
+    def _merge(self, other):
+        if self.approximate:
+            return self._update_sketches(other.sketches_)
+        return self._update_counts(other.value_counts_)
+
+    def _remove(self, other):
+        if self.approximate:
+            raise NotImplementedError('Os sketches de Misra-Gries não permitem retirar linhas: ajuste a etapa novamente (fit).')
+        return self._update_counts(other.value_counts_, sign=-1)
+
+    def _update_sketches(self, sketches):
+        self.sketches_ = _merge_sketches(getattr(self, 'sketches_', None), sketches)
+        self.modes_ = {column_name: sketch.mode() for column_name, sketch in self.sketches_.items()}
+        return self
+
+    def _update_counts(self, counts, sign=1):
+        if self.approximate:
+            return self._update_sketches({column_name: HeavyHitters(self.sketch_size).update_counts(counts[column_name])
+                                          for column_name in self.column_names})
+        value_counts = getattr(self, 'value_counts_', {})
+        self.value_counts_ = {column_name: _merge_counts(value_counts.get(column_name), counts[column_name], sign)
+                              for column_name in self.column_names}
+        self.modes_ = {column_name: _mode_from_counts(counts) for column_name, counts in self.value_counts_.items()}
+        return self
+
+    @staticmethod
+    def _limit(column_name):
+        # Valores maiores ou iguais ao limite são outliers.
+        limit = 100
+        if column_name == 'Interest_Rate':
+            limit = 30
+        return limit
+
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        check_is_fitted(self)
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
         for column_name in self.column_names:
-            limit = 100
-            if column_name == 'Interest_Rate':
-                limit = 30
-            X_transformed.loc[X_transformed[column_name] >= limit, column_name] =  X_transformed[column_name].mode().iloc[0] # Alteração de outliers
+            limit = self._limit(column_name)
+            X_transformed.loc[X_transformed[column_name] >= limit, column_name] =  self.modes_[column_name] # Alteração de outliers
                 
         return X_transformed
 
-class TreatingOutliersNumCreditInquires(BaseEstimator, TransformerMixin): #Num_Credit_Inquiries
+class TreatingOutliersNumCreditInquires(BaseTransformer): #Num_Credit_Inquiries
 
     """
     Realiza o tratamento de outliers aplicando a moda da coluna agrupado pelo Customer_ID.
@@ -607,21 +1875,486 @@ class TreatingOutliersNumCreditInquires(BaseEstimator, TransformerMixin): #Num_C
     
     """
 
-    def __init__(self, column_name):
+    _scope = 'customer'
+    _extra_inputs = ('Customer_ID',)
+
+    def __init__(self, column_name, copy=True):
         self.column_name = column_name
+        self.copy = copy
 
     def fit(self, X, y=None):
         return self  
     
     def transform(self, X):
-        X_transformed = X.copy()  # Copiando o input do dataframe para evitar modificar o original.
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
         
         
-        X_transformed[self.column_name] = X_transformed.groupby('Customer_ID')[self.column_name].transform(
-            lambda x: x.mode().iloc[1] if len(x.mode()) > 1 else x.mode().iloc[0] if x.mode().iloc[0] <= 20 else x)
+        groups = _customer_groups(X_transformed)
+        modes, n_modes = groups.mode(X_transformed[self.column_name], n=2)
+
+        # Segunda moda quando o Customer_ID é multimodal, senão a moda quando ela for menor ou igual a 20, senão mantém o valor.
+        multimodal = n_modes > 1
+        replace = multimodal | (modes[0] <= 20).to_numpy()
+        replacement = np.where(multimodal, modes[1], modes[0])
+
+        replace_rows = groups.broadcast(replace, fill_value=False).astype(bool)
+        _assign(X_transformed, replace_rows, self.column_name, groups.broadcast(replacement)[replace_rows])
                 
         return X_transformed
 
 
 
 
+
+
+# OTIMIZAÇÃO DOS DTYPES.
+
+
+# Dtypes aplicados na leitura do CSV: colunas com poucos valores distintos (ou repetidos em todos os meses do cliente)
+# como category e inteiros com 16 bits.
+# Num_Bank_Accounts, Num_Credit_Card e Interest_Rate possuem outliers (até alguns milhares) antes do tratamento, por isso int16.
+READ_DTYPES = {
+    'Customer_ID': 'category', 'Month': 'category', 'Occupation': 'category', 'Credit_Mix': 'category',
+    'Payment_Behaviour': 'category', 'Type_of_Loan': 'category', 'Payment_of_Min_Amount': 'category',
+    'Credit_Score': 'category', 'Name': 'category', 'SSN': 'category', 'Credit_History_Age': 'category',
+    'Num_Bank_Accounts': 'int16', 'Num_Credit_Card': 'int16', 'Interest_Rate': 'int16', 'Delay_from_due_date': 'int16',
+}
+
+# Dtypes aplicados após o pipeline (OptimizeDtypes). 'integer' utiliza o menor inteiro que comporta os valores da coluna.
+DTYPE_PLAN = {
+    'Customer_ID': 'category', 'Month': 'category', 'Occupation': 'category', 'Credit_Mix': 'category',
+    'Payment_Behaviour': 'category', 'Type_of_Loan': 'category', 'Credit_Score': 'category', 'Name': 'category',
+    'SSN': 'category', 'Credit_History_Age': 'category',
+    'Num_Bank_Accounts': 'integer', 'Num_Credit_Card': 'integer', 'Num_of_Loan': 'integer', 'Interest_Rate': 'integer',
+    'Delay_from_due_date': 'integer', 'Number_Month': 'integer', 'Payment_of_Min_Amount': 'integer',
+}
+
+
+# Leitura do CSV já com os dtypes compactos.
+def read_csv(path, dtype=None, **read_csv_kwargs):
+
+    """
+    Lê o CSV aplicando o plano de dtypes (READ_DTYPES) já na leitura, para que o pipeline trabalhe desde o início com
+    colunas categóricas e inteiros compactos. Colunas do plano que não existem no arquivo são ignoradas.
+
+    Parâmetros:
+    path: str
+        Caminho do CSV.
+    dtype: dict (default=None)
+        Dtypes adicionais ou que substituem os do READ_DTYPES.
+    read_csv_kwargs:
+        Argumentos repassados para o pd.read_csv.
+    """
+
+    return pd.read_csv(path, dtype={**READ_DTYPES, **(dtype or {})}, **read_csv_kwargs)
+
+
+# Reduzindo o uso de memória do dataframe transformado.
+class OptimizeDtypes(BaseTransformer):
+
+    """
+    Converte as colunas para dtypes compactos: category para colunas com poucos valores distintos e o menor inteiro
+    possível (int8/int16/...) para colunas inteiras. Colunas inteiras com nulos utilizam float32 (exato para inteiros
+    até 2**24) e colunas com valores não inteiros são mantidas.
+
+    Parâmetros:
+    dtype_plan: dict (default=None)
+        Dtype de cada coluna ('category', 'integer' ou qualquer dtype aceito pelo astype). Quando None utiliza o DTYPE_PLAN.
+        Colunas do plano que não existem no DataFrame são ignoradas.
+
+    Métodos:
+    fit: Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
+    transform: Aplica a conversão dos dtypes nas colunas especificadas.
+    """
+
+    _idempotent = True
+
+    def __init__(self, dtype_plan=None, copy=True):
+        self.dtype_plan = dtype_plan
+        self.copy = copy
+
+    def fit(self, X, y=None):
+        return self
+
+    def _columns(self):
+        return list(DTYPE_PLAN if self.dtype_plan is None else self.dtype_plan)
+
+    def transform(self, X):
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
+
+        dtype_plan = DTYPE_PLAN if self.dtype_plan is None else self.dtype_plan
+        for column_name, dtype in dtype_plan.items():
+            if column_name not in X_transformed.columns:
+                continue
+            column = X_transformed[column_name]
+
+            if dtype != 'integer':
+                X_transformed[column_name] = column.astype(dtype)
+            elif pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+                values = column.to_numpy(dtype=np.float64)
+                valid = values[~np.isnan(values)]
+                if not np.array_equal(valid, np.round(valid)):
+                    continue  # Valores não inteiros: mantém o dtype.
+                if len(valid) == len(values):
+                    X_transformed[column_name] = pd.to_numeric(column, downcast='integer')
+                elif np.abs(valid).max(initial=0) <= 2 ** 24:
+                    X_transformed[column_name] = column.astype(np.float32)
+
+        return X_transformed
+
+
+
+
+
+
+# CODIFICAÇÃO DO TYPE_OF_LOAN.
+
+
+# Vocabulário fixo dos tipos de empréstimo da coluna Type_of_Loan. Cada tipo ocupa um bit da máscara (até 16 tipos).
+LOAN_TYPES = ('Auto Loan', 'Credit-Builder Loan', 'Personal Loan', 'Home Equity Loan', 'Mortgage Loan', 'Student Loan',
+              'Debt Consolidation Loan', 'Payday Loan', 'Not Specified')
+
+# Separadores da lista de tipos: "A, B, and C" e "A and B".
+_LOAN_SEPARATOR = r'\s*,\s*(?:and\s+)?|\s+and\s+'
+
+
+# Quantidade de vezes que cada tipo de empréstimo (colunas, na ordem do vocabulário) aparece em cada valor (linhas).
+# Valores nulos ou não str e tipos fora do vocabulário não são contados.
+def _loan_type_counts(values, loan_types):
+    parts = pd.Series(values, dtype=object)
+    parts = parts.where(parts.map(type) == str).str.split(_LOAN_SEPARATOR, regex=True).explode().str.strip()
+    positions = parts.map({loan_type: i for i, loan_type in enumerate(loan_types)}).to_numpy(dtype=np.float64)
+    found = ~np.isnan(positions)
+
+    counts = np.zeros((len(values), len(loan_types)), dtype=np.uint8)
+    np.add.at(counts, (parts.index.to_numpy()[found], positions[found].astype(np.intp)), 1)
+    return counts
+
+
+# Máscara de bits (uint16) a partir das contagens de cada tipo.
+def _loan_masks(counts):
+    bits = np.left_shift(np.uint16(1), np.arange(counts.shape[1], dtype=np.uint16))
+    return ((counts > 0).astype(np.uint16) @ bits).astype(np.uint16)
+
+
+# Codificação compacta da coluna Type_of_Loan.
+class EncodeTypeOfLoan(BaseTransformer):
+
+    """
+    Substitui a lista de tipos de empréstimo (ex.: "Auto Loan, Student Loan, and Payday Loan") por uma máscara de bits
+    uint16, em que o bit i indica a presença do tipo loan_types[i]. A lista é separada uma única vez por valor distinto
+    e o resultado é distribuído pelas linhas, o que reduz a memória da coluna em mais de uma ordem de grandeza e torna
+    os filtros e agregações por tipo operações com inteiros (ex.: X[column_name] & etapa.loan_mask('Auto Loan') != 0).
+
+    Valores nulos e tipos fora do vocabulário não ativam nenhum bit. Como o DTYPE_PLAN converte o Type_of_Loan para
+    category, a etapa deve ser aplicada após o OptimizeDtypes.
+
+    Parâmetros:
+    column_name: str (default='Type_of_Loan')
+        Nome da coluna com a lista de tipos.
+    loan_types: tuple of str (default=None)
+        Vocabulário fixo, com até 16 tipos. Quando None utiliza o LOAN_TYPES.
+    count_columns: bool (default=False)
+        Quando True cria uma coluna uint8 por tipo ({column_name}_{tipo}, ex.: Type_of_Loan_Auto_Loan) com a quantidade
+        de vezes que o tipo aparece na lista (a lista pode repetir o mesmo tipo).
+
+    Métodos:
+    fit: Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
+    transform: Aplica a codificação na coluna especificada.
+    loan_mask: Retorna a máscara com os bits dos tipos informados.
+    decode: Retorna a tupla de tipos de uma máscara.
+    indicator_matrix: Retorna a matriz esparsa de indicadores (linhas x tipos) a partir da coluna codificada.
+    """
+
+    def __init__(self, column_name='Type_of_Loan', loan_types=None, count_columns=False, copy=True):
+        self.column_name = column_name
+        self.loan_types = loan_types
+        self.count_columns = count_columns
+        self.copy = copy
+
+    def _vocabulary(self):
+        loan_types = LOAN_TYPES if self.loan_types is None else tuple(self.loan_types)
+        if len(loan_types) > 16:
+            raise ValueError(f'A máscara uint16 comporta até 16 tipos de empréstimo ({len(loan_types)} informados).')
+        return loan_types
+
+    def _count_column_names(self):
+        if not self.count_columns:
+            return []
+        return [f"{self.column_name}_{re.sub(r'[^0-9a-zA-Z]+', '_', loan_type).strip('_')}" for loan_type in self._vocabulary()]
+
+    def _output_columns(self):
+        return super()._output_columns() | set(self._count_column_names())
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
+
+        # Separando apenas os valores distintos; o código -1 (nulos) aponta para a última linha, sem nenhum tipo.
+        codes, uniques = pd.factorize(X_transformed[self.column_name])
+        counts = _loan_type_counts(np.asarray(uniques, dtype=object), self._vocabulary())
+        counts = np.vstack([counts, np.zeros((1, counts.shape[1]), dtype=np.uint8)])
+
+        X_transformed[self.column_name] = _loan_masks(counts)[codes]
+        for i, count_column in enumerate(self._count_column_names()):
+            X_transformed[count_column] = counts[codes, i]
+
+        return X_transformed
+
+    def loan_mask(self, *loan_types):
+
+        """
+        Retorna a máscara (int) com os bits dos tipos informados, para filtros como X[column_name] & mask != 0 (algum
+        dos tipos) ou X[column_name] & mask == mask (todos os tipos).
+        """
+
+        vocabulary = self._vocabulary()
+        mask = 0
+        for loan_type in loan_types:
+            if loan_type not in vocabulary:
+                raise ValueError(f'{loan_type!r} não faz parte do vocabulário de tipos de empréstimo.')
+            mask |= 1 << vocabulary.index(loan_type)
+        return mask
+
+    def decode(self, mask):
+
+        """
+        Retorna a tupla de tipos (na ordem do vocabulário) presentes em uma máscara.
+        """
+
+        return tuple(loan_type for i, loan_type in enumerate(self._vocabulary()) if int(mask) >> i & 1)
+
+    def indicator_matrix(self, X_transformed):
+
+        """
+        Retorna a matriz esparsa (scipy.sparse.csr_matrix, uint8) de indicadores com uma linha por linha do DataFrame
+        codificado e uma coluna por tipo do vocabulário.
+        """
+
+        masks = X_transformed[self.column_name].to_numpy(dtype=np.uint16)
+        rows, columns = np.nonzero((masks[:, None] >> np.arange(len(self._vocabulary()), dtype=np.uint16)) & 1)
+        return sparse.csr_matrix((np.ones(len(rows), dtype=np.uint8), (rows, columns)),
+                                 shape=(len(masks), len(self._vocabulary())))
+
+
+
+
+# VARIÁVEIS TEMPORAIS POR CLIENTE.
+
+
+# Estatísticas disponíveis nas janelas móveis (rolling) e acumuladas (expanding).
+ROLLING_STATISTICS = ('mean', 'sum', 'min', 'max', 'std', 'slope')
+EXPANDING_STATISTICS = ('mean', 'sum', 'min', 'max', 'count')
+
+# Quantidade de linhas de cada bloco de janelas, limitando a memória das janelas (linhas x colunas x tamanho da janela).
+_WINDOW_CHUNK = 65_536
+
+
+# Estatísticas das janelas (linhas x colunas x posições da janela, posições fora do cliente em NaN), ignorando os nulos
+# como o rolling do pandas: std com ddof=1 e slope como a inclinação da reta de mínimos quadrados pela posição na janela.
+def _window_statistics(windows, statistics, min_periods):
+    valid = ~np.isnan(windows)
+    count = valid.sum(axis=-1)
+    total = np.where(valid, windows, 0).sum(axis=-1)
+
+    results = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        deviations = np.where(valid, windows - mean[..., None], 0)
+        for statistic in statistics:
+            if statistic == 'mean':
+                value = mean
+            elif statistic == 'sum':
+                value = total
+            elif statistic == 'min':
+                value = np.where(count > 0, np.where(valid, windows, np.inf).min(axis=-1), np.nan)
+            elif statistic == 'max':
+                value = np.where(count > 0, np.where(valid, windows, -np.inf).max(axis=-1), np.nan)
+            elif statistic == 'std':
+                value = np.where(count > 1, np.sqrt((deviations ** 2).sum(axis=-1) / (count - 1)), np.nan)
+            else:
+                positions = np.arange(windows.shape[-1], dtype=np.float64)
+                position_mean = np.where(valid, positions, 0).sum(axis=-1) / count
+                position_deviations = np.where(valid, positions - position_mean[..., None], 0)
+                value = np.where(count > 1, (position_deviations * deviations).sum(axis=-1) / (position_deviations ** 2).sum(axis=-1), np.nan)
+            results[statistic] = np.where(count >= min_periods, value, np.nan)
+    return results
+
+
+# Varredura acumulada (ufunc.accumulate) reiniciada a cada cliente, com log2(maior cliente) passadas vetorizadas:
+# na passada com deslocamento s cada linha combina o seu valor com o da linha s posições antes, quando do mesmo cliente.
+def _segmented_accumulate(ufunc, values, positions):
+    result = values.copy()
+    shift = 1
+    max_position = positions.max(initial=0)
+    while shift <= max_position:
+        rows = np.flatnonzero(positions >= shift)
+        result[rows] = ufunc(result[rows], result[rows - shift])
+        shift *= 2
+    return result
+
+
+# Variáveis temporais (janelas móveis, defasagens, diferenças e acumulados) por cliente.
+class CreateRollingFeatures(BaseTransformer):
+
+    """
+    Cria variáveis temporais a partir das linhas mensais de cada Customer_ID: estatísticas em janelas móveis das
+    últimas linhas (rolling), valores defasados (lag), diferenças para meses anteriores (diff) e estatísticas acumuladas
+    desde o primeiro mês do cliente (expanding), para várias colunas ao mesmo tempo.
+
+    As linhas são ordenadas uma única vez pelo Customer_ID e pela coluna de ordem (Number_Month, criada pelo
+    CreateMonthNumberColumn; quando as linhas já estão em ordem dentro de cada cliente a ordenação do agrupamento é
+    reaproveitada) e as janelas são visões do NumPy (sliding_window_view) sobre a matriz ordenada das colunas, com as
+    posições de outros clientes em NaN, sem o groupby().rolling() nem callbacks Python por cliente. Os acumulados são
+    calculados por varreduras vetorizadas reiniciadas a cada cliente.
+
+    As janelas contam linhas (como o rolling do pandas com janela inteira) e ignoram valores nulos. O resultado tem a
+    mesma ordem das linhas do DataFrame recebido e as novas colunas são float64 ({coluna}_rolling{janela}_{estatística},
+    {coluna}_lag{k}, {coluna}_diff{k} e {coluna}_expanding_{estatística}). Linhas sem Customer_ID recebem NaN.
+
+    Parâmetros:
+    column_names: list of str
+        Colunas numéricas utilizadas (ex.: Num_of_Delayed_Payment, Outstanding_Debt, Credit_Utilization_Ratio).
+    windows: tuple of int (default=(3,))
+        Tamanhos das janelas móveis, em linhas (meses) do cliente, incluindo a linha atual.
+    statistics: tuple of str (default=('mean',))
+        Estatísticas de cada janela móvel: 'mean', 'sum', 'min', 'max', 'std' ou 'slope' (tendência: inclinação da reta
+        de mínimos quadrados por mês).
+    lags: tuple of int (default=(1,))
+        Defasagens, em linhas do cliente (lag 1 = valor do mês anterior).
+    diffs: tuple of int (default=(1,))
+        Diferenças entre o valor atual e o valor k linhas antes (diff 1 = variação mês a mês).
+    expanding: tuple of str (default=())
+        Estatísticas acumuladas: 'mean', 'sum', 'min', 'max' ou 'count' (quantidade de valores não nulos).
+    order_column: str (default='Number_Month')
+        Coluna numérica com a ordem dos meses de cada cliente. Quando None utiliza a ordem das linhas.
+    min_periods: int (default=None)
+        Quantidade mínima de valores não nulos na janela para calcular a estatística. Quando None utiliza o tamanho da
+        janela (igual ao rolling do pandas).
+
+    Métodos:
+    fit: Método utilizado para conformidade com o pipeline do Scikit-Learn. Não realiza nenhuma ação.
+    transform: Cria as novas colunas no DataFrame.
+    """
+
+    _scope = 'customer'
+    _extra_inputs = ('Customer_ID',)
+    _idempotent = True
+
+    def __init__(self, column_names, windows=(3,), statistics=('mean',), lags=(1,), diffs=(1,), expanding=(),
+                 order_column='Number_Month', min_periods=None, copy=True):
+        self.column_names = column_names
+        self.windows = windows
+        self.statistics = statistics
+        self.lags = lags
+        self.diffs = diffs
+        self.expanding = expanding
+        self.order_column = order_column
+        self.min_periods = min_periods
+        self.copy = copy
+
+    def _validate(self):
+        for name, values, allowed in (('statistics', self.statistics, ROLLING_STATISTICS), ('expanding', self.expanding, EXPANDING_STATISTICS)):
+            unknown = [value for value in values if value not in allowed]
+            if unknown:
+                raise ValueError(f'{name} aceita apenas {allowed} (recebido {unknown}).')
+        for name, values in (('windows', self.windows), ('lags', self.lags), ('diffs', self.diffs)):
+            if any(int(value) < 1 for value in values):
+                raise ValueError(f'{name} deve conter apenas inteiros maiores que 0 (recebido {tuple(values)}).')
+
+    def _feature_names(self):
+        names = []
+        for column_name in self.column_names:
+            names += [f'{column_name}_rolling{window}_{statistic}' for window in self.windows for statistic in self.statistics]
+            names += [f'{column_name}_lag{lag}' for lag in self.lags]
+            names += [f'{column_name}_diff{diff}' for diff in self.diffs]
+            names += [f'{column_name}_expanding_{statistic}' for statistic in self.expanding]
+        return names
+
+    def _input_columns(self):
+        return super()._input_columns() | ({self.order_column} if self.order_column is not None else set())
+
+    def _output_columns(self):
+        return set(self._feature_names())
+
+    def fit(self, X, y=None):
+        return self
+
+    def _sort_order(self, X, groups):
+        # Ordem das linhas por cliente e mês; a ordenação estável do agrupamento já serve quando os meses estão em ordem.
+        if self.order_column is None:
+            return groups.order
+        months = X[self.order_column].to_numpy(dtype=np.float64, na_value=np.nan)
+        sorted_months = months[groups.order]
+        if np.all((np.diff(sorted_months) >= 0) | (np.diff(groups.sorted_codes) != 0)):
+            return groups.order
+        return np.lexsort((months, groups.codes))
+
+    def transform(self, X):
+        self._validate()
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) para evitar modificar o original.
+
+        # Ordenando as linhas uma única vez e calculando a posição de cada linha dentro do seu cliente.
+        groups = _customer_groups(X_transformed)
+        order = self._sort_order(X_transformed, groups)
+        codes = groups.codes[order]
+        positions = np.arange(len(codes)) - np.searchsorted(codes, codes)
+        values = np.column_stack([X_transformed[column_name].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+                                  for column_name in self.column_names]) if len(self.column_names) else np.empty((len(codes), 0))
+        n_rows, n_columns = values.shape
+
+        # Variáveis de cada tipo para todas as colunas de uma vez: {nome do tipo: matriz (linhas x colunas)}.
+        features = {}
+        for window in self.windows:
+            min_periods = window if self.min_periods is None else self.min_periods
+            # Janela de cada linha: a linha e as window - 1 anteriores (uma linha a mais de NaN para aceitar DataFrames vazios).
+            padded = np.vstack([np.full((window, n_columns), np.nan), values])
+            view = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)[1:]  # (linhas x colunas x janela)
+            results = {statistic: np.empty((n_rows, n_columns)) for statistic in self.statistics}
+            for start in range(0, n_rows, _WINDOW_CHUNK):
+                stop = min(start + _WINDOW_CHUNK, n_rows)
+                # Posições da janela anteriores ao primeiro mês do cliente pertencem a outro cliente.
+                inside = np.arange(window) >= (window - 1 - positions[start:stop, None])
+                windows = np.where(inside[:, None, :], view[start:stop], np.nan)
+                for statistic, result in _window_statistics(windows, self.statistics, min_periods).items():
+                    results[statistic][start:stop] = result
+            features.update({f'rolling{window}_{statistic}': result for statistic, result in results.items()})
+
+        for shift in set(self.lags) | set(self.diffs):
+            # Defasagens maiores que o DataFrame (ex.: lotes pequenos) ficam inteiras em NaN.
+            lagged = np.full((n_rows, n_columns), np.nan)
+            if shift < n_rows:
+                lagged[shift:] = values[:n_rows - shift]
+                lagged[positions < shift] = np.nan
+            features[f'lag{shift}'] = lagged
+            features[f'diff{shift}'] = values - lagged
+
+        if self.expanding:
+            valid = ~np.isnan(values)
+            count = _segmented_accumulate(np.add, valid.astype(np.float64), positions)
+            total = _segmented_accumulate(np.add, np.where(valid, values, 0), positions)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                accumulated = {'count': count, 'sum': np.where(count > 0, total, np.nan), 'mean': total / count}
+            if 'min' in self.expanding:
+                accumulated['min'] = np.where(count > 0, _segmented_accumulate(np.minimum, np.where(valid, values, np.inf), positions), np.nan)
+            if 'max' in self.expanding:
+                accumulated['max'] = np.where(count > 0, _segmented_accumulate(np.maximum, np.where(valid, values, -np.inf), positions), np.nan)
+            features.update({f'expanding_{statistic}': accumulated[statistic] for statistic in self.expanding})
+
+        # Montando as novas colunas na ordem dos nomes e voltando para a ordem original das linhas.
+        kinds = ([f'rolling{window}_{statistic}' for window in self.windows for statistic in self.statistics]
+                 + [f'lag{lag}' for lag in self.lags] + [f'diff{diff}' for diff in self.diffs]
+                 + [f'expanding_{statistic}' for statistic in self.expanding])
+        output = np.empty((n_rows, len(kinds) * n_columns))
+        for j in range(n_columns):
+            for i, kind in enumerate(kinds):
+                output[order, j * len(kinds) + i] = features[kind][:, j]
+        output[groups.codes < 0] = np.nan
+
+        feature_names = self._feature_names()
+        if feature_names:
+            X_transformed[feature_names] = output
+
+        return X_transformed
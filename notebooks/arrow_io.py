@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+# --------------------------------------------------------------------- #
+import ETL
+
+
+
+
+# Coluna criada na escrita particionada pelo hash do Customer_ID.
+BUCKET_COLUMN = 'Customer_Bucket'
+
+
+# Colunas lidas ou escritas pelas etapas de um pipeline.
+def pipeline_columns(pipeline):
+
+    """
+    Retorna o conjunto de colunas utilizadas pelas etapas do pipeline (_input_columns e _output_columns de cada etapa).
+    Retorna None quando alguma etapa não herda de BaseTransformer, pois as colunas dela não são conhecidas.
+
+    Parâmetros:
+    pipeline: Pipeline
+        Pipeline (ETLPipeline ou Pipeline do Scikit-Learn) com as etapas do ETL.
+    """
+
+    columns = set()
+    for _, step in pipeline.steps:
+        if step in (None, 'passthrough'):
+            continue
+        if not isinstance(step, ETL.BaseTransformer):
+            return None
+        columns |= step._input_columns() | step._output_columns()
+    return columns
+
+
+# Leitura de Parquet com projeção de colunas.
+def read_parquet(path, columns=None, pipeline=None, extra_columns=(), string_dtype=False, memory_map=True, **read_kwargs):
+
+    """
+    Lê um arquivo (ou diretório particionado) Parquet para um DataFrame.
+
+    Com pipeline, apenas as colunas utilizadas pelas etapas (mais extra_columns, ex.: ID e Credit_Score) são lidas do
+    arquivo. Com memory_map=True o arquivo é mapeado em memória em vez de copiado, de forma que leituras repetidas do
+    mesmo extrato aproveitam o cache de páginas do sistema operacional.
+
+    Parâmetros:
+    path: str
+        Caminho do arquivo ou diretório Parquet.
+    columns: list of str (default=None)
+        Colunas a serem lidas. Quando None (e sem pipeline) lê todas as colunas.
+    pipeline: Pipeline (default=None)
+        Pipeline utilizado para a projeção de colunas.
+    extra_columns: list of str
+        Colunas lidas além das utilizadas pelo pipeline.
+    string_dtype: bool (default=False)
+        Quando True as colunas de texto são lidas como string[pyarrow], formato mantido pelo TransformToNull e pelo
+        CleaningNotNumbers. Quando False são lidas como object, igual ao pd.read_csv.
+    memory_map: bool (default=True)
+        Utiliza memory map na leitura.
+    read_kwargs:
+        Argumentos repassados para o pyarrow.parquet.read_table (ex.: filters).
+    """
+
+    if pipeline is not None and columns is None:
+        used = pipeline_columns(pipeline)
+        if used is not None:
+            # Mantendo a ordem das colunas do arquivo; colunas criadas pelo pipeline não existem no arquivo.
+            schema_names = pq.ParquetDataset(path, memory_map=memory_map).schema.names
+            columns = [column_name for column_name in schema_names if column_name in used or column_name in extra_columns]
+
+    table = pq.read_table(path, columns=columns, memory_map=memory_map, **read_kwargs)
+
+    types_mapper = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}.get if string_dtype else None
+    return table.to_pandas(types_mapper=types_mapper)
+
+
+# Escrita de Parquet, opcionalmente particionada.
+def write_parquet(X, path, partition_by=None, n_buckets=16, **write_kwargs):
+
+    """
+    Escreve o DataFrame em Parquet.
+
+    Parâmetros:
+    X: pandas.DataFrame
+        DataFrame a ser escrito (ex.: resultado do pipeline).
+    path: str
+        Caminho do arquivo (sem partição) ou do diretório (com partição).
+    partition_by: str (default=None)
+        None para um único arquivo, o nome de uma coluna (ex.: 'Month') para um diretório por valor, ou 'customer_hash' para
+        particionar pelo hash do Customer_ID em n_buckets diretórios (coluna Customer_Bucket), mantendo todos os meses de
+        um cliente na mesma partição.
+    n_buckets: int (default=16)
+        Quantidade de partições quando partition_by='customer_hash'.
+    write_kwargs:
+        Argumentos repassados para o pyarrow.parquet (ex.: compression).
+    """
+
+    if partition_by is None:
+        pq.write_table(pa.Table.from_pandas(X, preserve_index=False), path, **write_kwargs)
+        return path
+
+    if partition_by == 'customer_hash':
+        buckets = pd.util.hash_pandas_object(X['Customer_ID'], index=False).to_numpy() % n_buckets
+        X = X.assign(**{BUCKET_COLUMN: buckets.astype(np.int32)})
+        partition_by = BUCKET_COLUMN
+
+    os.makedirs(path, exist_ok=True)
+    pq.write_to_dataset(pa.Table.from_pandas(X, preserve_index=False), path, partition_cols=[partition_by], **write_kwargs)
+    return path
+
+
+# Conversão do CSV para Parquet, feita uma única vez por extrato.
+def csv_to_parquet(csv_path, parquet_path, partition_by=None, n_buckets=16, **read_csv_kwargs):
+
+    """
+    Lê o CSV com o pandas (mesma inferência de tipos do pipeline original) e grava em Parquet, para que as execuções
+    seguintes não paguem a leitura do CSV e a inferência dos tipos novamente.
+
+    Parâmetros:
+    csv_path: str
+        Caminho do CSV (ex.: ../data/d01_raw/train.csv).
+    parquet_path: str
+        Caminho de saída.
+    partition_by, n_buckets:
+        Repassados para o write_parquet.
+    read_csv_kwargs:
+        Argumentos repassados para o pd.read_csv.
+    """
+
+    return write_parquet(pd.read_csv(csv_path, **read_csv_kwargs), parquet_path, partition_by, n_buckets)
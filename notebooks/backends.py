@@ -0,0 +1,859 @@
+import os
+import uuid
+from contextlib import nullcontext
+from math import ceil
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.utils.validation import check_is_fitted
+# --------------------------------------------------------------------- #
+import ETL
+import parallel
+
+try:
+    import polars as pl
+except ImportError:  # polars é opcional, necessário apenas para o PolarsBackend.
+    pl = None
+
+try:
+    import dask
+    import dask.dataframe as dd
+except ImportError:  # dask é opcional, necessário apenas para o DaskBackend.
+    dask = dd = None
+
+try:
+    import numba
+except ImportError:  # numba é opcional: sem ele o NumbaBackend executa as etapas no pandas.
+    numba = None
+
+
+
+
+# Coluna auxiliar com a posição de cada linha, usada no desempate por primeira ocorrência e para manter a ordem das linhas.
+ROW_ID = '__row_id__'
+
+# Prefixo dos números guardados em colunas de texto do polars. No pandas o CleaningMissingDelayedPayment mistura str e
+# int na mesma coluna object (nulos viram 0); no polars a coluna continua String e os números recebem este prefixo.
+_NUMBER_MARK = '\x00'
+
+
+# Codifica um valor de uma coluna object do pandas (str ou número) para uma coluna String do polars.
+def _encode(value):
+    return value if isinstance(value, str) else f'{_NUMBER_MARK}{value}'
+
+
+# Decodifica os números marcados com _NUMBER_MARK de volta para int/float.
+def _decode(values):
+    def decode(value):
+        if isinstance(value, str) and value.startswith(_NUMBER_MARK):
+            return pd.to_numeric(value[len(_NUMBER_MARK):])
+        return value
+    return values.map(decode) if values.dtype == object else values
+
+
+# Valor escalar para uma expressão do polars (NaN vira null, que é o nulo utilizado em todas as colunas do backend).
+def _literal(value):
+    return None if pd.isna(value) else value
+
+
+# Tradução de cada transformador do ETL para expressões do polars. Cada função recebe a etapa, o LazyFrame, se a etapa
+# deve ser ajustada e o backend (para materializar as agregações do fit) e retorna o LazyFrame transformado. O estado
+# aprendido no fit é gravado nos mesmos atributos da classe do pandas, então a etapa ajustada também serve no pandas.
+
+def _polars_transform_to_null(step, frame, fit, backend):
+    schema = frame.collect_schema()
+    expressions = []
+    for column_name in step.column_names:
+        if schema[column_name] != pl.String:
+            continue
+        patterns = ETL._SPECIAL_CHARS if column_name in ('SSN', 'Payment_Behaviour') else ETL._SPECIAL_CHARS_ONLY
+        column = pl.col(column_name)
+        is_null = column.str.contains(patterns[1]) | (column.str.strip_chars() == '')
+        expressions.append(pl.when(is_null).then(None).otherwise(column).alias(column_name))
+    return frame.with_columns(expressions)
+
+
+def _polars_credit_card(step, frame, fit, backend):
+    column = pl.col(step.column_name)
+    return frame.with_columns(pl.when(column <= 0).then(1).otherwise(column).alias(step.column_name))
+
+
+def _polars_type_of_loan(step, frame, fit, backend):
+    return frame.with_columns(pl.col(step.column_name).fill_null("Not Specified"))
+
+
+def _polars_delayed_payment(step, frame, fit, backend):
+    column_name = step.column_name
+    schema = frame.collect_schema()
+    text = schema[column_name] == pl.String
+    zero, one = (_encode(0), _encode(1)) if text else (0, 1)
+    values = pl.col(column_name).fill_null(zero)
+    customer = pl.col('Customer_ID')
+
+    if fit:
+        frame = backend._checkpoint(frame)
+        query = (frame.filter(customer.is_not_null())
+                 .group_by('Customer_ID', values.alias('value'))
+                 .agg(pl.len().alias('count'), pl.col(ROW_ID).min().alias('first_row')))
+        step.customer_modes_ = _modes_from_counts(backend._collect(query).to_pandas(), text)
+        step.global_mode_ = ETL._first_mode(step.customer_modes_)
+    check_is_fitted(step)
+
+    encode = _encode if text else _literal
+    mode = customer.replace_strict(list(step.customer_modes_.index), [encode(value) for value in step.customer_modes_],
+                                   default=encode(step.global_mode_))
+
+    # (coluna == 0) & Delay_from_due_date > 0: o & é avaliado antes do >. Com Delay_from_due_date inteiro o & é bit a bit
+    # (apenas valores ímpares), com float é o "e" lógico (valores diferentes de 0 e não nulos).
+    delay = pl.col('Delay_from_due_date')
+    delayed = (delay % 2 != 0) if schema['Delay_from_due_date'].is_integer() else (delay.fill_nan(0) != 0)
+
+    filled = pl.when(values == zero).then(mode).otherwise(values)
+    return frame.with_columns(pl.when((filled == zero) & delayed).then(pl.lit(one)).otherwise(filled).alias(column_name))
+
+
+# Moda de cada cliente a partir das contagens (Customer_ID, value, count, first_row), com o desempate da Series.mode:
+# menor valor ou, quando as modas empatadas misturam números e str, a primeira ocorrência.
+def _modes_from_counts(table, text):
+    table = table[table['count'] == table.groupby('Customer_ID')['count'].transform('max')]
+    if text:
+        is_number = table['value'].str.startswith(_NUMBER_MARK)
+        mixed = is_number.groupby(table['Customer_ID']).transform('nunique') > 1
+    else:
+        mixed = pd.Series(False, index=table.index)
+
+    by_value = table[~mixed].sort_values(['Customer_ID', 'value'], kind='stable')
+    by_row = table[mixed].sort_values(['Customer_ID', 'first_row'], kind='stable')
+    modes = pd.concat([by_value, by_row]).drop_duplicates('Customer_ID').set_index('Customer_ID')['value']
+    return _decode(modes.sort_index().rename_axis(None).rename(0))
+
+
+def _polars_monthly_salary(step, frame, fit, backend):
+    column_name = step.column_name
+    customer = pl.col('Customer_ID')
+
+    if fit:
+        frame = backend._checkpoint(frame)
+        query = frame.filter(customer.is_not_null()).group_by('Customer_ID').agg(pl.col(column_name).median())
+        medians = backend._collect(query).to_pandas().set_index('Customer_ID')[column_name]
+        step.customer_medians_ = medians.astype(np.float64).sort_index().rename_axis(None)
+        step.global_median_ = step.customer_medians_.median()
+    check_is_fitted(step)
+
+    median = customer.replace_strict(list(step.customer_medians_.index), step.customer_medians_.tolist(),
+                                     default=step.global_median_, return_dtype=pl.Float64).fill_nan(None)
+    column = pl.col(column_name)
+    return frame.with_columns(pl.when(column.is_null()).then(median).otherwise(column).alias(column_name))
+
+
+def _polars_num_bank_accounts(step, frame, fit, backend):
+    column, customer = pl.col(step.column_name), pl.col('Customer_ID')
+    replace = (column <= 0) & customer.is_not_null()
+    return frame.with_columns(pl.when(replace).then(pl.len().over(customer)).otherwise(column).alias(step.column_name))
+
+
+# Contagens de valores (igual ao value_counts do pandas) de várias colunas, materializadas em uma única execução.
+def _value_counts(backend, frame, column_names):
+    queries = [frame.select(pl.col(column_name)).drop_nulls().group_by(column_name).agg(pl.len().alias('count'))
+               for column_name in column_names]
+    counts = {}
+    for column_name, table in zip(column_names, backend._collect_all(queries)):
+        table = table.to_pandas()
+        series = pd.Series(table['count'].to_numpy(np.int64), index=pd.Index(table[column_name], name=column_name), name='count')
+        counts[column_name] = series.sort_values(ascending=False, kind='stable')
+    return counts
+
+
+def _polars_monthly_balance(step, frame, fit, backend):
+    if fit:
+        frame = backend._checkpoint(frame)
+        step._reset()
+        step._update_counts(_value_counts(backend, frame, [step.column_name])[step.column_name])
+    check_is_fitted(step)
+    return frame.with_columns(pl.col(step.column_name).fill_null(_literal(step.mode_)))
+
+
+def _polars_missing_values(step, frame, fit, backend):
+    # bfill seguido de ffill dentro de cada cliente; linhas sem Customer_ID são mantidas.
+    customer = pl.col('Customer_ID')
+    return frame.with_columns(
+        pl.when(customer.is_null()).then(pl.col(column_name))
+        .otherwise(pl.col(column_name).backward_fill().forward_fill().over(customer)).alias(column_name)
+        for column_name in step.column_names)
+
+
+def _polars_not_numbers(step, frame, fit, backend):
+    schema = frame.collect_schema()
+    expressions = []
+    for column_name in step.column_names:
+        column = pl.col(column_name)
+        if schema[column_name] == pl.String:
+            # Os números guardados na coluna de texto não são str no pandas e viram NaN.
+            digits = pl.when(column.str.starts_with(_NUMBER_MARK)).then(None).otherwise(column.str.replace_all(ETL._NOT_DIGITS[1], ''))
+            expressions.append(pl.when(digits == '').then(None).otherwise(digits).cast(pl.Float64).alias(column_name))
+        else:
+            expressions.append(column.abs())
+    return frame.with_columns(expressions)
+
+
+def _polars_modify_month(step, frame, fit, backend):
+    column_name, column, customer = step.column_name, pl.col(step.column_name), pl.col('Customer_ID')
+    month_number = pl.int_range(pl.len()).over(customer) + 1
+    head, tail = column.str.extract(step._pattern, 1), column.str.extract(step._pattern, 2)
+
+    expressions = [pl.when(head.is_not_null())
+                   .then(pl.concat_str([head, pl.lit(' and '), month_number.cast(pl.String), tail]))
+                   .otherwise(column).alias(column_name)]
+    if step.add_numeric_columns:
+        expressions.append(head.str.extract(r'(\d+)', 1).cast(pl.Float64, strict=False).alias(f'{column_name}_Years'))
+        expressions.append(pl.when(head.is_not_null()).then(month_number).cast(pl.Float64).alias(f'{column_name}_Months'))
+
+    # Ordenando pelo Customer_ID (ordenação estável) e descartando linhas sem Customer_ID; as posições são renumeradas.
+    frame = frame.with_columns(expressions).filter(customer.is_not_null()).sort('Customer_ID', maintain_order=True)
+    return frame.drop(ROW_ID).with_row_index(ROW_ID)
+
+
+def _polars_credit_history_date(step, frame, fit, backend):
+    if fit:
+        step.fit(None)  # O mês de referência não depende dos dados.
+    check_is_fitted(step)
+    column = pl.col(step.column_name)
+    years = column.str.extract(step._pattern, 1).cast(pl.Int64, strict=False)
+    months = step.reference_month_ - (years * 12 + column.str.extract(step._pattern, 2).cast(pl.Int64, strict=False))
+    date = pl.date(months // 12, months % 12 + 1, 1).cast(pl.Datetime('ns'))
+    return frame.with_columns(date.alias('Credit_History_Age_Date'))
+
+
+def _polars_month_number(step, frame, fit, backend):
+    month = pl.col(step.column_name).str.to_lowercase().replace_strict(step.month_dic, default=None, return_dtype=pl.Int64)
+    return frame.with_columns(month.alias('Number_Month'))
+
+
+def _polars_binary_values(step, frame, fit, backend):
+    return frame.with_columns(pl.col(step.column_name).replace_strict(step.binary_dic, default=None, return_dtype=pl.Int64))
+
+
+def _polars_convert_numeric(step, frame, fit, backend):
+    schema = frame.collect_schema()
+    return frame.with_columns(pl.col(column_name).cast(pl.Float64, strict=False)
+                              for column_name in step.column_names if schema[column_name] == pl.String)
+
+
+def _polars_quantile(step, frame, fit, backend):
+    if fit:
+        frame = backend._checkpoint(frame)
+        step._reset()
+        step._update_counts(_value_counts(backend, frame, step.column_names))
+    check_is_fitted(step)
+
+    expressions = []
+    for column_name, upper_bound in step.upper_bounds_.items():
+        if not np.isnan(upper_bound):
+            column = pl.col(column_name)
+            expressions.append(pl.when(column > upper_bound).then(ceil(upper_bound)).otherwise(column).alias(column_name))
+    return frame.with_columns(expressions)
+
+
+def _polars_mode(step, frame, fit, backend):
+    if fit:
+        frame = backend._checkpoint(frame)
+        step._reset()
+        step._update_counts(_value_counts(backend, frame, step.column_names))
+    check_is_fitted(step)
+
+    expressions = []
+    for column_name in step.column_names:
+        column = pl.col(column_name)
+        mode = _literal(step.modes_[column_name])
+        expressions.append(pl.when(column >= step._limit(column_name)).then(mode).otherwise(column).alias(column_name))
+    return frame.with_columns(expressions)
+
+
+def _polars_num_credit_inquires(step, frame, fit, backend):
+    column_name, column, customer = step.column_name, pl.col(step.column_name), pl.col('Customer_ID')
+
+    # Contagem de cada valor no cliente, valores empatados na maior contagem e as duas menores modas (mesma ordem da
+    # Series.mode). As janelas são calculadas em etapas, pois o polars não aceita uma janela dentro de outra.
+    count, mode = pl.col('__count__'), pl.col('__mode__')
+    frame = frame.with_columns(pl.when(column.is_not_null()).then(pl.len().over(customer, column)).alias('__count__'))
+    frame = frame.with_columns(pl.when(count == count.max().over(customer)).then(column).alias('__mode__'))
+    frame = frame.with_columns(mode.min().over(customer).alias('__mode0__'),
+                               mode.drop_nulls().n_unique().over(customer).alias('__n_modes__'))
+    frame = frame.with_columns(pl.when(mode > pl.col('__mode0__')).then(mode).min().over(customer).alias('__mode1__'))
+
+    # Segunda moda quando o Customer_ID é multimodal, senão a moda quando ela for menor ou igual a 20, senão mantém o valor.
+    value = (pl.when(customer.is_null()).then(column)
+             .when(pl.col('__n_modes__') > 1).then(pl.col('__mode1__'))
+             .when(pl.col('__mode0__') <= 20).then(pl.col('__mode0__'))
+             .otherwise(column))
+    return frame.with_columns(value.alias(column_name)).drop('__count__', '__mode__', '__mode0__', '__n_modes__', '__mode1__')
+
+
+# Traduções disponíveis para cada transformador do ETL.
+_POLARS_TRANSLATORS = {
+    ETL.TransformToNull: _polars_transform_to_null,
+    ETL.CleaningMissingCreditCard: _polars_credit_card,
+    ETL.CleaningMissingTypeOfLoan: _polars_type_of_loan,
+    ETL.CleaningMissingDelayedPayment: _polars_delayed_payment,
+    ETL.CleaningMissingMonthlySalary: _polars_monthly_salary,
+    ETL.CleaningNumBankAccounts: _polars_num_bank_accounts,
+    ETL.CleaningMissingMonthlyBalance: _polars_monthly_balance,
+    ETL.CleaningMissingValues: _polars_missing_values,
+    ETL.CleaningNotNumbers: _polars_not_numbers,
+    ETL.ModifyMonthCreditHistory: _polars_modify_month,
+    ETL.CreateDateCreditHistoryColumn: _polars_credit_history_date,
+    ETL.CreateMonthNumberColumn: _polars_month_number,
+    ETL.TransformToBinaryValues: _polars_binary_values,
+    ETL.ConvertDtypeToNumeric: _polars_convert_numeric,
+    ETL.TreatingOutliersWithQuantile: _polars_quantile,
+    ETL.TreatingOutliersWithMode: _polars_mode,
+    ETL.TreatingOutliersNumCreditInquires: _polars_num_credit_inquires,
+}
+
+
+# Compila a função com o numba (quando instalado). Sem o numba a função não é utilizada (ver NumbaBackend).
+def _jit(function):
+    return numba.njit(cache=True, nogil=True)(function) if numba is not None else function
+
+
+# Os núcleos recebem arrays do NumPy com as linhas ordenadas pelo Customer_ID e o início de cada cliente (offsets): as
+# linhas do cliente g ficam entre offsets[g] e offsets[g + 1].
+
+@_jit
+def _sorted_group_modes(values, offsets):
+    # Posições (em values) das duas primeiras modas de cada cliente, com o desempate da Series.mode (menores valores), e
+    # a quantidade de modas empatadas. Valores NaN são ignorados e clientes sem valores recebem a posição -1.
+    n_groups = len(offsets) - 1
+    first = np.full(n_groups, -1, dtype=np.int64)
+    second = np.full(n_groups, -1, dtype=np.int64)
+    n_modes = np.zeros(n_groups, dtype=np.int64)
+
+    for g in range(n_groups):
+        start, end = offsets[g], offsets[g + 1]
+        order = np.argsort(values[start:end]) + start  # Valores NaN ficam no final.
+        best, i = 0, 0
+        while i < end - start and not np.isnan(values[order[i]]):
+            j = i + 1
+            while j < end - start and values[order[j]] == values[order[i]]:
+                j += 1
+            if j - i > best:
+                best, first[g], second[g], n_modes[g] = j - i, order[i], -1, 1
+            elif j - i == best:
+                n_modes[g] += 1
+                if n_modes[g] == 2:
+                    second[g] = order[i]
+            i = j
+    return first, second, n_modes
+
+
+@_jit
+def _group_size_rows(values, codes, sizes):
+    # Linhas com valor menor ou igual a 0 (e com Customer_ID) e a quantidade de linhas do seu cliente.
+    replace = np.zeros(len(values), dtype=np.bool_)
+    group_size = np.zeros(len(values), dtype=np.int64)
+    for i in range(len(values)):
+        if codes[i] >= 0 and values[i] <= 0:
+            replace[i] = True
+            group_size[i] = sizes[codes[i]]
+    return replace, group_size
+
+
+@_jit
+def _delayed_payment_rows(values, modes, delay):
+    # Linhas com valor 0 (recebem a moda do cliente) e linhas que, após a moda, recebem 1. A segunda condição repete a
+    # precedência do pandas em (valor == 0) & delay > 0: o & bit a bit com o atraso é verdadeiro apenas para atrasos ímpares.
+    use_mode = np.zeros(len(values), dtype=np.bool_)
+    use_one = np.zeros(len(values), dtype=np.bool_)
+    for i in range(len(values)):
+        value = values[i]
+        if value == 0:
+            use_mode[i] = True
+            value = modes[i]
+        use_one[i] = value == 0 and (delay[i] & 1) != 0
+    return use_mode, use_one
+
+
+# Verifica se a coluna possui um dtype numérico do NumPy (sem bool), aceito pelos núcleos.
+def _is_numpy_number(column):
+    return isinstance(column.dtype, np.dtype) and column.dtype.kind in 'iuf'
+
+
+# Início de cada cliente nas linhas ordenadas pelo Customer_ID (as linhas sem Customer_ID ficam antes de offsets[0]).
+def _customer_offsets(groups):
+    return np.searchsorted(groups.sorted_codes, np.arange(groups.n_groups + 1))
+
+
+# Duas primeiras modas de cada cliente (com o dtype da coluna) e a quantidade de modas, igual ao GroupStatistics.mode(n=2).
+def _kernel_modes(groups, column):
+    values = column.to_numpy()
+    first, second, n_modes = _sorted_group_modes(values.astype(np.float64)[groups.order], _customer_offsets(groups))
+
+    def take(positions):
+        rows = np.where(positions >= 0, groups.order[np.maximum(positions, 0)], -1) if len(groups.order) else positions
+        return pd.api.extensions.take(values, rows, allow_fill=True)
+    return take(first), take(second), n_modes
+
+
+# Versões das etapas por cliente com os núcleos do numba. Cada função recebe a etapa e o DataFrame, ajusta a etapa
+# (quando fit=True) e retorna o DataFrame transformado, ou None quando a etapa deve ser executada no pandas.
+
+def _numba_delayed_payment(step, X, fit):
+    column, delay = step._fill_zero(X[step.column_name]), X['Delay_from_due_date']
+    if not (_is_numpy_number(column) and isinstance(delay.dtype, np.dtype) and delay.dtype.kind in 'iu'):
+        return None
+
+    if fit:
+        groups = ETL._customer_groups(X)
+        step.customer_modes_ = pd.Series(_kernel_modes(groups, column)[0], index=groups.uniques, name=0)
+        step.global_mode_ = ETL._first_mode(step.customer_modes_)
+    check_is_fitted(step)
+    modes = ETL._lookup(X['Customer_ID'], step.customer_modes_, step.global_mode_)
+    if not (isinstance(modes.dtype, np.dtype) and modes.dtype.kind in 'iuf'):
+        return None
+
+    X_transformed = step._get_input(X)
+    X_transformed[step.column_name] = column
+    use_mode, use_one = _delayed_payment_rows(column.to_numpy(dtype=np.float64), modes.astype(np.float64),
+                                              delay.to_numpy(dtype=np.int64))
+    X_transformed.loc[use_mode, step.column_name] = pd.Series(modes, index=X_transformed.index)
+    X_transformed.loc[use_one, step.column_name] = 1
+    return X_transformed
+
+
+def _numba_num_bank_accounts(step, X, fit):
+    column = X[step.column_name]
+    if not _is_numpy_number(column):
+        return None
+
+    X_transformed = step._get_input(X)
+    groups = ETL._customer_groups(X_transformed)
+    replace, group_size = _group_size_rows(column.to_numpy(dtype=np.float64), groups.codes.astype(np.int64),
+                                           np.diff(_customer_offsets(groups)))
+    ETL._assign(X_transformed, replace, step.column_name, group_size[replace])
+    return X_transformed
+
+
+def _numba_num_credit_inquires(step, X, fit):
+    column = X[step.column_name]
+    if not _is_numpy_number(column):
+        return None
+
+    X_transformed = step._get_input(X)
+    groups = ETL._customer_groups(X_transformed)
+    first, second, n_modes = _kernel_modes(groups, column)
+
+    # Mesma regra do transformador: segunda moda quando multimodal, senão a moda quando ela for menor ou igual a 20.
+    multimodal = n_modes > 1
+    replace = multimodal | (first <= 20)
+    replacement = np.where(multimodal, second, first)
+
+    replace_rows = groups.broadcast(replace, fill_value=False).astype(bool)
+    ETL._assign(X_transformed, replace_rows, step.column_name, groups.broadcast(replacement)[replace_rows])
+    return X_transformed
+
+
+_NUMBA_KERNELS = {
+    ETL.CleaningMissingDelayedPayment: _numba_delayed_payment,
+    ETL.CleaningNumBankAccounts: _numba_num_bank_accounts,
+    ETL.TreatingOutliersNumCreditInquires: _numba_num_credit_inquires,
+}
+
+
+# Etapas do pipeline, sem as etapas desativadas (None ou 'passthrough').
+def _pipeline_steps(pipeline):
+    return [step for _, step in pipeline.steps if step not in (None, 'passthrough')]
+
+
+# Backend de referência: o próprio pipeline do pandas.
+class PandasBackend:
+
+    """
+    Executa o pipeline diretamente no pandas (em memória). Serve de referência para os demais backends.
+
+    Métodos:
+    fit / fit_transform / transform: Mesmo comportamento do pipeline.
+    to_pandas: Retorna o resultado como pandas.DataFrame.
+    """
+
+    def fit(self, pipeline, X):
+        return pipeline.fit(X)
+
+    def fit_transform(self, pipeline, X):
+        return pipeline.fit_transform(X)
+
+    def transform(self, pipeline, X):
+        return pipeline.transform(X)
+
+    def to_pandas(self, result):
+        return result
+
+
+# Execução do pipeline em LazyFrames do polars.
+class PolarsBackend:
+
+    """
+    Executa as etapas do pipeline do ETL como um plano lazy do polars (LazyFrame), com otimização da consulta
+    (projeção e filtros) e execução em streaming, para bases maiores que a memória.
+
+    Cada transformador do ETL possui uma tradução para expressões do polars (_POLARS_TRANSLATORS). O fit materializa
+    apenas as agregações necessárias (contagens de valores, moda e mediana por cliente) e grava o estado aprendido nos
+    mesmos atributos da classe do pandas, então o pipeline ajustado também pode ser utilizado no pandas. Etapas sem
+    tradução são executadas no pandas, com o DataFrame materializado.
+
+    Diferenças em relação ao pandas: colunas categóricas são lidas como String; o CleaningNotNumbers retorna Float64
+    (sem estouro em valores maiores que o int64) e converte a coluna mesmo quando nenhum valor contém números; o
+    ConvertDtypeToNumeric converte todas as colunas String informadas; os números que o CleaningMissingDelayedPayment
+    escreve em uma coluna de texto ficam marcados com _NUMBER_MARK (o to_pandas os converte de volta para int).
+
+    Parâmetros:
+    streaming: bool (default=True)
+        Quando True as consultas são executadas no modo streaming do polars.
+    spill_directory: str (default=None)
+        Diretório em que o resultado parcial é gravado em Parquet antes de cada fit que precisa dos dados, para que o
+        restante do plano leia o arquivo em vez de reprocessar as etapas anteriores. Quando None o plano é reprocessado.
+
+    Métodos:
+    fit: Ajusta as etapas do pipeline (materializando apenas as agregações).
+    fit_transform / transform: Retorna o LazyFrame com o plano das etapas.
+    to_pandas: Executa o plano e retorna o resultado como pandas.DataFrame.
+    """
+
+    def __init__(self, streaming=True, spill_directory=None):
+        if pl is None:
+            raise ImportError('O PolarsBackend necessita do polars (pip install polars).')
+        self.streaming = streaming
+        self.spill_directory = spill_directory
+
+    def _collect(self, frame):
+        if not self.streaming:
+            return frame.collect()
+        try:
+            return frame.collect(engine='streaming')
+        except (TypeError, ValueError):  # Versões anteriores do polars.
+            return frame.collect(streaming=True)
+
+    def _collect_all(self, frames):
+        return pl.collect_all(frames, streaming=self.streaming)
+
+    def _checkpoint(self, frame):
+        if self.spill_directory is None:
+            return frame
+        os.makedirs(self.spill_directory, exist_ok=True)
+        path = os.path.join(self.spill_directory, f'{uuid.uuid4().hex}.parquet')
+        try:
+            frame.sink_parquet(path)
+        except pl.exceptions.InvalidOperationError:  # Operações ainda não suportadas pelo sink (ex.: janelas).
+            self._collect(frame).write_parquet(path)
+        return pl.scan_parquet(path)
+
+    def _scan(self, X):
+        if isinstance(X, pd.DataFrame):
+            frame = pl.from_pandas(X).lazy()
+        elif isinstance(X, pl.DataFrame):
+            frame = X.lazy()
+        elif isinstance(X, pl.LazyFrame):
+            frame = X
+        elif str(X).endswith('.csv'):
+            frame = pl.scan_csv(X, infer_schema_length=None)
+        else:
+            frame = pl.scan_parquet(X)
+
+        # NaN e null são o mesmo nulo no pandas; no backend o nulo é sempre null.
+        frame = frame.with_columns(pl.col(pl.Categorical).cast(pl.String), pl.col(pl.Float32, pl.Float64).fill_nan(None))
+        return frame.with_row_index(ROW_ID)
+
+    def _run(self, pipeline, X, fit):
+        frame = self._scan(X)
+        for step in _pipeline_steps(pipeline):
+            translator = _POLARS_TRANSLATORS.get(type(step))
+            if translator is not None:
+                frame = translator(step, frame, fit, self)
+                continue
+
+            # Etapa sem tradução: executada no pandas com o resultado parcial materializado.
+            X_step = self.to_pandas(frame, keep_row_id=True)
+            X_step = step.fit_transform(X_step) if fit else step.transform(X_step)
+            frame = pl.from_pandas(X_step).lazy()
+        return frame.drop(ROW_ID)
+
+    def fit(self, pipeline, X):
+        self._run(pipeline, X, fit=True)
+        return pipeline
+
+    def fit_transform(self, pipeline, X):
+        return self._run(pipeline, X, fit=True)
+
+    def transform(self, pipeline, X):
+        return self._run(pipeline, X, fit=False)
+
+    def to_pandas(self, result, keep_row_id=False):
+        X = self._collect(result).to_pandas()
+        if keep_row_id is False and ROW_ID in X.columns:
+            X = X.drop(columns=ROW_ID)
+        for column_name in X.columns:
+            if X[column_name].dtype == object:
+                X[column_name] = _decode(X[column_name])
+        return X
+
+
+# Execução do pipeline em DataFrames do dask.
+class DaskBackend:
+
+    """
+    Executa as etapas do pipeline do ETL em um DataFrame do dask, com as partições divididas pelo Customer_ID.
+
+    O DataFrame é redistribuído (shuffle) pelo hash do Customer_ID, de forma que todas as linhas de um cliente ficam na
+    mesma partição, e cada partição é ordenada pela posição original das linhas. As próprias classes do pandas rodam em
+    cada partição; o ajuste segue as mesmas rodadas do ParallelETL: as etapas globais (e as etapas por cliente com
+    estado, como a moda de cada cliente) são ajustadas em cada partição (partial_fit) e combinadas com _merge antes de
+    transformar as partições. Com o shuffle em disco (shuffle_method='disk') e o scheduler de processos, a base não
+    precisa caber na memória.
+
+    O transform é lazy: retorna o DataFrame do dask com as etapas aplicadas em cada partição. A ordenação por Customer_ID
+    do ModifyMonthCreditHistory vale dentro de cada partição, não entre as partições.
+
+    Parâmetros:
+    npartitions: int (default=None)
+        Quantidade de partições. Quando None utiliza a quantidade de partições do DataFrame do dask (ou de núcleos).
+    customer_column: str
+        Coluna utilizada para particionar as linhas.
+    shuffle_method: str (default=None)
+        Método do shuffle do dask ('disk', 'tasks' ou None para o padrão do dask).
+    persist: bool (default=False)
+        Quando True as partições são mantidas (persist) ao final de cada rodada do fit, em vez de reprocessadas.
+    scheduler: str (default=None)
+        Scheduler do dask ('threads', 'processes', 'synchronous' ou None para o padrão).
+
+    Métodos:
+    fit: Ajusta as etapas do pipeline.
+    fit_transform / transform: Retorna o DataFrame do dask transformado (lazy).
+    to_pandas: Executa o DataFrame e retorna o resultado como pandas.DataFrame.
+    """
+
+    def __init__(self, npartitions=None, customer_column='Customer_ID', shuffle_method=None, persist=False, scheduler=None):
+        if dd is None:
+            raise ImportError('O DaskBackend necessita do dask (pip install "dask[dataframe]").')
+        self.npartitions = npartitions
+        self.customer_column = customer_column
+        self.shuffle_method = shuffle_method
+        self.persist = persist
+        self.scheduler = scheduler
+
+    def _object_strings(self):
+        # As colunas de texto continuam object (o dask converte para string[pyarrow] por padrão), como no pd.read_csv.
+        return dask.config.set({'dataframe.convert-string': False})
+
+    def _partition(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = dd.from_pandas(X.assign(**{ROW_ID: np.arange(len(X))}), npartitions=self.npartitions or os.cpu_count() or 1)
+        else:
+            if not isinstance(X, dd.DataFrame):
+                X = dd.read_csv(X) if str(X).endswith('.csv') else dd.read_parquet(X)
+            X = X.assign(**{ROW_ID: 1})
+            X[ROW_ID] = X[ROW_ID].cumsum() - 1
+
+        X = X.shuffle(on=self.customer_column, npartitions=self.npartitions or X.npartitions, shuffle_method=self.shuffle_method)
+        return X.map_partitions(lambda partition: partition.sort_values(ROW_ID, kind='stable'))
+
+    def _compute(self, *args):
+        return dask.compute(*args, scheduler=self.scheduler)
+
+    def fit(self, pipeline, X):
+        with self._object_strings():
+            self._fit(pipeline, X)
+        return pipeline
+
+    def _fit(self, pipeline, X):
+        partitions = self._partition(X).to_delayed()
+        plan, pending = [], []
+
+        def run_round():
+            # Executa a rodada atual; as etapas ajustadas em duas fases são aplicadas no início da próxima rodada.
+            nonlocal partitions, plan, pending
+            if not plan:
+                return
+            results = [dask.delayed(parallel._run_partition, nout=2)(partition, plan) for partition in partitions]
+            if self.persist:
+                results = dask.persist(*results, scheduler=self.scheduler)
+            fitted_steps = [step for step, action in plan if action != 'transform']
+            for fitted in self._compute(*[fitted for _, fitted in results]):
+                for step, fitted_step in zip(fitted_steps, fitted):
+                    step._merge(fitted_step)
+            partitions = [partition for partition, _ in results]
+            plan, pending = [(step, 'transform') for step in pending], []
+
+        for step in _pipeline_steps(pipeline):
+            if not isinstance(step, ETL.BaseTransformer):
+                raise TypeError(f'{type(step).__name__} não herda de BaseTransformer; o escopo da etapa não é conhecido.')
+
+            # Etapas globais e etapas por cliente que combinam o estado das partições (moda/mediana de cada cliente, com
+            # o valor geral usado nas linhas sem Customer_ID) são ajustadas em todas as partições antes do transform.
+            if step._scope == 'global' or type(step)._merge is not ETL.BaseTransformer._merge:
+                # Nova rodada apenas quando a etapa lê colunas alteradas pelas etapas ainda não ajustadas.
+                if pending and step._input_columns() & set().union(*(s._output_columns() for s in pending)):
+                    run_round()
+                step._reset()
+                plan.append((step, 'partial_fit'))
+                pending.append(step)
+            else:
+                if pending:
+                    run_round()
+                step._reset()
+                plan.append((step, 'fit_transform'))
+
+        run_round()
+
+    def fit_transform(self, pipeline, X):
+        return self.transform(self.fit(pipeline, X), X)
+
+    def transform(self, pipeline, X):
+        plan = [(step, 'transform') for step in _pipeline_steps(pipeline)]
+
+        def transform_partition(partition):
+            return parallel._run_partition(partition, plan)[0].drop(columns=ROW_ID)
+
+        with self._object_strings():
+            X = self._partition(X)
+            meta = transform_partition(X._meta)  # Apenas os nomes das colunas; os dtypes vêm das partições (enforce_metadata=False).
+            return X.map_partitions(transform_partition, meta=meta, enforce_metadata=False)
+
+    def to_pandas(self, result):
+        with self._object_strings():
+            return self._compute(result)[0].reset_index(drop=True)
+
+
+# Execução do pipeline no pandas com as etapas por cliente compiladas pelo numba.
+class NumbaBackend:
+
+    """
+    Executa o pipeline no pandas, etapa a etapa, com as regras por cliente do CleaningMissingDelayedPayment (moda e
+    preenchimento com 1), CleaningNumBankAccounts (quantidade de linhas) e TreatingOutliersNumCreditInquires (segunda
+    moda ou moda até 20) em laços compilados pelo numba sobre arrays do NumPy ordenados pelo Customer_ID. O agrupamento
+    pelo Customer_ID é calculado uma vez e compartilhado entre as etapas enquanto as linhas não mudam.
+
+    Sem o numba instalado, ou quando a coluna não é numérica (ex.: texto antes do CleaningNotNumbers), a etapa é
+    executada pelo próprio transformador. As etapas ficam ajustadas no pipeline, que pode ser usado depois no pandas.
+
+    Métodos:
+    fit / fit_transform / transform: Mesmo comportamento do pipeline.
+    to_pandas: Retorna o resultado como pandas.DataFrame.
+    """
+
+    @property
+    def compiled(self):
+        return numba is not None
+
+    def _run(self, pipeline, X, fit):
+        inplace = isinstance(pipeline, ETL.ETLPipeline)
+        X_transformed = pipeline._get_input(X) if inplace else X
+
+        with ETL._inplace() if inplace else nullcontext(), ETL._shared_customer_groups() as shared:
+            for step in _pipeline_steps(pipeline):
+                kernel = _NUMBA_KERNELS.get(type(step)) if self.compiled else None
+                result = kernel(step, X_transformed, fit) if kernel is not None else None
+                if result is None:
+                    if fit:
+                        step.fit(X_transformed)
+                    result = step.transform(X_transformed)
+                X_transformed = result
+
+                # Etapas que mudam as linhas ou o Customer_ID (ou desconhecidas) invalidam o agrupamento compartilhado.
+                if not isinstance(step, ETL.BaseTransformer) or step._changes_rows or 'Customer_ID' in step._output_columns():
+                    shared.clear()
+        return X_transformed
+
+    def fit(self, pipeline, X):
+        self._run(pipeline, X, fit=True)
+        return pipeline
+
+    def fit_transform(self, pipeline, X):
+        return self._run(pipeline, X, fit=True)
+
+    def transform(self, pipeline, X):
+        return self._run(pipeline, X, fit=False)
+
+    def to_pandas(self, result):
+        return result
+
+
+# Backends disponíveis pelo nome.
+BACKENDS = {'pandas': PandasBackend, 'polars': PolarsBackend, 'dask': DaskBackend, 'numba': NumbaBackend}
+
+
+def get_backend(name, **backend_params):
+    return BACKENDS[name](**backend_params)
+
+
+# Compara um valor esperado (pandas) com o de outro backend: nulos são iguais entre si e números com tolerância relativa.
+def _same_value(expected, value, rtol):
+    expected_null, value_null = pd.isna(expected), pd.isna(value)
+    if expected_null or value_null:
+        return expected_null and value_null
+    if isinstance(expected, (int, float, np.number)) and isinstance(value, (int, float, np.number)):
+        return bool(np.isclose(expected, value, rtol=rtol, atol=0))
+    return expected == value
+
+
+# Quantidade de valores diferentes em cada coluna, com as linhas alinhadas pelas colunas de ordenação.
+def _mismatches(expected, result, rtol, sort_columns=('Customer_ID', 'ID')):
+    if len(expected) != len(result):
+        return {'<rows>': abs(len(expected) - len(result))}
+
+    keys = [column_name for column_name in sort_columns if column_name in expected.columns and column_name in result.columns]
+    if keys:
+        expected = expected.take(np.lexsort([expected[key].astype(str).to_numpy() for key in reversed(keys)]))
+        result = result.take(np.lexsort([result[key].astype(str).to_numpy() for key in reversed(keys)]))
+
+    mismatches = {}
+    for column_name in expected.columns.union(result.columns, sort=False):
+        if column_name not in expected.columns or column_name not in result.columns:
+            mismatches[column_name] = len(expected)
+            continue
+        pairs = zip(expected[column_name].astype(object), result[column_name].astype(object))
+        n_different = sum(not _same_value(a, b, rtol) for a, b in pairs)
+        if n_different:
+            mismatches[column_name] = n_different
+    return mismatches
+
+
+# Verificação de paridade dos backends com o resultado do pandas.
+def check_parity(pipeline, X, backends=('polars', 'dask'), per_step=False, rtol=1e-9, backend_params=None):
+
+    """
+    Executa o pipeline no pandas e em cada backend (com cópias não ajustadas do pipeline) e compara os resultados pelo
+    valor: linhas alinhadas pelo Customer_ID e ID, nulos (NaN/None/NaT) iguais entre si, números com tolerância relativa
+    e dtypes ignorados. Retorna {backend: {coluna: quantidade de valores diferentes}}; um dict vazio indica paridade.
+
+    Parâmetros:
+    pipeline: Pipeline
+        Pipeline (ETLPipeline ou Pipeline do Scikit-Learn) com as etapas do ETL. Não é alterado.
+    X: pandas.DataFrame
+        DataFrame de entrada.
+    backends: list of str
+        Nomes dos backends comparados (ver BACKENDS).
+    per_step: bool (default=False)
+        Quando True a comparação é feita após cada etapa e o resultado é {backend: {etapa: diferenças}}, apenas com as
+        etapas que divergem, para localizar a primeira etapa com diferença.
+    rtol: float (default=1e-9)
+        Tolerância relativa na comparação de números.
+    backend_params: dict (default=None)
+        Parâmetros de cada backend, pelo nome (ex.: {'dask': {'npartitions': 4}}).
+    """
+
+    backend_params = backend_params or {}
+    n_steps = len(pipeline.steps)
+    prefixes = range(1, n_steps + 1) if per_step else [n_steps]
+
+    report = {name: {} for name in backends}
+    for n in prefixes:
+        expected = clone(pipeline[:n]).fit_transform(X)
+        for name in backends:
+            backend = get_backend(name, **backend_params.get(name, {}))
+            result = backend.to_pandas(backend.fit_transform(clone(pipeline[:n]), X))
+            mismatches = _mismatches(expected, result, rtol)
+            if per_step and mismatches:
+                report[name][pipeline.steps[n - 1][0]] = mismatches
+            elif not per_step:
+                report[name] = mismatches
+    return report
@@ -0,0 +1,204 @@
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import sklearn
+# --------------------------------------------------------------------- #
+import ETL
+import synthetic
+
+
+
+
+# Tamanhos padrão (linhas) da suíte de benchmark.
+SIZES = {'10k': 10_000, '100k': 100_000, '1M': 1_000_000, '10M': 10_000_000}
+
+
+# Etapas do str_pipe (n02_pipeline), na mesma ordem.
+def pipeline_steps():
+    return [
+        ("TransformToNull", ETL.TransformToNull(column_names=['Occupation', 'SSN', 'Changed_Credit_Limit', 'Credit_Mix', 'Payment_of_Min_Amount', 'Payment_Behaviour'])),
+        ("CleaningMissingCreditCard", ETL.CleaningMissingCreditCard(column_name='Num_Credit_Card')),
+        ("CleaningMissingTypeOfLoan", ETL.CleaningMissingTypeOfLoan(column_name='Type_of_Loan')),
+        ("CleaningMissingDelayedPayment", ETL.CleaningMissingDelayedPayment(column_name='Num_of_Delayed_Payment')),
+        ("CleaningMissingMonthlySalary", ETL.CleaningMissingMonthlySalary(column_name='Monthly_Inhand_Salary')),
+        ("CleaningNumBankAccounts", ETL.CleaningNumBankAccounts(column_name='Num_Bank_Accounts')),
+        ("CleaningMissingValues", ETL.CleaningMissingValues(column_names=['Name', 'Occupation', 'SSN', 'Changed_Credit_Limit', 'Num_Credit_Inquiries', 'Credit_Mix', 'Payment_of_Min_Amount', 'Amount_invested_monthly', 'Payment_Behaviour', 'Monthly_Balance', 'Credit_History_Age'])),
+        ("CleaningNotNumbers", ETL.CleaningNotNumbers(column_names=['Age', 'Annual_Income', 'Num_of_Loan', 'Num_of_Delayed_Payment', 'Changed_Credit_Limit', 'Outstanding_Debt', 'Amount_invested_monthly', 'Monthly_Balance'])),
+        ("CleaningMissingPayment", ETL.CleaningMissingDelayedPayment(column_name='Num_of_Delayed_Payment')),
+        ("CleaningMissingMonthlyBalance", ETL.CleaningMissingMonthlyBalance(column_name='Monthly_Balance')),
+        ("ModifyMonthCreditHistory", ETL.ModifyMonthCreditHistory(column_name='Credit_History_Age')),
+        ("CreateDateCreditHistoryColumn", ETL.CreateDateCreditHistoryColumn(column_name='Credit_History_Age')),
+        ("CreateMonthNumberColumn", ETL.CreateMonthNumberColumn(column_name='Month')),
+        ("TransformToBinaryValues", ETL.TransformToBinaryValues(column_name='Payment_of_Min_Amount')),
+        ("ConvertDtypeToNumeric", ETL.ConvertDtypeToNumeric(column_names=['Age', 'Annual_Income', 'Num_of_Loan', 'Num_of_Delayed_Payment', 'Changed_Credit_Limit', 'Outstanding_Debt', 'Amount_invested_monthly', 'Monthly_Balance'])),
+        ("TreatingOutliersWithQuantile", ETL.TreatingOutliersWithQuantile(column_names=['Age', 'Num_Credit_Card', 'Outstanding_Debt', 'Amount_invested_monthly'])),
+        ("TreatingOutliersWithMode", ETL.TreatingOutliersWithMode(column_names=['Num_Bank_Accounts', 'Num_of_Loan', 'Interest_Rate'])),
+        ("TreatingOutliersNumCreditInquires", ETL.TreatingOutliersNumCreditInquires(column_name='Num_Credit_Inquiries')),
+    ]
+
+
+# Executa o pipeline completo e as etapas individualmente para um tamanho de amostra.
+def run_size(n_rows, seed=0, repeat=1, memory=True):
+
+    """
+    Mede o pipeline completo (fit_transform) e cada transformador sobre uma amostra sintética de n_rows linhas.
+
+    O tempo de cada etapa vem do perfil do ETL (profile) sem o tracemalloc, que deixaria a execução mais lenta. Com
+    memory=True é feita uma execução adicional apenas para medir o pico de memória de cada etapa e do pipeline (em bytes,
+    relativo à memória antes da execução, sem contar o DataFrame de entrada).
+    Com repeat > 1 é registrado o menor tempo entre as repetições.
+
+    Parâmetros:
+    n_rows: int
+        Quantidade de linhas da amostra sintética.
+    seed: int
+        Semente do gerador.
+    repeat: int
+        Quantidade de execuções cronometradas.
+    memory: bool
+        Quando True mede o pico de memória.
+    """
+
+    X = synthetic.generate(n_rows, seed)
+    steps = {}
+    pipeline_time = np.inf
+
+    for _ in range(repeat):
+        pipeline = ETL.ETLPipeline(pipeline_steps())
+        with ETL.profile(pipeline, memory=False) as report:
+            start = time.perf_counter()
+            pipeline.fit_transform(X)
+            pipeline_time = min(pipeline_time, time.perf_counter() - start)
+
+        for record in report.records:
+            step = steps.setdefault(record['step'], {'step': record['step'], 'class': record['class'],
+                                                     'fit_time': np.inf, 'transform_time': np.inf})
+            step[f"{record['method']}_time"] = min(step[f"{record['method']}_time"], record['wall_time'])
+
+    pipeline_memory = None
+    if memory:
+        pipeline = ETL.ETLPipeline(pipeline_steps())
+        tracemalloc.start()
+        try:
+            # O pico de cada etapa é relativo à memória no início dela (memória ao final da etapa anterior).
+            start_memory = tracemalloc.get_traced_memory()[0]
+            current_memory, peaks = [start_memory], []
+
+            def track(record):
+                peaks.append(current_memory[-1] + record['peak_memory'])
+                current_memory.append(tracemalloc.get_traced_memory()[0])
+
+            with ETL.profile(pipeline, callbacks=[track], memory=True) as report:
+                pipeline.fit_transform(X)
+            pipeline_memory = max(peaks) - start_memory
+        finally:
+            tracemalloc.stop()
+        for record in report.records:
+            step = steps[record['step']]
+            step['peak_memory'] = max(step.get('peak_memory') or 0, record['peak_memory'])
+
+    results = []
+    for step in steps.values():
+        step['wall_time'] = step.pop('fit_time') + step.pop('transform_time')  # Tempo do fit_transform da etapa.
+        step['rows_per_sec'] = len(X) / step['wall_time'] if step['wall_time'] > 0 else None
+        step.setdefault('peak_memory', None)
+        results.append(step)
+
+    return {
+        'rows': len(X),
+        'pipeline': {'wall_time': pipeline_time, 'rows_per_sec': len(X) / pipeline_time, 'peak_memory': pipeline_memory},
+        'steps': results,
+    }
+
+
+# Executa a suíte completa.
+def run(sizes=('10k', '100k'), seed=0, repeat=1, memory=True):
+
+    """
+    Executa o benchmark para cada tamanho e retorna o resultado (dict serializável em JSON) com as versões do ambiente.
+
+    Parâmetros:
+    sizes: list of str or int
+        Tamanhos da amostra, em linhas ou pelos nomes do SIZES (10k, 100k, 1M, 10M).
+    seed, repeat, memory:
+        Repassados para o run_size.
+    """
+
+    return {
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(), 'pandas': pd.__version__,
+                        'numpy': np.__version__, 'scikit-learn': sklearn.__version__,
+                        'pyarrow': ETL.pa.__version__ if ETL.pa is not None else None},
+        'created_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'seed': seed,
+        'repeat': repeat,
+        'results': {str(size): run_size(SIZES.get(size, size) if isinstance(size, str) else size, seed, repeat, memory)
+                    for size in sizes},
+    }
+
+
+# Comparação entre duas execuções salvas em JSON.
+def compare(baseline, current, threshold=0.2):
+
+    """
+    Compara duas execuções (dict ou caminho do JSON) e retorna um DataFrame com a razão entre os tempos de cada etapa
+    (current / baseline) e a coluna regression, verdadeira quando a etapa ficou mais lenta que o limite (threshold).
+
+    Parâmetros:
+    baseline, current: dict or str
+        Resultados do run ou caminhos dos arquivos JSON.
+    threshold: float (default=0.2)
+        Aumento relativo de tempo considerado regressão (0.2 = 20% mais lento).
+    """
+
+    def load(result):
+        if isinstance(result, str):
+            with open(result, encoding='utf-8') as file:
+                return json.load(file)
+        return result
+
+    def flatten(result):
+        rows = {}
+        for size, size_result in load(result)['results'].items():
+            rows[(size, 'pipeline')] = size_result['pipeline']
+            for step in size_result['steps']:
+                rows[(size, step['step'])] = step
+        return rows
+
+    baseline, current = flatten(baseline), flatten(current)
+    rows = []
+    for key in baseline.keys() & current.keys():
+        ratio = current[key]['wall_time'] / baseline[key]['wall_time'] if baseline[key]['wall_time'] else np.nan
+        rows.append({'size': key[0], 'step': key[1], 'baseline_time': baseline[key]['wall_time'],
+                     'current_time': current[key]['wall_time'], 'ratio': ratio, 'regression': ratio > 1 + threshold})
+    return pd.DataFrame(rows).sort_values(['size', 'ratio'], ascending=[True, False]).reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark dos transformadores do ETL com dados sintéticos.')
+    parser.add_argument('--sizes', nargs='+', default=['10k', '100k'], help='Tamanhos (10k, 100k, 1M, 10M ou número de linhas).')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true', help='Não mede o pico de memória (execução mais rápida).')
+    parser.add_argument('--output', default='benchmark.json', help='Arquivo JSON de saída.')
+    parser.add_argument('--compare', help='JSON de uma execução anterior para comparar os tempos.')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    sizes = [size if size in SIZES else int(size) for size in args.sizes]
+    result = run(sizes, args.seed, args.repeat, memory=not args.no_memory)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(result, file, indent=2)
+
+    for size, size_result in result['results'].items():
+        print(f"{size}: {size_result['pipeline']['rows_per_sec']:,.0f} linhas/s")
+
+    if args.compare:
+        comparison = compare(args.compare, result, args.threshold)
+        print(comparison.to_string(index=False))
+        if comparison['regression'].any():
+            raise SystemExit(1)
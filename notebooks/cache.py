@@ -0,0 +1,298 @@
+import ast
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+# --------------------------------------------------------------------- #
+import ETL
+
+
+
+
+# Extensão dos arquivos de cada entrada do cache.
+CACHE_SUFFIX = '.pkl'
+
+
+# Impressão digital (hash) de um DataFrame a partir dos buffers das colunas.
+def fingerprint(X):
+
+    """
+    Retorna um hash hexadecimal do DataFrame (nomes e dtypes das colunas, index e valores). Colunas numéricas são
+    lidas diretamente do buffer do NumPy, sem conversão; colunas categóricas utilizam os códigos e as categorias.
+    Colunas object são convertidas para um array do pyarrow (buffers contíguos, cerca de duas vezes mais rápido que o
+    hash do pandas); quando o pyarrow não está disponível ou a coluna mistura tipos, e nos demais dtypes, é utilizado o
+    hash vetorizado do pandas (hash_pandas_object).
+
+    Parâmetros:
+    X: pandas.DataFrame
+        DataFrame de entrada do pipeline.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(map(str, X.columns)), [str(dtype) for dtype in X.dtypes], X.shape)).encode())
+
+    if isinstance(X.index, pd.RangeIndex):
+        digest.update(repr((X.index.start, X.index.stop, X.index.step)).encode())
+    else:
+        digest.update(pd.util.hash_pandas_object(X.index, index=False).to_numpy().data)
+
+    for _, column in X.items():
+        dtype = column.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            digest.update(np.ascontiguousarray(column.cat.codes.to_numpy()).data)
+            digest.update(pd.util.hash_pandas_object(column.cat.categories, index=False).to_numpy().data)
+        elif isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+            digest.update(np.ascontiguousarray(column.to_numpy()).view(np.uint8).data)
+        elif dtype == object and ETL.pa is not None and _update_arrow(digest, column):
+            continue
+        else:
+            digest.update(pd.util.hash_pandas_object(column, index=False, categorize=True).to_numpy().data)
+
+    return digest.hexdigest()
+
+
+# Atualiza o hash com os buffers da coluna convertida para o pyarrow. Retorna False quando a conversão não é possível.
+def _update_arrow(digest, column):
+    try:
+        array = ETL.pa.array(column.to_numpy(), from_pandas=True)
+    except (ETL.pa.ArrowInvalid, ETL.pa.ArrowTypeError):
+        return False
+    digest.update(str(array.type).encode())
+    for buffer in array.buffers():
+        if buffer is not None:
+            digest.update(buffer)
+    return True
+
+
+# Código-fonte das funções e classes de cada módulo: {caminho: ((mtime, tamanho), {nome: (código, nomes usados)})}.
+_MODULE_SOURCES = {}
+
+
+# Código-fonte de cada função, classe e constante (atribuição) definida no nível do módulo e os nomes usados no seu
+# código (sem comentários e docstrings), lidos e analisados (ast) uma vez por versão do arquivo.
+def _module_sources(module):
+    path = getattr(module, '__file__', None)
+    if path is None or not os.path.exists(path):
+        return {}
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    if path not in _MODULE_SOURCES or _MODULE_SOURCES[path][0] != version:
+        with open(path, encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        sources = {}
+        for node in ast.parse('\n'.join(lines)).body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                targets = [node.name]
+                start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = [target.id for target in (node.targets if isinstance(node, ast.Assign) else [node.target])
+                           if isinstance(target, ast.Name)]
+                start = node.lineno
+            else:
+                continue
+            names = {child.id for child in ast.walk(node) if isinstance(child, ast.Name)}
+            for target in targets:
+                sources[target] = ('\n'.join(lines[start - 1:node.end_lineno]), names)
+        _MODULE_SOURCES[path] = (version, sources)
+    return _MODULE_SOURCES[path][1]
+
+
+# Versão do código de uma etapa: hash do código-fonte da classe, das classes base e de todas as funções, classes e
+# constantes do mesmo módulo referenciadas por elas (direta ou indiretamente, ex.: GroupStatistics, _map_unique,
+# _cap_upper, _lookup e _quantile_from_counts). Alterar uma função auxiliar muda a versão das etapas que a utilizam,
+# sem invalidar as demais. As constantes entram pelo código da atribuição, não pelo valor em memória.
+def _code_version(step):
+    module = sys.modules[type(step).__module__]
+    module_sources = _module_sources(module)
+    pending = [cls.__name__ for cls in type(step).__mro__ if cls.__module__ == module.__name__]
+    seen, sources = set(), {}
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+
+        if name in module_sources:
+            source, names = module_sources[name]
+            pending.extend(names)
+        elif inspect.isclass(vars(module).get(name)) and vars(module)[name].__module__ == module.__name__:
+            source = vars(module)[name].__qualname__  # Sem código-fonte disponível (ex.: definida no console).
+        else:
+            continue  # Módulos e objetos importados (ex.: pandas, sklearn).
+        sources[name] = source
+
+    code = '\n'.join(f'{name}\n{source}' for name, source in sorted(sources.items()))
+    return hashlib.blake2b(code.encode(), digest_size=16).hexdigest()
+
+
+# Cache em disco do resultado de cada etapa do pipeline.
+class StepCache:
+
+    """
+    Cache em disco, endereçado pelo conteúdo, do resultado de cada etapa de um pipeline do ETL.
+
+    A chave da etapa i é o hash da chave da etapa anterior (a primeira parte do fingerprint do DataFrame de entrada) com
+    a classe, os parâmetros (get_params, sem o copy) e a versão do código da etapa (código-fonte da classe e das
+    funções, classes e constantes do ETL utilizadas por ela). Assim, ao alterar uma etapa (parâmetros ou o código, ex.:
+    os limites do TreatingOutliersWithMode), as chaves das etapas anteriores continuam iguais e a execução retoma a
+    partir do resultado da última etapa em cache, ajustando e transformando apenas as etapas seguintes.
+
+    Cada entrada guarda o DataFrame na saída da etapa e as etapas ajustadas até ela, de forma que o pipeline fica
+    completamente ajustado ao retomar. Alterações fora do módulo da etapa (ex.: versão do pandas) não mudam a versão do
+    código; nesses casos utilize o parâmetro version (ou clear).
+
+    O tamanho do diretório é limitado por max_bytes: as entradas menos usadas recentemente (data de modificação, atualizada
+    a cada leitura) são removidas primeiro.
+
+    Parâmetros:
+    directory: str
+        Diretório das entradas do cache.
+    max_bytes: int (default=2 GB)
+        Tamanho máximo do diretório.
+    checkpoints: list of str (default=None)
+        Nomes das etapas cujo resultado é gravado. Quando None o resultado é gravado quando o tempo de execução acumulado
+        desde a última gravação atinge min_seconds (e sempre na última etapa), evitando gravar um DataFrame inteiro
+        após etapas mais rápidas que a própria gravação.
+    min_seconds: float (default=1.0)
+        Tempo mínimo de execução entre duas gravações quando checkpoints=None. Com 0 grava o resultado de todas as etapas.
+    version: str (default='')
+        Texto adicionado às chaves, para invalidar o cache manualmente.
+
+    Métodos:
+    fit_transform: Executa o fit_transform do pipeline retomando do maior prefixo em cache.
+    fit: Igual ao fit_transform, retornando o pipeline.
+    clear: Remove todas as entradas.
+    size: Tamanho atual do diretório em bytes.
+    """
+
+    def __init__(self, directory, max_bytes=2 * 1024 ** 3, checkpoints=None, min_seconds=1.0, version=''):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.checkpoints = checkpoints
+        self.min_seconds = min_seconds
+        self.version = version
+        os.makedirs(directory, exist_ok=True)
+
+    def _step_keys(self, steps, X):
+        key = fingerprint(X) + self.version
+        keys = []
+        for _, step in steps:
+            params = {name: value for name, value in step.get_params(deep=False).items() if name != 'copy'}
+            signature = repr((type(step).__module__, type(step).__qualname__, sorted(params.items()), _code_version(step)))
+            key = hashlib.blake2b((key + signature).encode(), digest_size=16).hexdigest()
+            keys.append(key)
+        return keys
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                entry = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Entrada incompleta ou gravada por outra versão do código (classe ou módulo que não existe mais): removida.
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        os.utime(path)  # Marcando a entrada como usada recentemente.
+        return entry
+
+    def _store(self, key, X, fitted_steps):
+        # Gravando em um arquivo temporário e renomeando, para nunca deixar uma entrada incompleta no diretório.
+        path = self._path(key)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            pickle.dump((X, fitted_steps), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_SUFFIX):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self):
+        for _, _, name in self._entries():
+            os.remove(os.path.join(self.directory, name))
+
+    def fit_transform(self, pipeline, X):
+
+        """
+        Executa o fit_transform do pipeline. As etapas já em cache são carregadas (DataFrame e etapas ajustadas) e
+        as demais são ajustadas e transformadas normalmente, gravando o resultado de cada uma.
+        O nome da etapa a partir da qual a execução foi retomada fica em resumed_from_ (None quando nada estava em cache).
+
+        Parâmetros:
+        pipeline: Pipeline
+            Pipeline (ETLPipeline ou Pipeline do Scikit-Learn) com as etapas do ETL. As etapas são ajustadas no próprio pipeline.
+        X: pandas.DataFrame
+            DataFrame de entrada (não é alterado).
+        """
+
+        positions = [i for i, (_, step) in enumerate(pipeline.steps) if step not in (None, 'passthrough')]
+        steps = [pipeline.steps[i] for i in positions]
+        keys = self._step_keys(steps, X)
+
+        # Procurando o maior prefixo em cache, da última etapa para a primeira.
+        start, entry = 0, None
+        for i in reversed(range(len(steps))):
+            entry = self._load(keys[i])
+            if entry is not None:
+                start = i + 1
+                break
+
+        self.resumed_from_ = steps[start - 1][0] if start else None
+        if entry is not None:
+            X, fitted_steps = entry
+            for position, fitted_step in zip(positions, fitted_steps):
+                pipeline.steps[position] = (pipeline.steps[position][0], fitted_step)
+        else:
+            X = X.copy()
+
+        elapsed = 0.0
+        for i in range(start, len(steps)):
+            name, step = steps[i]
+            started = time.perf_counter()
+            with ETL._inplace():  # O DataFrame pertence a esta execução (cópia do input ou lido do cache).
+                X = step.fit_transform(X)
+            elapsed += time.perf_counter() - started
+
+            if self.checkpoints is None:
+                store = elapsed >= self.min_seconds or i == len(steps) - 1
+            else:
+                store = name in self.checkpoints
+            if store:
+                self._store(keys[i], X, [pipeline.steps[position][1] for position in positions[:i + 1]])
+                elapsed = 0.0
+
+        return X
+
+    def fit(self, pipeline, X):
+        self.fit_transform(pipeline, X)
+        return pipeline
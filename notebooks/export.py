@@ -0,0 +1,204 @@
+import struct
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.utils.validation import check_is_fitted
+
+
+
+
+# Colunas categóricas codificadas por padrão (one-hot ou códigos ordinais).
+CATEGORICAL_FEATURES = ('Occupation', 'Credit_Mix', 'Payment_Behaviour')
+
+# Tamanho fixo do cabeçalho do .npy (múltiplo de 64), reescrito com a quantidade final de linhas ao fim da gravação.
+_NPY_HEADER_SIZE = 128
+
+
+# Cabeçalho do formato .npy (versão 1.0) de uma matriz float (n_rows x n_columns) em ordem C.
+def _npy_header(dtype, n_rows, n_columns):
+    header = repr({'descr': np.dtype(dtype).str, 'fortran_order': False, 'shape': (n_rows, n_columns)})
+    header = header.ljust(_NPY_HEADER_SIZE - 11) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+# Blocos de linhas de um DataFrame ou de uma sequência de DataFrames (ex.: StreamingETL.iter_transform).
+def _row_blocks(X, chunksize):
+    frames = [X] if isinstance(X, pd.DataFrame) else X
+    for frame in frames:
+        for start in range(0, len(frame), chunksize):
+            yield frame.iloc[start:start + chunksize]
+
+
+# Matriz de features a partir do DataFrame tratado pelo ETL.
+class FeatureMatrix:
+
+    """
+    Converte o DataFrame tratado (saída do str_pipe) em uma matriz de features pronta para o treino: float32 contígua
+    (ordem C) ou esparsa (CSR), com as colunas numéricas e as colunas categóricas em one-hot ou em códigos ordinais.
+
+    A matriz é preenchida bloco a bloco, coluna a coluna, diretamente no array de saída: sem o DataFrame.to_numpy de
+    colunas com dtypes diferentes (que gera um array object) e sem cópias intermediárias da matriz inteira. No export
+    os blocos são gravados em disco um a um (.npy), de modo que a memória fica limitada a um bloco de linhas mesmo para
+    extrações de dezenas de milhões de linhas, e o resultado é aberto como memmap.
+
+    Valores nulos viram NaN. Categorias não vistas no fit (ou nulas) ficam com todas as colunas do one-hot iguais a 0
+    ou com o código ordinal NaN.
+
+    Parâmetros:
+    numeric_columns: list of str (default=None)
+        Colunas numéricas. Quando None utiliza todas as colunas numéricas do DataFrame do fit que não são categóricas
+        (inclui, por exemplo, a máscara do EncodeTypeOfLoan).
+    categorical_columns: list of str (default=CATEGORICAL_FEATURES)
+        Colunas categóricas. As categorias são aprendidas no fit (categorias do dtype category ou valores distintos ordenados).
+    encoding: str (default='onehot')
+        'onehot' (uma coluna 0/1 por categoria, {coluna}_{categoria}) ou 'ordinal' (código da categoria).
+    dtype: numpy dtype (default=np.float32)
+        Dtype da matriz.
+    sparse: bool (default=False)
+        Quando True a matriz é uma scipy.sparse.csr_matrix.
+    chunksize: int (default=65536)
+        Quantidade de linhas de cada bloco.
+
+    Métodos:
+    fit: Aprende as colunas numéricas (numeric_columns_), as categorias (categories_) e os nomes das features (feature_names_).
+    transform: Retorna a matriz de features.
+    export: Grava a matriz em disco bloco a bloco (.npy, ou .npz quando sparse=True) e retorna a matriz aberta do disco.
+    get_feature_names_out: Retorna os nomes das features, na ordem das colunas da matriz.
+    """
+
+    def __init__(self, numeric_columns=None, categorical_columns=CATEGORICAL_FEATURES, encoding='onehot',
+                 dtype=np.float32, sparse=False, chunksize=65_536):
+        self.numeric_columns = numeric_columns
+        self.categorical_columns = categorical_columns
+        self.encoding = encoding
+        self.dtype = dtype
+        self.sparse = sparse
+        self.chunksize = chunksize
+
+    def fit(self, X, y=None):
+        if self.encoding not in ('onehot', 'ordinal'):
+            raise ValueError(f"encoding deve ser 'onehot' ou 'ordinal' (recebido {self.encoding!r}).")
+        categorical_columns = [column_name for column_name in self.categorical_columns if column_name in X.columns]
+
+        if self.numeric_columns is None:
+            self.numeric_columns_ = [column_name for column_name, dtype in X.dtypes.items()
+                                     if column_name not in categorical_columns and pd.api.types.is_numeric_dtype(dtype)]
+        else:
+            self.numeric_columns_ = list(self.numeric_columns)
+
+        self.categories_ = {}
+        for column_name in categorical_columns:
+            column = X[column_name]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                self.categories_[column_name] = column.cat.categories
+            else:
+                self.categories_[column_name] = pd.Index(np.sort(column.dropna().unique()))
+
+        self.feature_names_ = list(self.numeric_columns_)
+        for column_name, categories in self.categories_.items():
+            if self.encoding == 'onehot':
+                self.feature_names_ += [f'{column_name}_{category}' for category in categories]
+            else:
+                self.feature_names_.append(column_name)
+        return self
+
+    def get_feature_names_out(self, input_features=None):
+        check_is_fitted(self)
+        return np.asarray(self.feature_names_, dtype=object)
+
+    def _fill(self, X, out):
+        # Preenche out (linhas de X x features) coluna a coluna, com uma única conversão para o dtype da matriz.
+        for j, column_name in enumerate(self.numeric_columns_):
+            values = X[column_name].to_numpy()
+            if values.dtype.kind not in 'biuf':
+                # Dtypes nullable (pd.NA), categóricos ou texto: conversão para float com nulos como NaN.
+                values = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            out[:, j] = values
+
+        position = len(self.numeric_columns_)
+        for column_name, categories in self.categories_.items():
+            codes = pd.Categorical(X[column_name], categories=categories).codes
+            if self.encoding == 'onehot':
+                block = out[:, position:position + len(categories)]
+                block[...] = 0
+                rows = np.flatnonzero(codes >= 0)
+                block[rows, codes[rows]] = 1
+                position += len(categories)
+            else:
+                out[:, position] = np.where(codes >= 0, codes, np.nan)
+                position += 1
+        return out
+
+    def _blocks(self, X):
+        # Matriz densa de cada bloco de linhas, preenchida sempre no mesmo buffer.
+        buffer = np.empty((self.chunksize, len(self.feature_names_)), dtype=self.dtype)
+        for block in _row_blocks(X, self.chunksize):
+            yield self._fill(block, buffer[:len(block)])
+
+    def transform(self, X):
+        check_is_fitted(self)
+        if self.sparse:
+            blocks = [sparse.csr_matrix(block) for block in self._blocks(X)]
+            if not blocks:
+                return sparse.csr_matrix((0, len(self.feature_names_)), dtype=self.dtype)
+            return sparse.vstack(blocks, format='csr')
+
+        out = np.empty((len(X), len(self.feature_names_)), dtype=self.dtype)
+        for start in range(0, len(X), self.chunksize):
+            self._fill(X.iloc[start:start + self.chunksize], out[start:start + self.chunksize])
+        return out
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X).transform(X)
+
+    def export(self, X, path):
+
+        """
+        Grava a matriz em disco bloco a bloco e retorna a matriz aberta do arquivo: np.memmap (somente leitura) do .npy,
+        ou a csr_matrix gravada no .npz quando sparse=True.
+
+        Parâmetros:
+        X: pandas.DataFrame ou iterável de pandas.DataFrame
+            DataFrame tratado ou sequência de blocos (ex.: StreamingETL.iter_transform). Quando a instância ainda não
+            foi ajustada, o fit é feito no primeiro bloco.
+        path: str
+            Caminho do arquivo (.npy ou, com sparse=True, .npz).
+        """
+
+        blocks = _row_blocks(X, self.chunksize)
+        first = next(blocks, None)
+        if not hasattr(self, 'feature_names_'):
+            if first is None:
+                raise ValueError('Nenhuma linha para exportar: ajuste a instância (fit) ou informe um DataFrame com linhas.')
+            self.fit(first)
+        frames = chain([first] if first is not None else [], blocks)
+
+        if self.sparse:
+            matrix = self.transform(frames)
+            sparse.save_npz(path, matrix, compressed=False)
+            return matrix
+
+        n_rows, n_columns = 0, len(self.feature_names_)
+        with open(path, 'wb') as file:
+            file.write(_npy_header(self.dtype, 0, n_columns))
+            for block in self._blocks(frames):
+                file.write(block.tobytes())
+                n_rows += len(block)
+            file.seek(0)
+            file.write(_npy_header(self.dtype, n_rows, n_columns))
+        return np.load(path, mmap_mode='r')
+
+
+# Conversão do DataFrame tratado em matriz de features (com os nomes das features).
+def to_feature_matrix(X, path=None, **params):
+
+    """
+    Atalho para FeatureMatrix(**params).fit(X): retorna (matriz, nomes das features). Quando path é informado a matriz
+    é gravada bloco a bloco (FeatureMatrix.export) e retornada como memmap (ou csr_matrix, com sparse=True).
+    """
+
+    features = FeatureMatrix(**params).fit(X)
+    matrix = features.transform(X) if path is None else features.export(X, path)
+    return matrix, features.feature_names_
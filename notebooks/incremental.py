@@ -0,0 +1,357 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+# --------------------------------------------------------------------- #
+import ETL
+
+
+
+
+# Coluna auxiliar com a ordem de chegada de cada linha, usada para manter a ordem dentro de cada cliente.
+ROW_ID = '__row_id__'
+
+# Quantidade de blocos (linhas recebidas ou resultados das atualizações) a partir da qual os blocos são concatenados.
+_MAX_BLOCKS = 32
+
+
+# Aumenta o array para comportar n posições (dobrando a capacidade), preenchendo as novas posições com fill.
+def _grow(values, n, fill=0):
+    if len(values) >= n:
+        return values
+    grown = np.full(max(n, 2 * len(values)), fill, dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+# Dtype comum entre os valores guardados e os novos: numérico quando a conversão não altera os valores (inteiros até
+# 2**53 em float64), senão object, mantendo os valores exatos usados como chave das contagens.
+def _common_dtype(values, new):
+    if values.dtype == new.dtype:
+        return values.dtype
+    if values.dtype.kind in 'biuf' and new.dtype.kind in 'biuf':
+        dtype = np.result_type(values.dtype, new.dtype)
+        if dtype.kind != 'f' or all(array.dtype.kind == 'f' or len(array) == 0 or np.abs(array).max() <= 2 ** 53
+                                    for array in (values, new)):
+            return dtype
+    return np.dtype(object)
+
+
+# Colunas da entrada de uma etapa global, guardadas por ROW_ID.
+class _StepInputs:
+
+    """
+    Guarda colunas da entrada de uma etapa global (arrays do NumPy posicionados pelo ROW_ID, com capacidade
+    crescente), sem cópias do DataFrame inteiro. As linhas dos clientes afetados são substituídas no próprio array.
+
+    Parâmetros:
+    columns: list of str
+        Colunas lidas pela etapa e colunas alteradas por ela ou pelas etapas seguintes.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.values = {}
+        self.present = np.zeros(0, dtype=bool)
+
+    def set(self, X):
+        row_id = X[ROW_ID].to_numpy()
+        n = int(row_id.max()) + 1 if len(row_id) else 0
+        self.present = _grow(self.present, n, False)
+        for column_name in self.columns:
+            new = X[column_name].to_numpy()
+            values = self.values.get(column_name, np.zeros(0, dtype=new.dtype))
+            dtype = _common_dtype(values, new)
+            values = _grow(values.astype(dtype, copy=False), n)
+            values[row_id] = new
+            self.values[column_name] = values
+        self.present[row_id] = True
+
+    def discard(self, row_id):
+        self.present[row_id[row_id < len(self.present)]] = False
+
+    def present_ids(self, row_id=None):
+        if row_id is None:
+            return np.flatnonzero(self.present)
+        row_id = row_id[row_id < len(self.present)]
+        return row_id[self.present[row_id]]
+
+    def frame(self, row_id):
+        return pd.DataFrame({column_name: self.values[column_name][row_id] for column_name in self.columns}, index=row_id)
+
+
+# Processamento incremental do pipeline do ETL, mês a mês.
+class IncrementalETL:
+
+    """
+    Mantém o resultado do pipeline do ETL e o atualiza com os novos meses recalculando apenas os clientes afetados.
+
+    As etapas por cliente (CleaningMissingValues, ModifyMonthCreditHistory, CleaningMissingDelayedPayment...) dependem
+    de todas as linhas do cliente: um novo mês pode alterar linhas antigas (ex.: bfill de um nulo do último mês ou uma
+    nova moda do cliente). Por isso as linhas de entrada são guardadas em blocos na ordem de chegada, com o índice das
+    linhas de cada cliente, e cada atualização reprocessa apenas os clientes presentes nas novas linhas.
+
+    O estado das etapas globais (_scope='global') são as contagens de valores (ou os sketches) das próprias etapas,
+    atualizadas pela diferença: as contagens das linhas antigas dos clientes afetados são retiradas (_remove) e as das
+    novas linhas somadas (partial_fit). Cada etapa global guarda, por linha, apenas as colunas que lê e as colunas
+    alteradas por ela ou pelas etapas seguintes (ver _StepInputs), e não uma cópia da sua entrada. As etapas com sketches
+    (approximate=True), que não permitem retirar linhas, são ajustadas novamente nas colunas que leem.
+
+    Quando a estatística global muda (ex.: um novo limite de quantil), as colunas guardadas são transformadas com a
+    estatística anterior e a nova (as etapas globais tratam cada linha apenas com a estatística) e os clientes com alguma
+    linha alterada entram na atualização a partir da etapa. A entrada da etapa desses clientes é montada com as colunas
+    guardadas e as demais colunas do resultado atual, sem reprocessar as etapas anteriores. O resultado é o mesmo de um
+    reprocessamento completo.
+
+    Quando os clientes afetados somam mais que recompute_fraction das linhas, o histórico é reprocessado por completo.
+    O resultado segue a ordem do str_pipe: linhas ordenadas pelo Customer_ID (na ordem de chegada dentro de cada cliente)
+    e index reiniciado. O resultado de cada atualização é guardado em um novo bloco e montado apenas no result.
+
+    Parâmetros:
+    pipeline: Pipeline
+        Pipeline (ETLPipeline ou Pipeline do Scikit-Learn) com as etapas do ETL. As etapas são ajustadas no próprio pipeline.
+    customer_column: str
+        Coluna que identifica o cliente.
+    recompute_fraction: float (default=0.5)
+        Fração das linhas do histórico (linhas antigas e novas dos clientes afetados) a partir da qual a atualização
+        reprocessa todo o histórico, como o fit.
+
+    Métodos:
+    fit: Processa o histórico completo e guarda o estado de cada etapa global.
+    update: Adiciona novas linhas (ex.: um novo mês) e recalcula apenas os clientes afetados.
+    result: Retorna o resultado atual do pipeline.
+    """
+
+    def __init__(self, pipeline, customer_column='Customer_ID', recompute_fraction=0.5):
+        self.pipeline = pipeline
+        self.customer_column = customer_column
+        self.recompute_fraction = recompute_fraction
+
+    def _steps(self):
+        steps = []
+        for _, step in self.pipeline.steps:
+            if step in (None, 'passthrough'):
+                continue
+            if not isinstance(step, ETL.BaseTransformer):
+                raise TypeError(f'{type(step).__name__} não herda de BaseTransformer; o escopo da etapa não é conhecido.')
+            steps.append(step)
+        return steps
+
+    def _numbered(self, X, start):
+        # Numera as linhas pela ordem de chegada; o número também é o index, que precisa ser único entre as atualizações.
+        row_id = np.arange(start, start + len(X))
+        return X.assign(**{ROW_ID: row_id}).set_axis(pd.Index(row_id), axis=0)
+
+    def _sorted(self, X):
+        return X.sort_values([self.customer_column, ROW_ID], kind='stable')
+
+    def _apply(self, step, X):
+        # Na atualização, as etapas por cliente são ajustadas em uma cópia (sem substituir o ajuste do histórico completo
+        # guardado no pipeline) e as demais etapas mantêm o seu ajuste.
+        if step._scope == 'customer':
+            return clone(step).fit_transform(X)
+        return step.transform(X)
+
+    def _append(self, X):
+        # Guarda as novas linhas em um bloco e os seus ROW_ID no índice de cada cliente.
+        chunk = self._numbered(X, self.n_rows_)
+        self.chunks_.append(chunk)
+        self.starts_.append(self.n_rows_)
+        for customer, positions in chunk.groupby(self.customer_column, sort=False, observed=True).indices.items():
+            row_id = positions + self.n_rows_
+            previous = self.customer_rows_.get(customer)
+            self.customer_rows_[customer] = row_id if previous is None else np.concatenate([previous, row_id])
+        self.n_rows_ += len(X)
+
+        if len(self.chunks_) > _MAX_BLOCKS:
+            self.chunks_, self.starts_ = [pd.concat(self.chunks_)], [0]
+
+    def _rows(self, row_id):
+        # Linhas de entrada pelos ROW_ID (cópias), buscadas apenas nos trechos de cada bloco.
+        row_id = np.unique(row_id)
+        bounds = np.searchsorted(row_id, [*self.starts_, self.n_rows_])
+        parts = [chunk.iloc[row_id[bounds[i]:bounds[i + 1]] - start]
+                 for i, (chunk, start) in enumerate(zip(self.chunks_, self.starts_)) if bounds[i + 1] > bounds[i]]
+        return pd.concat(parts) if parts else self.chunks_[0].iloc[:0].copy()
+
+    def _customer_row_ids(self, customers):
+        row_id = [self.customer_rows_[customer] for customer in customers if customer in self.customer_rows_]
+        return np.concatenate(row_id) if row_id else np.empty(0, dtype=np.int64)
+
+    def _fit_all(self):
+        # Ajusta todas as etapas no histórico completo, guardando as colunas de cada etapa global (ver _StepInputs).
+        if len(self.chunks_) > 1:
+            self.chunks_, self.starts_ = [pd.concat(self.chunks_)], [0]
+        data = self.chunks_[0].copy()
+        self.inputs_, self.columns_ = {}, {}
+        with ETL._inplace():  # As linhas pertencem a esta execução (cópia dos blocos de entrada).
+            for position, step in enumerate(self.steps_):
+                if step._scope == 'global':
+                    # Colunas lidas pela etapa e colunas alteradas por ela ou pelas etapas seguintes: com as demais
+                    # colunas do resultado, formam a entrada da etapa de qualquer linha (ver _step_input).
+                    written = set().union(*(later._output_columns() for later in self.steps_[position:]))
+                    self.columns_[position] = list(data.columns)
+                    self.inputs_[position] = _StepInputs(sorted((step._input_columns() | written) & set(data.columns)))
+                    self.inputs_[position].set(data)
+                data = step.fit_transform(data)
+
+        self.outputs_ = []
+        self.version_ = np.full(self.n_rows_, -1)
+        self.positions_ = np.zeros(self.n_rows_, dtype=np.int64)
+        self.n_live_ = self.n_output_rows_ = 0
+        self._store_output(data, np.empty(0, dtype=np.int64))
+
+    def fit(self, X, y=None):
+        self.steps_ = self._steps()
+        self.chunks_, self.starts_, self.customer_rows_, self.n_rows_ = [], [], {}, 0
+        self._append(X)
+        self._fit_all()
+        return self
+
+    def _update_global(self, position, step, data, affected):
+
+        """
+        Atualiza as contagens (ou os sketches) da etapa global com as linhas dos clientes afetados e retorna os ROW_ID
+        das linhas dos demais clientes que passam a ser afetadas pela mudança da estatística.
+        """
+
+        inputs = self.inputs_[position]
+        columns = sorted(step._input_columns() & set(inputs.columns))
+        old = inputs.frame(inputs.present_ids(affected))[columns]
+        previous = _statistics(step)
+
+        inputs.discard(affected)
+        inputs.set(data)
+        if getattr(step, 'approximate', False):
+            # Os sketches não permitem retirar linhas: a etapa é ajustada novamente nas colunas guardadas.
+            step.fit(inputs.frame(inputs.present_ids())[columns])
+        else:
+            # Retirando as contagens das linhas antigas dos clientes afetados e somando as novas.
+            if len(old):
+                step._remove(clone(step).fit(old))
+            step.partial_fit(data)
+        if _same_statistics(previous, _statistics(step)):
+            return np.empty(0, dtype=np.int64)
+
+        # Linhas dos demais clientes cuja saída da etapa muda com a nova estatística.
+        others = inputs.present.copy()
+        others[affected[affected < len(others)]] = False
+        others = np.flatnonzero(others)
+        before = clone(step)
+        vars(before).update(previous)
+        changed = others[_changed(before.transform(inputs.frame(others)[columns]), step.transform(inputs.frame(others)[columns]),
+                                  step._output_columns())]
+        if not len(changed):
+            return changed
+
+        # Todas as linhas dos clientes alterados (as linhas sem cliente são independentes).
+        customers = self._rows(changed)[self.customer_column]
+        return np.union1d(changed[customers.isna().to_numpy()], self._customer_row_ids(customers.dropna().unique()))
+
+    def update(self, X):
+
+        """
+        Adiciona as novas linhas ao histórico e atualiza o resultado, recalculando apenas os clientes presentes em X
+        (e os clientes com linhas alteradas por uma mudança de estatística global).
+
+        Parâmetros:
+        X: pandas.DataFrame
+            Novas linhas, com as mesmas colunas do histórico.
+        """
+
+        old_rows = self._customer_row_ids(X[self.customer_column].dropna().unique())
+        start = self.n_rows_
+        self._append(X)
+        affected = np.concatenate([old_rows, np.arange(start, self.n_rows_)])
+
+        if len(affected) > self.recompute_fraction * self.n_rows_:
+            self._fit_all()
+            return self
+
+        # Linhas dos clientes afetados (histórico e novas linhas).
+        data = self._sorted(self._rows(affected))
+
+        with ETL._inplace():  # As linhas processadas são cópias criadas nesta atualização.
+            for position, step in enumerate(self.steps_):
+                if step._scope == 'global':
+                    extra = self._update_global(position, step, data, affected)
+                    if len(extra):
+                        data = self._sorted(pd.concat([data, self._step_input(position, extra)]))
+                        affected = np.concatenate([affected, extra])
+                data = self._apply(step, data)
+
+        self._store_output(data, affected)
+        return self
+
+    def _step_input(self, position, row_id):
+        # Entrada da etapa global nas linhas row_id, sem reprocessar as etapas anteriores: as colunas guardadas da etapa
+        # e as demais colunas do resultado atual (não alteradas pela etapa nem pelas seguintes). As linhas removidas
+        # por uma etapa seguinte (ex.: sem Customer_ID) são reprocessadas a partir das suas linhas de entrada.
+        in_output = self.version_[row_id] >= 0
+        parts = []
+        for block in np.unique(self.version_[row_id[in_output]]):
+            block_rows = row_id[self.version_[row_id] == block]
+            rows = self.outputs_[block].iloc[self.positions_[block_rows]][self.columns_[position]].copy()
+            stored = self.inputs_[position].frame(block_rows)
+            for column_name in stored.columns:
+                rows[column_name] = stored[column_name].to_numpy()
+            parts.append(rows)
+
+        if not in_output.all():
+            rows = self._sorted(self._rows(row_id[~in_output]))
+            for step in self.steps_[:position]:
+                rows = self._apply(step, rows)
+            parts.append(rows)
+        return pd.concat(parts)
+
+    def _store_output(self, data, affected):
+        # Resultado das linhas afetadas em um novo bloco; as versões anteriores dessas linhas deixam de valer. Os blocos
+        # são concatenados quando as versões antigas passam das linhas válidas (ou há blocos demais).
+        self.version_ = _grow(self.version_, self.n_rows_, -1)
+        self.positions_ = _grow(self.positions_, self.n_rows_)
+        self.n_live_ -= int((self.version_[affected] >= 0).sum())
+        self.version_[affected] = -1
+
+        row_id = data[ROW_ID].to_numpy()
+        self.outputs_.append(data)
+        self.version_[row_id] = len(self.outputs_) - 1
+        self.positions_[row_id] = np.arange(len(data))
+        self.n_live_ += len(data)
+        self.n_output_rows_ += len(data)
+        if len(self.outputs_) > _MAX_BLOCKS or self.n_output_rows_ > 2 * max(self.n_live_, 1):
+            self._compact_outputs()
+
+    def _compact_outputs(self):
+        if len(self.outputs_) > 1:
+            data = pd.concat([block[self.version_[block[ROW_ID].to_numpy()] == i] for i, block in enumerate(self.outputs_)])
+            row_id = data[ROW_ID].to_numpy()
+            self.outputs_ = [data]
+            self.version_[row_id] = 0
+            self.positions_[row_id] = np.arange(len(data))
+            self.n_output_rows_ = len(data)
+        return self.outputs_[0]
+
+    def result(self):
+        return self._sorted(self._compact_outputs()).drop(columns=ROW_ID).reset_index(drop=True)
+
+
+# Estatísticas aprendidas por uma etapa global, sem as contagens de valores e os sketches de onde elas são calculadas.
+def _statistics(step):
+    return {name: value for name, value in step._learned().items() if name not in ('value_counts_', 'sketches_')}
+
+
+# Compara as estatísticas aprendidas por uma etapa global (valores escalares ou dict de escalares).
+def _same_statistics(previous, current):
+    def same(a, b):
+        if isinstance(a, dict):
+            return a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+        return a == b or (pd.isna(a) and pd.isna(b))
+    return previous.keys() == current.keys() and all(same(previous[name], current[name]) for name in previous)
+
+
+# Linhas com algum valor diferente entre as duas saídas da etapa (nulos iguais entre si).
+def _changed(before, after, columns):
+    changed = np.zeros(len(before), dtype=bool)
+    for column_name in columns & set(before.columns):
+        a, b = before[column_name], after[column_name]
+        changed |= ~((a == b) | (a.isna() & b.isna())).to_numpy()
+    return changed
@@ -0,0 +1,155 @@
+import copy
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+# --------------------------------------------------------------------- #
+import ETL
+
+
+
+
+# Coluna auxiliar com a posição original de cada linha, usada para remontar o resultado.
+ROW_ID = '__row_id__'
+
+
+# Executa uma sequência de etapas sobre uma partição (função de módulo para poder ser enviada aos processos).
+def _run_partition(partition, plan):
+    plan = copy.deepcopy(plan)  # No backend sequencial as etapas não são copiadas pelo pickle.
+    fitted = []
+    for step, action in plan:
+        step.copy = False  # A partição pertence ao processo, não é necessário copiá-la a cada etapa.
+        if action == 'partial_fit':
+            step.partial_fit(partition)
+        elif action == 'fit_transform':
+            partition = step.fit_transform(partition)
+        else:
+            partition = step.transform(partition)
+
+        if action != 'transform':
+            fitted.append(step)
+    return partition, fitted
+
+
+# Execução paralela do pipeline do ETL com as linhas particionadas por Customer_ID.
+class ParallelETL:
+
+    """
+    Executa as etapas de um pipeline do ETL em vários processos, com as linhas particionadas pelo hash do Customer_ID.
+
+    Todas as linhas de um cliente ficam na mesma partição, então as etapas por cliente (_scope='customer') e por linha
+    (_scope='row') rodam em cada partição sem comunicação. As etapas globais (_scope='global') são ajustadas em duas fases:
+    cada partição calcula suas contagens com partial_fit (map) e o processo principal soma as contagens com _merge (reduce),
+    enviando a etapa ajustada às partições na rodada seguinte. Etapas globais consecutivas e independentes entre si são
+    ajustadas na mesma rodada. Etapas que não herdam de BaseTransformer rodam no processo principal com o DataFrame completo.
+
+    O resultado é remontado na ordem (e com o index) original das linhas. A ordenação por Customer_ID feita pelo
+    ModifyMonthCreditHistory na execução serial não é reproduzida, pois cada partição é ordenada separadamente.
+
+    Parâmetros:
+    pipeline: Pipeline
+        Pipeline (ETLPipeline ou Pipeline do Scikit-Learn) com as etapas do ETL. As etapas são ajustadas no próprio pipeline.
+    n_jobs: int (default=-1)
+        Quantidade de processos (mesma convenção do joblib, -1 utiliza todos os núcleos).
+    n_partitions: int (default=None)
+        Quantidade de partições. Quando None utiliza a quantidade de processos.
+    customer_column: str
+        Coluna utilizada para particionar as linhas.
+    backend: str (default='loky')
+        Backend do joblib.
+
+    Métodos:
+    fit: Ajusta as etapas do pipeline.
+    transform: Transforma o DataFrame com as etapas já ajustadas, em uma única rodada.
+    fit_transform: Ajusta e transforma o DataFrame.
+    """
+
+    def __init__(self, pipeline, n_jobs=-1, n_partitions=None, customer_column='Customer_ID', backend='loky'):
+        self.pipeline = pipeline
+        self.n_jobs = n_jobs
+        self.n_partitions = n_partitions
+        self.customer_column = customer_column
+        self.backend = backend
+
+    def _steps(self):
+        return [step for _, step in self.pipeline.steps if step not in (None, 'passthrough')]
+
+    def _partition(self, X):
+        n_partitions = self.n_partitions or effective_n_jobs(self.n_jobs)
+        codes = pd.util.hash_pandas_object(X[self.customer_column], index=False).to_numpy() % n_partitions
+
+        # Ordenação estável: dentro de cada partição as linhas mantêm a ordem original.
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(1, n_partitions))
+        return [X.take(rows) for rows in np.split(order, bounds) if len(rows)]
+
+    def _gather(self, partitions):
+        X = pd.concat(partitions)
+
+        # Colunas categóricas com categorias diferentes entre as partições voltam do concat como object.
+        for column_name in X.columns:
+            if isinstance(partitions[0][column_name].dtype, pd.CategoricalDtype) and X[column_name].dtype == object:
+                X[column_name] = X[column_name].astype('category')
+        return X.take(np.argsort(X[ROW_ID].to_numpy(), kind='stable'))
+
+    def _map(self, partitions, plan):
+        if not plan:
+            return partitions
+        # Sem memmap (max_nbytes=None): as etapas alteram a partição in-place e os memmaps do joblib são somente leitura.
+        results = Parallel(n_jobs=self.n_jobs, backend=self.backend, max_nbytes=None)(
+            delayed(_run_partition)(partition, plan) for partition in partitions)
+
+        # Reduce: combinando nas etapas do pipeline o estado aprendido em cada partição.
+        fitted_steps = [step for step, action in plan if action != 'transform']
+        for _, fitted in results:
+            for step, fitted_step in zip(fitted_steps, fitted):
+                step._merge(fitted_step)
+        return [partition for partition, _ in results]
+
+    def _run(self, X, fit):
+        index = X.index
+        partitions = self._partition(X.assign(**{ROW_ID: np.arange(len(X))}))
+        plan, pending = [], []
+
+        def run_round():
+            # Executa a rodada atual; as etapas globais ajustadas nela são aplicadas no início da próxima rodada.
+            nonlocal partitions, plan, pending
+            partitions = self._map(partitions, plan)
+            plan, pending = [(global_step, 'transform') for global_step in pending], []
+
+        for step in self._steps():
+            if not isinstance(step, ETL.BaseTransformer):
+                run_round()
+                run_round()
+                X = self._gather(partitions)
+                partitions = self._partition(step.fit_transform(X) if fit else step.transform(X))
+            elif fit and step._scope == 'global':
+                # Nova rodada apenas quando a etapa lê colunas alteradas pelas etapas globais ainda não ajustadas.
+                if pending and step._input_columns() & set().union(*(s._output_columns() for s in pending)):
+                    run_round()
+                step._reset()
+                plan.append((step, 'partial_fit'))
+                pending.append(step)
+            else:
+                if pending:
+                    run_round()
+                if fit:
+                    step._reset()
+                plan.append((step, 'fit_transform' if fit else 'transform'))
+
+        run_round()
+        run_round()
+        X = self._gather(partitions)
+        # Index das linhas que sobraram (ModifyMonthCreditHistory remove as linhas sem Customer_ID).
+        X.index = index.take(X[ROW_ID].to_numpy())
+        return X.drop(columns=ROW_ID)
+
+    def fit(self, X, y=None):
+        self._run(X, fit=True)
+        return self
+
+    def fit_transform(self, X, y=None):
+        return self._run(X, fit=True)
+
+    def transform(self, X):
+        return self._run(X, fit=False)
@@ -0,0 +1,222 @@
+# --------------------------------------------------------------------- #
+import ETL
+
+
+
+
+# Sequência de etapas do ETL executada como uma única etapa do pipeline.
+class FusedStep(ETL.BaseTransformer):
+
+    """
+    Executa uma sequência de etapas do ETL como uma única etapa: o DataFrame é copiado uma vez (quando copy=True), as
+    etapas rodam em modo in-place e o agrupamento por Customer_ID é calculado uma única vez e compartilhado entre as
+    etapas por cliente. As etapas continuam sendo executadas uma após a outra, cada uma com a sua própria passada sobre
+    as suas colunas (não há fusão das regras em um único laço). As etapas precisam manter as linhas e o Customer_ID;
+    apenas a última pode remover ou reordenar linhas (_changes_rows).
+
+    Parâmetros:
+    steps: list of tuple
+        Lista de etapas (nome, transformador), igual ao Pipeline do Scikit-Learn.
+    copy: bool (default=True)
+        Quando True a sequência trabalha sobre uma cópia do DataFrame recebido.
+
+    Métodos:
+    fit: Ajusta as etapas em sequência (cada etapa é ajustada na saída da anterior).
+    fit_transform: Ajusta e transforma cada etapa em sequência, sem repetir o transform.
+    transform: Aplica as etapas em sequência.
+    """
+
+    def __init__(self, steps, copy=True):
+        self.steps = steps
+        self.copy = copy
+
+    @property
+    def _scope(self):
+        scopes = {step._scope for _, step in self.steps}
+        return 'global' if 'global' in scopes else 'customer' if 'customer' in scopes else 'row'
+
+    @property
+    def _changes_rows(self):
+        return any(step._changes_rows for _, step in self.steps)
+
+    def _input_columns(self):
+        return set().union(*(step._input_columns() for _, step in self.steps))
+
+    def _output_columns(self):
+        return set().union(*(step._output_columns() for _, step in self.steps))
+
+    def _run(self, X, fit):
+        X_transformed = self._get_input(X)  # Copiando o input do dataframe (quando copy=True) uma única vez para todas as etapas.
+
+        with ETL._inplace(), ETL._shared_customer_groups() as shared:
+            for _, step in self.steps:
+                if fit:
+                    step.fit(X_transformed)
+                X_transformed = step.transform(X_transformed)
+                if step._changes_rows:
+                    shared.clear()  # As linhas mudaram: o agrupamento é recalculado.
+
+        return X_transformed
+
+    def fit(self, X, y=None):
+        self._run(X, fit=True)
+        return self
+
+    def fit_transform(self, X, y=None):
+        return self._run(X, fit=True)
+
+    def transform(self, X):
+        return self._run(X, fit=False)
+
+
+# Parâmetros que definem o resultado da etapa (sem o copy, que não altera o resultado).
+def _step_params(step):
+    return {name: value for name, value in step.get_params(deep=False).items() if name != 'copy'}
+
+
+# Verifica se a etapa pode mudar linhas ou colunas de forma não declarada (não herda de BaseTransformer) ou se é uma
+# barreira para o agrupamento compartilhado (remove/reordena linhas ou escreve o Customer_ID).
+def _is_barrier(step):
+    return not isinstance(step, ETL.BaseTransformer) or step._changes_rows or 'Customer_ID' in step._output_columns()
+
+
+# Grafo de dependências: para cada etapa, as etapas anteriores que escreveram alguma coluna lida por ela.
+def _dependency_graph(steps):
+    graph = []
+    for i, (_, step) in enumerate(steps):
+        if not isinstance(step, ETL.BaseTransformer):
+            graph.append(set(range(i)))  # Colunas desconhecidas: depende de todas as etapas anteriores.
+            continue
+        inputs = step._input_columns()
+        graph.append({j for j, (_, previous) in enumerate(steps[:i])
+                      if not isinstance(previous, ETL.BaseTransformer) or previous._changes_rows or previous._output_columns() & inputs})
+    return graph
+
+
+# Retira as repetições de etapas idempotentes e retorna (etapas mantidas, [(etapa removida, etapa repetida)]).
+def _remove_repeats(steps):
+    kept, removed = [], []
+    for name, step in steps:
+        repeated = None
+        if isinstance(step, ETL.BaseTransformer) and step._idempotent:
+            columns = step._input_columns() | step._output_columns()
+            for previous_name, previous in reversed(kept):
+                if type(previous) is type(step) and _step_params(previous) == _step_params(step):
+                    repeated = previous_name
+                    break
+                # Uma etapa intermediária que altera as colunas da etapa (ou as linhas) torna a repetição necessária.
+                if _is_barrier(previous) or previous._output_columns() & columns:
+                    break
+        if repeated is None:
+            kept.append((name, step))
+        else:
+            removed.append((name, repeated))
+    return kept, removed
+
+
+# Divide as etapas em estágios: sequências sem barreira, terminadas pela etapa que remove ou reordena linhas.
+def _split_stages(steps):
+    stages, current = [], []
+    for name, step in steps:
+        if not isinstance(step, ETL.BaseTransformer):
+            if current:
+                stages.append(current)
+            stages.append([(name, step)])
+            current = []
+            continue
+        current.append((name, step))
+        if _is_barrier(step):
+            stages.append(current)
+            current = []
+    if current:
+        stages.append(current)
+    return stages
+
+
+# Planejador da execução de um pipeline do ETL.
+class PipelinePlanner:
+
+    """
+    Otimiza a execução de um pipeline do ETL a partir das colunas lidas e escritas por cada etapa (_input_columns e
+    _output_columns), com o mesmo resultado da execução etapa a etapa:
+
+    - Repetições de etapas idempotentes (_idempotent) com os mesmos parâmetros são removidas quando nenhuma etapa entre
+      elas altera as colunas da etapa nem as linhas.
+    - As etapas consecutivas são unidas em estágios (FusedStep), executados em sequência com uma única cópia do
+      DataFrame e um único agrupamento por Customer_ID compartilhado entre as etapas por cliente. Um estágio termina na etapa que remove ou
+      reordena linhas (ModifyMonthCreditHistory), em etapas que escrevem o Customer_ID e em etapas que não herdam de
+      BaseTransformer (executadas sozinhas).
+
+    A ordem das etapas é mantida: as etapas globais são ajustadas com os mesmos dados da execução original. O plano é
+    voltado para a execução serial (os estágios com etapas globais não são divididos em partições).
+
+    Parâmetros:
+    pipeline: Pipeline
+        Pipeline (ETLPipeline ou Pipeline do Scikit-Learn) com as etapas do ETL. As etapas são ajustadas no próprio pipeline.
+    copy: bool (default=True)
+        Quando True o input é copiado uma vez no início, preservando o DataFrame original.
+
+    Métodos:
+    fit, transform, fit_transform: Executa o pipeline otimizado (plan_).
+    explain: Retorna o texto com o plano otimizado.
+    """
+
+    def __init__(self, pipeline, copy=True):
+        self.pipeline = pipeline
+        self.copy = copy
+
+        self.steps_ = [(name, step) for name, step in pipeline.steps if step not in (None, 'passthrough')]
+        self.graph_ = _dependency_graph(self.steps_)
+        kept, self.removed_ = _remove_repeats(self.steps_)
+        self.stages_ = _split_stages(kept)
+
+        plan_steps = []
+        for i, stage in enumerate(self.stages_, start=1):
+            if len(stage) == 1:
+                plan_steps.append(stage[0])
+            else:
+                plan_steps.append((f'stage_{i}', FusedStep(stage)))
+        self.plan_ = ETL.ETLPipeline(plan_steps, copy=copy)
+
+    def fit(self, X, y=None):
+        self.plan_.fit(X, y)
+        return self
+
+    def fit_transform(self, X, y=None):
+        return self.plan_.fit_transform(X, y)
+
+    def transform(self, X):
+        return self.plan_.transform(X)
+
+    def explain(self):
+
+        """
+        Retorna o plano otimizado: os estágios com as etapas, o escopo de cada etapa, as etapas de que cada uma depende
+        (que escreveram alguma coluna lida por ela) e as repetições removidas.
+        """
+
+        names = [name for name, _ in self.steps_]
+        positions = {name: i for i, name in enumerate(names)}
+        lines = [f'Plano otimizado: {len(self.steps_)} etapas em {len(self.stages_)} estágios, '
+                 f'{len(self.removed_)} repetições removidas.']
+
+        for i, stage in enumerate(self.stages_, start=1):
+            grouped = sum(isinstance(step, ETL.BaseTransformer) and step._scope == 'customer' for _, step in stage)
+            summary = f'{len(stage)} etapas em sequência com uma cópia' if len(stage) > 1 else 'etapa isolada'
+            if grouped > 1:
+                summary += f', Customer_ID agrupado uma vez para {grouped} etapas por cliente'
+            lines.append(f'Estágio {i} ({summary}):')
+
+            for name, step in stage:
+                scope = step._scope if isinstance(step, ETL.BaseTransformer) else '?'
+                line = f'  {name} [{type(step).__name__}, {scope}]'
+                dependencies = [names[j] for j in sorted(self.graph_[positions[name]])]
+                if dependencies:
+                    line += ' <- ' + ', '.join(dependencies)
+                if isinstance(step, ETL.BaseTransformer) and step._changes_rows:
+                    line += ' (reordena/remove linhas)'
+                lines.append(line)
+
+        for name, repeated in self.removed_:
+            lines.append(f'Removida: {name} (repetição idempotente de {repeated}).')
+        return '\n'.join(lines)
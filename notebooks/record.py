@@ -0,0 +1,494 @@
+import re
+from math import ceil
+
+import numpy as np
+import pandas as pd
+# --------------------------------------------------------------------- #
+import ETL
+
+
+
+
+# Verifica se um valor escalar é nulo (None, NaN, NA ou NaT), sem o custo do pd.isna.
+def _isna(value):
+    return value is None or value is pd.NA or value is pd.NaT or (isinstance(value, (float, np.floating)) and value != value)
+
+
+# Verifica se um valor escalar é numérico (int ou float, do Python ou do NumPy, sem bool).
+def _is_number(value):
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
+# Conversão de um valor para numérico, igual ao pd.to_numeric(errors='coerce').
+def _to_number(value):
+    if not isinstance(value, str):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+
+
+# Tabela {Customer_ID: valor} a partir de uma Series indexada pelo Customer_ID, sem os valores nulos.
+def _customer_table(values):
+    return {customer: value for customer, value in values.items() if not _isna(value)}
+
+
+# Customer_ID com algum valor str da coluna para o qual match retorna verdadeiro (avaliado uma vez por valor distinto).
+def _customers_with(X, column_name, match):
+    matched = ETL._map_unique(X[column_name], lambda values: values.map(lambda value: int(isinstance(value, str) and bool(match(value)))),
+                              'numeric') > 0
+    return set(X.loc[matched, 'Customer_ID'].dropna())
+
+
+# Regras de cada transformador do ETL para um único registro. Cada função recebe a etapa ajustada e os DataFrames de
+# entrada e de saída da etapa no fit (para as tabelas por cliente e os dtypes) e retorna a regra, que altera o registro (dict).
+
+def _compile_transform_to_null(step, X, X_transformed):
+    columns = [(column_name, (ETL._SPECIAL_CHARS if column_name in ('SSN', 'Payment_Behaviour') else ETL._SPECIAL_CHARS_ONLY)[0].search)
+               for column_name in step.column_names]
+
+    def rule(record):
+        for column_name, search in columns:
+            value = record.get(column_name)
+            if isinstance(value, str):
+                if search(value):
+                    record[column_name] = np.nan
+                elif not value.strip():
+                    record[column_name] = pd.NA
+            elif _isna(value):
+                record[column_name] = pd.NA
+    return rule
+
+
+def _compile_credit_card(step, X, X_transformed):
+    column_name = step.column_name
+
+    def rule(record):
+        value = record.get(column_name)
+        if _is_number(value) and value <= 0:
+            record[column_name] = 1
+    return rule
+
+
+def _compile_type_of_loan(step, X, X_transformed):
+    column_name = step.column_name
+
+    def rule(record):
+        if _isna(record.get(column_name)):
+            record[column_name] = "Not Specified"
+    return rule
+
+
+def _compile_delayed_payment(step, X, X_transformed):
+    column_name = step.column_name
+    modes, global_mode = step.customer_modes_.to_dict(), step.global_mode_
+
+    # (coluna == 0) & Delay_from_due_date > 0: o & é avaliado antes do >. Com Delay_from_due_date inteiro o & é bit a bit
+    # (apenas valores ímpares), com float é o "e" lógico (valores diferentes de 0 e não nulos).
+    if X['Delay_from_due_date'].dtype.kind in 'iu':
+        delayed = lambda delay: _is_number(delay) and not _isna(delay) and int(delay) & 1 == 1
+    else:
+        delayed = lambda delay: _is_number(delay) and not _isna(delay) and delay != 0
+
+    def rule(record):
+        value = record.get(column_name)
+        if _isna(value):
+            value = 0
+        if value == 0:
+            customer = record.get('Customer_ID')
+            value = modes.get(customer, global_mode) if not _isna(customer) else global_mode
+        if value == 0 and delayed(record.get('Delay_from_due_date')):
+            value = 1
+        record[column_name] = value
+    return rule
+
+
+def _compile_monthly_salary(step, X, X_transformed):
+    column_name = step.column_name
+    medians, global_median = step.customer_medians_.to_dict(), step.global_median_
+
+    def rule(record):
+        if _isna(record.get(column_name)):
+            customer = record.get('Customer_ID')
+            record[column_name] = medians.get(customer, global_median) if not _isna(customer) else global_median
+    return rule
+
+
+def _compile_num_bank_accounts(step, X, X_transformed):
+    column_name = step.column_name
+    n_rows = X['Customer_ID'].value_counts().to_dict()
+
+    def rule(record):
+        # Quantidade de linhas do cliente contando o próprio registro.
+        value, customer = record.get(column_name), record.get('Customer_ID')
+        if _is_number(value) and value <= 0 and not _isna(customer):
+            record[column_name] = n_rows.get(customer, 0) + 1
+    return rule
+
+
+def _compile_monthly_balance(step, X, X_transformed):
+    column_name, mode = step.column_name, step.mode_
+
+    def rule(record):
+        if _isna(record.get(column_name)):
+            record[column_name] = mode
+    return rule
+
+
+def _compile_missing_values(step, X, X_transformed):
+    # Último valor não nulo de cada coluna por cliente (o registro é o mês mais recente, então só há o ffill).
+    last = X.groupby('Customer_ID', sort=False, observed=True)[list(step.column_names)].last()
+    tables = [(column_name, _customer_table(last[column_name])) for column_name in step.column_names]
+
+    def rule(record):
+        customer = record.get('Customer_ID')
+        if _isna(customer):
+            return
+        for column_name, table in tables:
+            if _isna(record.get(column_name)):
+                record[column_name] = table.get(customer, record.get(column_name))
+    return rule
+
+
+def _compile_not_numbers(step, X, X_transformed):
+    sub = ETL._NOT_DIGITS[0].sub
+    text_columns = [column_name for column_name in step.column_names
+                    if ETL._is_text(X[column_name]) or isinstance(X[column_name].dtype, pd.CategoricalDtype)]
+    numeric_columns = [column_name for column_name in step.column_names if column_name not in text_columns]
+    int64_max = np.iinfo(np.int64).max
+
+    # No pipeline uma coluna em que nenhum valor do histórico do cliente (e do registro) contém números não é alterada;
+    # nas demais os valores sem números viram NaN.
+    with_digits = {column_name: _customers_with(X, column_name, lambda value: sub('', value)) for column_name in text_columns}
+
+    def rule(record):
+        customer = record.get('Customer_ID')
+        for column_name in text_columns:
+            value = record.get(column_name)
+            if isinstance(value, str) and (digits := sub('', value)):
+                number = int(digits)
+                record[column_name] = number if number <= int64_max else float(number)
+            elif customer in with_digits[column_name]:
+                record[column_name] = np.nan
+        for column_name in numeric_columns:
+            value = record.get(column_name)
+            if _is_number(value):
+                record[column_name] = abs(value)
+    return rule
+
+
+def _compile_modify_month(step, X, X_transformed):
+    column_name, search = step.column_name, re.compile(step._pattern).search
+    n_rows = X['Customer_ID'].value_counts().to_dict()
+
+    def rule(record):
+        customer = record.get('Customer_ID')
+        if _isna(customer):
+            return False  # Linhas sem Customer_ID são descartadas pelo ModifyMonthCreditHistory.
+
+        month_number = n_rows.get(customer, 0) + 1
+        value = record.get(column_name)
+        match = search(value) if isinstance(value, str) else None
+        if match:
+            record[column_name] = f'{match.group(1)} and {month_number}{match.group(2)}'
+
+        if step.add_numeric_columns:
+            years = re.search(r'(\d+)', match.group(1)) if match else None
+            record[f'{column_name}_Years'] = float(years.group(1)) if years else np.nan
+            record[f'{column_name}_Months'] = month_number if match else np.nan
+    return rule
+
+
+def _compile_credit_history_date(step, X, X_transformed):
+    column_name, search = step.column_name, re.compile(step._pattern).search
+    reference_month = step.reference_month_
+
+    def rule(record):
+        value = record.get(column_name)
+        match = search(value) if isinstance(value, str) else None
+        if match:
+            months = reference_month - (int(match.group(1)) * 12 + int(match.group(2)))
+            record['Credit_History_Age_Date'] = pd.Timestamp(np.datetime64(months - 1970 * 12, 'M'))
+        else:
+            record['Credit_History_Age_Date'] = pd.NaT
+    return rule
+
+
+def _compile_month_number(step, X, X_transformed):
+    column_name, month_dic = step.column_name, step.month_dic
+
+    def rule(record):
+        value = record.get(column_name)
+        record['Number_Month'] = month_dic.get(value.lower(), np.nan) if isinstance(value, str) else np.nan
+    return rule
+
+
+def _compile_binary_values(step, X, X_transformed):
+    column_name, binary_dic = step.column_name, step.binary_dic
+
+    def rule(record):
+        value = record.get(column_name)
+        record[column_name] = binary_dic.get(value, np.nan) if isinstance(value, str) else np.nan
+    return rule
+
+
+def _compile_convert_numeric(step, X, X_transformed):
+    # Apenas as colunas que chegaram como object no fit são convertidas; as demais já são numéricas. Como no
+    # CleaningNotNumbers, a coluna só é convertida quando algum valor do histórico do cliente ou do registro contém números.
+    columns = [column_name for column_name in step.column_names if pd.api.types.is_object_dtype(X[column_name])]
+    search = re.compile(r'\d').search
+    with_digits = {column_name: _customers_with(X, column_name, search) for column_name in columns}
+
+    def rule(record):
+        customer = record.get('Customer_ID')
+        for column_name in columns:
+            value = record.get(column_name)
+            if not isinstance(value, str) or customer in with_digits[column_name] or search(value):
+                record[column_name] = _to_number(value)
+    return rule
+
+
+def _compile_quantile(step, X, X_transformed):
+    bounds = [(column_name, upper_bound, ceil(upper_bound) if not np.isnan(upper_bound) else upper_bound)
+              for column_name, upper_bound in step.upper_bounds_.items()]
+
+    def rule(record):
+        for column_name, upper_bound, cap in bounds:
+            value = record.get(column_name)
+            if _is_number(value) and value > upper_bound:
+                record[column_name] = cap
+    return rule
+
+
+def _compile_mode(step, X, X_transformed):
+    limits = [(column_name, step._limit(column_name), step.modes_[column_name]) for column_name in step.column_names]
+
+    def rule(record):
+        for column_name, limit, mode in limits:
+            value = record.get(column_name)
+            if _is_number(value) and value >= limit:
+                record[column_name] = mode
+    return rule
+
+
+def _compile_num_credit_inquires(step, X, X_transformed):
+    column_name = step.column_name
+
+    # Contagens dos valores de cada cliente, a maior contagem e os valores empatados nela (ordenados).
+    counts = X[['Customer_ID', column_name]].dropna().groupby('Customer_ID', sort=False, observed=True)[column_name].value_counts()
+    customers = {}
+    for (customer, value), count in counts.items():
+        customers.setdefault(customer, {})[value] = count
+    tables = {}
+    for customer, value_counts in customers.items():
+        max_count = max(value_counts.values())
+        tables[customer] = (value_counts, max_count, sorted(value for value, count in value_counts.items() if count == max_count))
+
+    def rule(record):
+        customer, value = record.get('Customer_ID'), record.get(column_name)
+        if _isna(customer):
+            return
+        value_counts, max_count, modes = tables.get(customer, ({}, 0, []))
+
+        # Somando o próprio registro às contagens do cliente.
+        if not _isna(value):
+            count = value_counts.get(value, 0) + 1
+            if count > max_count:
+                modes = [value]
+            elif count == max_count:
+                modes = sorted(modes + [value])
+
+        # Segunda moda quando o cliente é multimodal, senão a moda quando ela for menor ou igual a 20.
+        if len(modes) > 1:
+            record[column_name] = modes[1]
+        elif modes and modes[0] <= 20:
+            record[column_name] = modes[0]
+    return rule
+
+
+def _compile_encode_type_of_loan(step, X, X_transformed):
+    column_name, count_columns = step.column_name, step._count_column_names()
+    positions = {loan_type: i for i, loan_type in enumerate(step._vocabulary())}
+    split = re.compile(ETL._LOAN_SEPARATOR).split
+
+    def rule(record):
+        value = record.get(column_name)
+        counts = [0] * len(positions)
+        if isinstance(value, str):
+            for part in split(value):
+                i = positions.get(part.strip())
+                if i is not None:
+                    counts[i] += 1
+        record[column_name] = sum(1 << i for i, count in enumerate(counts) if count)
+        for count_column, count in zip(count_columns, counts):
+            record[count_column] = count
+    return rule
+
+
+def _compile_optimize_dtypes(step, X, X_transformed):
+    # Colunas numéricas reduzidas (int8/int16/float32...): o valor do registro recebe o mesmo dtype quando cabe nele
+    # sem alteração. Colunas category mantêm o valor (o registro não possui dtype de coluna).
+    casts = [(column_name, X_transformed[column_name].dtype.type) for column_name in step._columns()
+             if column_name in X_transformed.columns and isinstance(X_transformed[column_name].dtype, np.dtype)
+             and X_transformed[column_name].dtype.kind in 'iuf']
+
+    def rule(record):
+        for column_name, cast in casts:
+            value = record.get(column_name)
+            if _is_number(value) and not _isna(value):
+                with np.errstate(over='ignore', invalid='ignore'):
+                    converted = cast(value)
+                if converted == value:
+                    record[column_name] = converted
+    return rule
+
+
+def _compile_rolling_features(step, X, X_transformed):
+    # Histórico de cada cliente na entrada da etapa: as últimas linhas necessárias para as janelas, defasagens e
+    # diferenças (em ordem de mês) e os acumulados (quantidade, soma, mínimo e máximo) de cada coluna.
+    step._validate()
+    n_columns = len(step.column_names)
+    depth = max([*step.windows, *(shift + 1 for shift in (*step.lags, *step.diffs)), 1])
+
+    groups = ETL.GroupStatistics(X['Customer_ID'])
+    order = step._sort_order(X, groups)
+    codes = groups.codes[order]
+    values = np.column_stack([X[column_name].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+                              for column_name in step.column_names]) if n_columns else np.empty((len(codes), 0))
+    starts = np.searchsorted(codes, np.arange(groups.n_groups), side='left')
+    ends = np.searchsorted(codes, np.arange(groups.n_groups), side='right')
+    histories = {customer: values[max(start, end - depth + 1):end] for customer, start, end in zip(groups.uniques, starts, ends)}
+
+    valid = ~np.isnan(values)
+    accumulated = {}
+    if step.expanding:
+        with np.errstate(invalid='ignore'):
+            for customer, start, end in zip(groups.uniques, starts, ends):
+                customer_values, customer_valid = values[start:end], valid[start:end]
+                accumulated[customer] = (customer_valid.sum(axis=0), np.where(customer_valid, customer_values, 0).sum(axis=0),
+                                         np.where(customer_valid, customer_values, np.inf).min(axis=0, initial=np.inf),
+                                         np.where(customer_valid, customer_values, -np.inf).max(axis=0, initial=-np.inf))
+    empty_history = np.empty((0, n_columns))
+    empty_accumulated = (np.zeros(n_columns), np.zeros(n_columns), np.full(n_columns, np.inf), np.full(n_columns, -np.inf))
+    feature_names = step._feature_names()
+
+    def rule(record):
+        customer = record.get('Customer_ID')
+        if _isna(customer):
+            record.update(dict.fromkeys(feature_names, np.nan))  # Linhas sem Customer_ID recebem NaN.
+            return
+        current = np.array([float(value) if _is_number(value) else np.nan for value in (record.get(column_name) for column_name in step.column_names)])
+        rows = np.vstack([histories.get(customer, empty_history), current])
+
+        features = {}
+        for window in step.windows:
+            min_periods = window if step.min_periods is None else step.min_periods
+            windows = np.vstack([np.full((max(window - len(rows), 0), n_columns), np.nan), rows[-window:]]).T[None]
+            for statistic, result in ETL._window_statistics(windows, step.statistics, min_periods).items():
+                features[f'rolling{window}_{statistic}'] = result[0]
+        for shift in set(step.lags) | set(step.diffs):
+            lagged = rows[-1 - shift] if len(rows) > shift else np.full(n_columns, np.nan)
+            features[f'lag{shift}'], features[f'diff{shift}'] = lagged, current - lagged
+        if step.expanding:
+            count, total, minimum, maximum = accumulated.get(customer, empty_accumulated)
+            current_valid = ~np.isnan(current)
+            count = count + current_valid
+            total = total + np.where(current_valid, current, 0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                results = {'count': count.astype(np.float64), 'sum': np.where(count > 0, total, np.nan), 'mean': total / count,
+                           'min': np.where(count > 0, np.fmin(minimum, current), np.nan),
+                           'max': np.where(count > 0, np.fmax(maximum, current), np.nan)}
+            features.update({f'expanding_{statistic}': results[statistic] for statistic in step.expanding})
+
+        kinds = ([f'rolling{window}_{statistic}' for window in step.windows for statistic in step.statistics]
+                 + [f'lag{lag}' for lag in step.lags] + [f'diff{diff}' for diff in step.diffs]
+                 + [f'expanding_{statistic}' for statistic in step.expanding])
+        names = iter(feature_names)
+        for j in range(n_columns):
+            for kind in kinds:
+                record[next(names)] = float(features[kind][j])
+    return rule
+
+
+# Regras disponíveis para cada transformador do ETL.
+_COMPILERS = {
+    ETL.TransformToNull: _compile_transform_to_null,
+    ETL.CleaningMissingCreditCard: _compile_credit_card,
+    ETL.CleaningMissingTypeOfLoan: _compile_type_of_loan,
+    ETL.CleaningMissingDelayedPayment: _compile_delayed_payment,
+    ETL.CleaningMissingMonthlySalary: _compile_monthly_salary,
+    ETL.CleaningNumBankAccounts: _compile_num_bank_accounts,
+    ETL.CleaningMissingMonthlyBalance: _compile_monthly_balance,
+    ETL.CleaningMissingValues: _compile_missing_values,
+    ETL.CleaningNotNumbers: _compile_not_numbers,
+    ETL.ModifyMonthCreditHistory: _compile_modify_month,
+    ETL.CreateDateCreditHistoryColumn: _compile_credit_history_date,
+    ETL.CreateMonthNumberColumn: _compile_month_number,
+    ETL.TransformToBinaryValues: _compile_binary_values,
+    ETL.ConvertDtypeToNumeric: _compile_convert_numeric,
+    ETL.TreatingOutliersWithQuantile: _compile_quantile,
+    ETL.TreatingOutliersWithMode: _compile_mode,
+    ETL.TreatingOutliersNumCreditInquires: _compile_num_credit_inquires,
+    ETL.EncodeTypeOfLoan: _compile_encode_type_of_loan,
+    ETL.OptimizeDtypes: _compile_optimize_dtypes,
+    ETL.CreateRollingFeatures: _compile_rolling_features,
+}
+
+
+# Aplicação do pipeline do ETL em um único registro (dict), sem DataFrame.
+class RecordScorer:
+
+    """
+    Compila as etapas de um pipeline do ETL em regras de Python puro, aplicadas diretamente em um registro (dict), para
+    uso em tempo de resposta (ex.: dentro de um handler de requisição), sem a construção de DataFrames, cópias e groupby.
+
+    No fit o pipeline é ajustado e, na entrada de cada etapa, são montadas as tabelas por Customer_ID utilizadas pelas
+    regras (quantidade de linhas, último valor não nulo, contagens do Num_Credit_Inquiries), além das estatísticas
+    aprendidas pelas próprias etapas (modas, medianas, limites dos outliers).
+
+    Cada registro é tratado como o mês mais recente do seu cliente, após as linhas do fit, e recebe o mesmo resultado
+    que teria ao final do seu cliente em um pipeline.transform do histórico do cliente mais o registro. O histórico não é
+    alterado pelo registro: um nulo no último mês do histórico preenchido pelo bfill com o valor do registro não muda as
+    contagens usadas na moda do Num_Credit_Inquiries. Registros são independentes entre si.
+
+    Parâmetros:
+    pipeline: Pipeline
+        Pipeline (ETLPipeline ou Pipeline do Scikit-Learn) com as etapas do ETL. As etapas são ajustadas no próprio pipeline.
+
+    Métodos:
+    fit: Ajusta o pipeline no histórico e compila as regras.
+    __call__: Aplica as regras em um registro e retorna um novo dict (None quando o registro não possui Customer_ID, igual
+        ao descarte feito pelo ModifyMonthCreditHistory).
+    transform: Aplica as regras em uma lista de registros.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def fit(self, X, y=None):
+        self.rules_ = []
+        for name, step in self.pipeline.steps:
+            if step in (None, 'passthrough'):
+                continue
+            compiler = _COMPILERS.get(type(step))
+            if compiler is None:
+                raise TypeError(f"A etapa {name!r} ({type(step).__name__}) não possui regra para o modo de registro único; "
+                                f"etapas suportadas: {', '.join(cls.__name__ for cls in _COMPILERS)}.")
+            X_transformed = step.fit(X).transform(X)
+            self.rules_.append(compiler(step, X, X_transformed))
+            X = X_transformed
+        return self
+
+    def __call__(self, record):
+        record = dict(record)
+        for rule in self.rules_:
+            if rule(record) is False:
+                return None
+        return record
+
+    def transform(self, records):
+        return [self(record) for record in records]
@@ -0,0 +1,458 @@
+import argparse
+import asyncio
+import functools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+# --------------------------------------------------------------------- #
+import ETL
+import benchmark
+import record
+import synthetic
+
+
+
+
+# RecordScorer ajustado de cada processo do pool (ver _init_worker).
+_WORKER_SCORER = None
+
+
+# Pontua um micro-lote de registros (dicts) com o RecordScorer ajustado e retorna um resultado por registro.
+def score_records(scorer, records):
+
+    """
+    Aplica as regras do RecordScorer (record.py) em cada registro do micro-lote, na ordem recebida. Cada registro é
+    tratado como o mês mais recente do seu cliente, após o histórico visto no fit, e não enxerga os demais registros do
+    lote: o resultado não depende do tamanho nem da composição do micro-lote. Registros sem Customer_ID recebem None.
+
+    Parâmetros:
+    scorer: RecordScorer
+        Pipeline do ETL compilado e ajustado no histórico (RecordScorer(pipeline).fit(X)).
+    records: list of dict
+        Registros do micro-lote (nulos do JSON como None).
+    """
+
+    return scorer.transform(records)
+
+
+# Inicialização de cada processo do pool: o RecordScorer é enviado uma única vez, e não a cada micro-lote.
+def _init_worker(scorer):
+    global _WORKER_SCORER
+    _WORKER_SCORER = scorer
+
+
+def _score_in_worker(records):
+    return score_records(_WORKER_SCORER, records)
+
+
+# Agrupa pedidos individuais em micro-lotes.
+class MicroBatcher:
+
+    """
+    Serviço assíncrono (asyncio) que junta os pedidos recebidos em micro-lotes e executa cada lote em um pool de workers,
+    devolvendo o resultado de cada pedido.
+
+    Um lote é fechado quando atinge max_batch_size registros ou quando o primeiro registro do lote esperou max_wait
+    segundos. Um novo lote só começa a ser montado quando há um worker livre: com os workers ocupados os pedidos se
+    acumulam na fila e o próximo lote sai maior, diluindo o custo fixo do pandas por chamada.
+
+    Parâmetros:
+    function: callable
+        Função que recebe uma lista de registros e retorna a lista de resultados (mesmo tamanho e ordem).
+        Ex.: functools.partial(score_records, scorer). O resultado de cada registro não deve depender dos demais
+        registros do lote (o agrupamento em lotes é apenas uma questão de desempenho).
+    max_batch_size: int (default=64)
+        Quantidade máxima de registros por lote.
+    max_wait: float (default=0.005)
+        Tempo máximo (segundos) que o primeiro registro de um lote aguarda outros registros.
+    executor: concurrent.futures.Executor (default=None)
+        Pool de workers. Quando None utiliza uma ThreadPoolExecutor de workers threads.
+    workers: int (default=1)
+        Quantidade de lotes executados ao mesmo tempo (e de threads quando executor=None).
+
+    Métodos:
+    start / stop: Inicia e encerra a montagem dos lotes (também via async with). O stop aguarda os lotes em execução;
+        os registros ainda na fila (ou em um lote não iniciado) recebem um RuntimeError.
+    submit: Envia um registro e aguarda o seu resultado (RuntimeError após o stop).
+    """
+
+    def __init__(self, function, max_batch_size=64, max_wait=0.005, executor=None, workers=1):
+        self.function = function
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self.workers = workers
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._own_executor = self.executor is None
+        self._executor = ThreadPoolExecutor(self.workers) if self._own_executor else self.executor
+        self._running = set()
+        self._pending = []
+        self._stopped = False
+        self.n_batches = self.n_records = 0
+        self._task = asyncio.create_task(self._collect())
+        return self
+
+    async def stop(self):
+        self._stopped = True
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+        # Registros que não chegaram a um lote em execução: o lote em montagem e a fila.
+        while not self._queue.empty():
+            self._pending.append(self._queue.get_nowait())
+        error = RuntimeError('MicroBatcher encerrado antes do processamento do registro.')
+        for _, future in self._pending:
+            if not future.done():
+                future.set_exception(error)
+        self._pending = []
+
+        if self._own_executor:
+            self._executor.shutdown()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def submit(self, record):
+        if self._stopped:
+            raise RuntimeError('MicroBatcher encerrado.')
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((record, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            # Lote em montagem guardado no MicroBatcher, para o stop resolver os seus registros.
+            self._pending = batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                # Pedidos já na fila entram no lote sem espera; depois aguarda até o prazo do primeiro registro.
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._run_batch(batch))
+            self._pending = []
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch):
+        records, futures = [record for record, _ in batch], [future for _, future in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self._executor, self.function, records)
+        except Exception as error:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.n_batches += 1
+            self.n_records += len(batch)
+            self._slots.release()
+
+
+# Converte os valores do resultado para JSON (NaN/NA/NaT viram null, datas viram texto ISO).
+def _json_value(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or value is pd.NaT or value is pd.NA or (isinstance(value, float) and value != value):
+        return None
+    return value
+
+
+def _to_json(payload):
+    if isinstance(payload, list):
+        return [_to_json(item) for item in payload]
+    if isinstance(payload, dict):
+        return {key: _json_value(value) for key, value in payload.items()}
+    return _json_value(payload)
+
+
+# Frase de status das respostas do HTTPServer.
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+
+
+# Servidor HTTP local (stand-in), apenas com a biblioteca padrão.
+class HTTPServer:
+
+    """
+    Servidor HTTP/1.1 mínimo sobre asyncio, para testes locais do MicroBatcher sem dependências externas.
+    Mantém a conexão aberta entre pedidos (keep-alive).
+
+    Rotas:
+    POST /score: corpo JSON com um registro (dict) ou uma lista de registros; responde o resultado de cada registro.
+    GET /health: responde {"status": "ok"} e as quantidades de lotes e registros processados.
+
+    Parâmetros:
+    batcher: MicroBatcher
+        Serviço que processa os registros.
+    host, port: str, int
+        Endereço do servidor. Com port=0 o sistema escolhe uma porta livre (ver port após o start).
+
+    Métodos:
+    start / stop: Inicia e encerra o servidor (também via async with).
+    """
+
+    def __init__(self, batcher, host='127.0.0.1', port=8000):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+
+    async def start(self):
+        self._connections = {}
+        self._busy = set()
+        self._closing = False
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        # Fechando as conexões ociosas (keep-alive) e aguardando o fim de cada uma. As conexões com um pedido em
+        # andamento respondem o pedido (resultado ou erro do MicroBatcher) antes de serem fechadas.
+        self._closing = True
+        self._server.close()
+        for task, writer in self._connections.items():
+            if task not in self._busy:
+                writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'batches': self.batcher.n_batches, 'records': self.batcher.n_records}
+        if method != 'POST' or path != '/score':
+            return 404, {'error': 'not found'}
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400, {'error': 'invalid json'}
+        if isinstance(payload, list):
+            return 200, _to_json(list(await asyncio.gather(*(self.batcher.submit(record) for record in payload))))
+        return 200, _to_json(await self.batcher.submit(payload))
+
+    async def _respond(self, writer, status, response):
+        data = json.dumps(response).encode()
+        writer.write(f'HTTP/1.1 {status} {_REASONS.get(status, "Error")}\r\nContent-Type: application/json\r\n'
+                     f'Content-Length: {len(data)}\r\n\r\n'.encode() + data)
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while not self._closing:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                self._busy.add(task)
+
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                # Linha de requisição ou Content-Length inválidos: responde 400 e fecha a conexão, pois não é
+                # possível saber onde termina o corpo deste pedido.
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                    content_length = int(headers.get('content-length', 0))
+                    if content_length < 0:
+                        raise ValueError(content_length)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'bad request'})
+                    break
+                body = await reader.readexactly(content_length)
+
+                try:
+                    status, response = await self._route(method, path, body)
+                except Exception as error:
+                    status, response = 500, {'error': repr(error)}
+
+                await self._respond(writer, status, response)
+                self._busy.discard(task)
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._busy.discard(task)
+            self._connections.pop(task, None)
+            writer.close()
+
+
+# Cliente HTTP mínimo: envia um POST em uma conexão aberta e retorna o corpo da resposta.
+async def _post(reader, writer, path, payload):
+    data = json.dumps(payload).encode()
+    writer.write(f'POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(data)}\r\n\r\n'.encode() + data)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    body = await reader.readexactly(length)
+    if status != 200:
+        raise RuntimeError(f'HTTP {status}: {body.decode()}')
+    return json.loads(body)
+
+
+# Gera carga no servidor e mede latência e vazão.
+async def load_test(records, port, host='127.0.0.1', concurrency=32, n_requests=2000):
+
+    """
+    Abre concurrency conexões, cada uma enviando pedidos de um registro em sequência (fechado: o próximo pedido sai
+    quando a resposta chega), até completar n_requests pedidos. Retorna a vazão (pedidos/s) e os percentis de latência.
+
+    Parâmetros:
+    records: list of dict
+        Registros enviados (em ciclo).
+    port, host:
+        Endereço do servidor.
+    concurrency: int
+        Quantidade de clientes simultâneos.
+    n_requests: int
+        Quantidade total de pedidos.
+    """
+
+    latencies = []
+    counter = iter(range(n_requests))
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in counter:
+                start = time.perf_counter()
+                await _post(reader, writer, '/score', records[i % len(records)])
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    return {'requests': len(latencies), 'throughput': len(latencies) / elapsed,
+            'p50_ms': np.percentile(latencies, 50), 'p95_ms': np.percentile(latencies, 95), 'p99_ms': np.percentile(latencies, 99)}
+
+
+# Benchmark do serviço com diferentes configurações de micro-lote.
+async def run_benchmark(settings=((1, 0.0), (16, 0.002), (64, 0.005), (256, 0.01)), n_rows=20_000, concurrency=32,
+                        n_requests=2000, workers=1, processes=False, seed=0):
+
+    """
+    Ajusta o pipeline do str_pipe (compilado no RecordScorer) em uma amostra sintética e mede o serviço (servidor HTTP
+    local + MicroBatcher) para cada configuração (max_batch_size, max_wait). Retorna um DataFrame com vazão, percentis
+    de latência e tamanho médio dos lotes.
+
+    Parâmetros:
+    settings: list of tuple
+        Configurações (max_batch_size, max_wait) avaliadas.
+    n_rows: int
+        Tamanho da amostra sintética utilizada no fit; os pedidos são registros de uma segunda amostra.
+    concurrency, n_requests:
+        Repassados para o load_test.
+    workers: int
+        Quantidade de workers do pool.
+    processes: bool
+        Quando True os lotes rodam em uma ProcessPoolExecutor (o RecordScorer é enviado uma vez para cada processo).
+    seed: int
+        Semente da amostra sintética.
+    """
+
+    scorer = record.RecordScorer(ETL.ETLPipeline(benchmark.pipeline_steps())).fit(synthetic.generate(n_rows, seed))
+    records = synthetic.generate(max(n_requests, 8), seed + 1).to_dict('records')
+    records = [{key: _json_value(value) for key, value in record.items()} for record in records]  # Como chegariam em JSON.
+
+    if processes:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(scorer,))
+        function = _score_in_worker
+    else:
+        executor, function = None, functools.partial(score_records, scorer)
+
+    rows = []
+    try:
+        for max_batch_size, max_wait in settings:
+            async with MicroBatcher(function, max_batch_size, max_wait, executor, workers) as batcher:
+                async with HTTPServer(batcher, port=0) as server:
+                    result = await load_test(records, server.port, concurrency=concurrency, n_requests=n_requests)
+                result.update(max_batch_size=max_batch_size, max_wait=max_wait,
+                              mean_batch_size=batcher.n_records / max(batcher.n_batches, 1))
+                rows.append(result)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return pd.DataFrame(rows, columns=['max_batch_size', 'max_wait', 'mean_batch_size', 'requests', 'throughput',
+                                       'p50_ms', 'p95_ms', 'p99_ms'])
+
+
+# Inicia o servidor com o pipeline (RecordScorer) ajustado em um CSV (ou em uma amostra sintética) até ser interrompido.
+async def serve(data=None, host='127.0.0.1', port=8000, max_batch_size=64, max_wait=0.005, workers=1):
+    X = pd.read_csv(data) if data else synthetic.generate(20_000)
+    scorer = record.RecordScorer(ETL.ETLPipeline(benchmark.pipeline_steps())).fit(X)
+    async with MicroBatcher(functools.partial(score_records, scorer), max_batch_size, max_wait, workers=workers) as batcher:
+        async with HTTPServer(batcher, host, port) as server:
+            print(f'Servindo em http://{host}:{server.port}/score')
+            await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serviço de micro-lotes do ETL com servidor HTTP local.')
+    parser.add_argument('--benchmark', action='store_true', help='Executa o benchmark de carga em vez de servir.')
+    parser.add_argument('--data', help='CSV utilizado no fit do pipeline (padrão: amostra sintética).')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait', type=float, default=0.005)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--processes', action='store_true', help='Executa os lotes em processos (benchmark).')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = asyncio.run(run_benchmark(concurrency=args.concurrency, n_requests=args.requests,
+                                           workers=args.workers, processes=args.processes))
+        print(result.to_string(index=False))
+    else:
+        asyncio.run(serve(args.data, args.host, args.port, args.max_batch_size, args.max_wait, args.workers))
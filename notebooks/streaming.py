@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+# --------------------------------------------------------------------- #
+import ETL
+
+
+
+
+# Junta as linhas levadas do bloco anterior ao bloco atual. Colunas category lidas em blocos têm as categorias de cada
+# bloco: as categorias são unidas antes do concat, que converteria as colunas com categorias diferentes para object.
+def _concat_carry(carry, chunk):
+    dtypes = {}
+    for column_name in chunk.columns:
+        before, after = carry[column_name].dtype, chunk[column_name].dtype
+        if isinstance(before, pd.CategoricalDtype) and isinstance(after, pd.CategoricalDtype) and before != after:
+            dtypes[column_name] = pd.CategoricalDtype(before.categories.union(after.categories), ordered=after.ordered)
+    return pd.concat([carry.astype(dtypes), chunk.astype(dtypes)]) if dtypes else pd.concat([carry, chunk])
+
+
+# Leitura do CSV em blocos, sem separar as linhas de um mesmo Customer_ID.
+def iter_customer_chunks(path, chunksize=100_000, customer_column='Customer_ID', **read_csv_kwargs):
+
+    """
+    Lê o CSV em blocos (chunks) alinhados ao Customer_ID: as linhas finais de cada bloco que pertencem ao último
+    Customer_ID são levadas para o bloco seguinte, garantindo que todos os meses de um cliente fiquem no mesmo bloco.
+    As linhas de cada Customer_ID precisam estar contíguas no arquivo (como no train.csv, ou ordenado pelo Customer_ID):
+    um Customer_ID que reaparece depois de um bloco já retornado gera ValueError. As colunas category mantêm o dtype
+    category nos blocos (com as categorias de cada bloco).
+
+    Parâmetros:
+    path: str
+        Caminho do CSV.
+    chunksize: int
+        Quantidade aproximada de linhas de cada bloco.
+    customer_column: str
+        Coluna utilizada para alinhar os blocos.
+    read_csv_kwargs:
+        Argumentos repassados para o pd.read_csv (ex.: dtype, recomendado para manter o mesmo dtype em todos os blocos).
+    """
+
+    carry = None
+    seen = set()
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs):
+        if carry is not None:
+            chunk = _concat_carry(carry, chunk)
+
+        # Separando as linhas do último Customer_ID (e as linhas sem Customer_ID entre elas), que podem continuar no
+        # próximo bloco. Um bloco sem nenhum Customer_ID é retornado inteiro.
+        customers = chunk[customer_column]
+        known = customers.notna().to_numpy()
+        if known.any():
+            customers = customers.to_numpy()
+            different = np.flatnonzero(known & (customers != customers[np.flatnonzero(known)[-1]]))
+            boundary = different[-1] + 1 if len(different) else 0
+        else:
+            boundary = len(chunk)
+
+        carry = chunk.iloc[boundary:]
+        if boundary:
+            yield _check_new_customers(chunk.iloc[:boundary], customer_column, seen)
+
+    if carry is not None and len(carry):
+        yield _check_new_customers(carry, customer_column, seen)
+
+
+# Verifica se os Customer_ID do bloco não apareceram em blocos anteriores (linhas do cliente fora de ordem no arquivo).
+def _check_new_customers(chunk, customer_column, seen):
+    customers = set(chunk[customer_column].dropna().unique())
+    repeated = customers & seen
+    if repeated:
+        raise ValueError(f'As linhas de cada {customer_column} precisam estar contíguas no arquivo: {sorted(map(str, repeated))[:5]} '
+                         f'aparece(m) em mais de um bloco. Ordene o arquivo pelo {customer_column}.')
+    seen |= customers
+    return chunk
+
+
+# Execução do pipeline do ETL bloco a bloco.
+class StreamingETL:
+
+    """
+    Executa as etapas de um pipeline do ETL sobre um CSV maior que a memória, bloco a bloco.
+
+    As etapas globais (_scope='global', ex.: moda do Monthly_Balance e limites de quantil) são ajustadas com partial_fit
+    em uma passada de estatísticas sobre o arquivo, antes da passada de transformação. Etapas globais independentes entre si
+    são ajustadas na mesma passada; uma nova passada só é feita quando uma etapa global depende da saída de outra.
+    As etapas por cliente são ajustadas em cada bloco (os blocos são alinhados ao Customer_ID) e as demais etapas são
+    ajustadas uma única vez. A memória fica limitada ao tamanho do bloco mais as contagens de valores das etapas globais.
+
+    Como cada bloco é transformado separadamente, etapas que reordenam as linhas (ModifyMonthCreditHistory) ordenam
+    os clientes dentro de cada bloco.
+
+    Parâmetros:
+    pipeline: Pipeline
+        Pipeline (ETLPipeline ou Pipeline do Scikit-Learn) com as etapas do ETL. As etapas são ajustadas no próprio pipeline.
+    chunksize: int
+        Quantidade aproximada de linhas de cada bloco.
+    customer_column: str
+        Coluna utilizada para alinhar os blocos.
+    read_csv_kwargs: dict
+        Argumentos repassados para o pd.read_csv.
+
+    Métodos:
+    fit: Realiza as passadas de estatísticas e ajusta as etapas globais.
+    iter_transform: Gera os blocos transformados.
+    transform: Transforma o CSV e escreve o resultado de forma incremental em output_path.
+    fit_transform: Executa o fit e o transform.
+    """
+
+    def __init__(self, pipeline, chunksize=100_000, customer_column='Customer_ID', read_csv_kwargs=None):
+        self.pipeline = pipeline
+        self.chunksize = chunksize
+        self.customer_column = customer_column
+        self.read_csv_kwargs = read_csv_kwargs
+
+    def _steps(self):
+        return [step for _, step in self.pipeline.steps if step not in (None, 'passthrough')]
+
+    def _chunks(self, path):
+        return iter_customer_chunks(path, self.chunksize, self.customer_column, **(self.read_csv_kwargs or {}))
+
+    @staticmethod
+    def _columns(step, kind):
+        # Colunas lidas/escritas pela etapa; None quando a etapa não declara suas colunas (considera todas).
+        if isinstance(step, ETL.BaseTransformer):
+            return step._input_columns() if kind == 'input' else step._output_columns()
+        return None
+
+    def _next_pass(self, steps, pending):
+        # Etapas globais que podem ser ajustadas na mesma passada: nenhuma coluna lida por elas depende
+        # (direta ou indiretamente) de uma etapa global ainda não ajustada.
+        batch, dirty, all_dirty = [], set(), False
+        for i, step in enumerate(steps):
+            inputs, outputs = self._columns(step, 'input'), self._columns(step, 'output')
+            reads_dirty = all_dirty or (bool(dirty) if inputs is None else bool(inputs & dirty))
+            if i in pending and not reads_dirty:
+                batch.append(i)
+            if i in pending or reads_dirty:
+                if outputs is None:
+                    all_dirty = True
+                else:
+                    dirty |= outputs
+        return batch
+
+    def _apply(self, step, X, fitted):
+        if getattr(step, '_scope', 'row') == 'customer':
+            return step.fit_transform(X)
+        if step not in fitted:
+            step.fit(X)
+            fitted.append(step)
+        return step.transform(X)
+
+    def fit(self, path):
+        steps = self._steps()
+        pending = {i for i, step in enumerate(steps) if getattr(step, '_scope', 'row') == 'global'}
+        fitted = []
+
+        for i in pending:
+            steps[i]._reset()
+
+        while pending:
+            batch = self._next_pass(steps, pending)
+            for chunk in self._chunks(path):
+                X = chunk
+                for i, step in enumerate(steps[:max(batch) + 1]):
+                    if i in batch:
+                        step.partial_fit(X)
+                    elif i not in pending:
+                        X = self._apply(step, X, fitted)
+            # As etapas ajustadas nesta passada apenas transformam os blocos das passadas seguintes.
+            fitted.extend(steps[i] for i in batch)
+            pending -= set(batch)
+
+        return self
+
+    def iter_transform(self, path):
+        fitted = [step for step in self._steps() if getattr(step, '_scope', 'row') == 'global']
+        for chunk in self._chunks(path):
+            X = chunk
+            for step in self._steps():
+                X = self._apply(step, X, fitted)
+            yield X
+
+    def transform(self, path, output_path):
+        for i, X in enumerate(self.iter_transform(path)):
+            X.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        return output_path
+
+    def fit_transform(self, path, output_path):
+        return self.fit(path).transform(path, output_path)
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+
+
+
+# Valores utilizados na geração, seguindo o train.csv.
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August']
+OCCUPATIONS = ['Scientist', 'Teacher', 'Engineer', 'Entrepreneur', 'Developer', 'Lawyer', 'Media_Manager', 'Doctor',
+               'Journalist', 'Manager', 'Accountant', 'Musician', 'Mechanic', 'Writer', 'Architect']
+LOANS = ['Auto Loan', 'Credit-Builder Loan', 'Personal Loan', 'Home Equity Loan', 'Mortgage Loan', 'Student Loan',
+         'Debt Consolidation Loan', 'Payday Loan', 'Not Specified']
+PAYMENT_BEHAVIOURS = ['High_spent_Small_value_payments', 'Low_spent_Large_value_payments', 'Low_spent_Small_value_payments',
+                      'High_spent_Medium_value_payments', 'High_spent_Large_value_payments', 'Low_spent_Medium_value_payments']
+
+
+# Gera uma amostra sintética com o mesmo schema (e os mesmos tipos de inconsistência) do train.csv.
+def generate(n_rows=10_000, seed=0):
+
+    """
+    Gera um DataFrame sintético com o schema do conjunto de dados de pontuação de crédito: cada Customer_ID possui 8 meses
+    (January a August) e as colunas recebem as mesmas inconsistências do train.csv (sufixo _ em números, NM, valores como
+    !@9#%8, #F%$D@*&8 e _______, outliers e nulos). A geração é vetorizada e o resultado é determinístico para a mesma seed.
+
+    Parâmetros:
+    n_rows: int
+        Quantidade aproximada de linhas (arredondada para baixo para um múltiplo de 8, mínimo de 8).
+    seed: int
+        Semente do gerador aleatório.
+    """
+
+    rng = np.random.default_rng(seed)
+    n_customers = max(n_rows // 8, 1)
+    n = n_customers * 8
+    customer = np.repeat(np.arange(n_customers), 8)
+    month = np.tile(np.arange(8), n_customers)
+
+    def per_customer(values):
+        return values[customer]
+
+    def mask(p, size=n):
+        return rng.random(size) < p
+
+    def as_text(values):
+        return values.astype(str).astype(object)
+
+    def with_suffix(values, p, suffix='_'):
+        values = values.copy()
+        rows = mask(p)
+        values[rows] = values[rows] + suffix
+        return values
+
+    def with_nulls(values, p):
+        values = values.copy()
+        values[mask(p)] = np.nan
+        return values
+
+    def hex_ids(prefix, values):
+        return np.char.add(prefix, np.char.mod('%x', values)).astype(object)
+
+    # Identificação do cliente.
+    customer_ids = hex_ids('CUS_0x', rng.permutation(n_customers * 4)[:n_customers] + 0x1000)
+    names = with_nulls(per_customer(np.char.add('Name ', np.arange(n_customers).astype(str)).astype(object)), 0.1)
+    ssn_parts = [rng.integers(low, high, n_customers).astype(str) for low, high in ((100, 999), (10, 99), (1000, 9999))]
+    ssn = per_customer(np.char.add(np.char.add(np.char.add(np.char.add(ssn_parts[0], '-'), ssn_parts[1]), '-'), ssn_parts[2]).astype(object))
+    ssn[mask(0.05)] = '#F%$D@*&8'
+
+    age = with_suffix(as_text(per_customer(rng.integers(18, 60, n_customers))), 0.05)
+    rows = mask(0.02)
+    age[rows] = rng.choice(['-500', '7580', '4808', '8698'], rows.sum())
+
+    occupation = per_customer(rng.choice(OCCUPATIONS, n_customers)).astype(object)
+    occupation[mask(0.07)] = '_______'
+
+    # Renda e contas.
+    annual_income = with_suffix(as_text(per_customer(np.round(rng.uniform(7000, 150000, n_customers), 2))), 0.07)
+    monthly_salary = with_nulls(per_customer(np.round(rng.uniform(500, 12000, n_customers), 6)), 0.15)
+
+    num_bank_accounts = per_customer(rng.integers(-1, 11, n_customers))
+    rows = mask(0.02)
+    num_bank_accounts[rows] = rng.integers(100, 1800, rows.sum())
+    num_bank_accounts[mask(0.03)] = 0
+
+    num_credit_card = per_customer(rng.integers(0, 11, n_customers))
+    rows = mask(0.02)
+    num_credit_card[rows] = rng.integers(100, 1500, rows.sum())
+
+    interest_rate = per_customer(rng.integers(1, 34, n_customers))
+    rows = mask(0.02)
+    interest_rate[rows] = rng.integers(100, 5800, rows.sum())
+
+    # Empréstimos: de 1 a 4 tipos, no formato "A, B, and C" do train.csv.
+    num_of_loan = with_suffix(as_text(per_customer(rng.integers(0, 9, n_customers))), 0.05)
+    num_of_loan[mask(0.01)] = '-100'
+
+    loans = rng.choice(LOANS, (n_customers, 4)).astype(object)
+    n_loans = rng.integers(1, 5, n_customers)
+    type_of_loan = loans[:, 0].copy()
+    for k in (2, 3, 4):
+        rows = n_loans == k
+        head = loans[rows, 0]
+        for column in range(1, k - 1):
+            head = head + ', ' + loans[rows, column]
+        type_of_loan[rows] = head + ', and ' + loans[rows, k - 1]
+    type_of_loan[mask(0.1, n_customers)] = np.nan
+    type_of_loan = per_customer(type_of_loan)
+
+    # Pagamentos e crédito.
+    delay_from_due_date = rng.integers(-5, 68, n)
+    num_of_delayed_payment = with_nulls(with_suffix(as_text(rng.integers(0, 25, n)), 0.05), 0.07)
+    num_of_delayed_payment[mask(0.01)] = '-1'
+
+    changed_credit_limit = as_text(np.round(rng.uniform(-5, 30, n), 2))
+    changed_credit_limit[mask(0.02)] = '_'
+
+    num_credit_inquiries = per_customer(rng.integers(0, 17, n_customers)).astype(np.float64)
+    rows = mask(0.02)
+    num_credit_inquiries[rows] = rng.integers(30, 2600, rows.sum())
+    num_credit_inquiries[mask(0.02) & (month > 0)] = np.nan
+
+    credit_mix = per_customer(rng.choice(['Good', 'Standard', 'Bad'], n_customers)).astype(object)
+    credit_mix[mask(0.2)] = '_'
+
+    outstanding_debt = with_suffix(as_text(per_customer(np.round(rng.uniform(0, 5000, n_customers), 2))), 0.01)
+    credit_utilization_ratio = rng.uniform(20, 50, n)
+
+    # Credit_History_Age avança um mês a cada linha do cliente ("X Years and Y Months").
+    years = per_customer(rng.integers(0, 33, n_customers)).astype(str)
+    months = (per_customer(rng.integers(0, 4, n_customers)) + month).astype(str)
+    credit_history_age = np.char.add(np.char.add(np.char.add(years, ' Years and '), months), ' Months').astype(object)
+    credit_history_age[mask(0.09) & (month > 0)] = np.nan
+
+    payment_of_min_amount = per_customer(rng.choice(['Yes', 'No'], n_customers)).astype(object)
+    payment_of_min_amount[mask(0.1)] = 'NM'
+
+    total_emi_per_month = rng.uniform(0, 400, n)
+    amount_invested_monthly = as_text(rng.uniform(10, 900, n))
+    amount_invested_monthly[mask(0.04)] = '__10000__'
+    amount_invested_monthly = with_nulls(amount_invested_monthly, 0.045)
+
+    payment_behaviour = rng.choice(PAYMENT_BEHAVIOURS, n).astype(object)
+    payment_behaviour[mask(0.07)] = '!@9#%8'
+
+    monthly_balance = as_text(rng.uniform(100, 1500, n))
+    monthly_balance[mask(0.002)] = '__-333333333333333333333333333__'
+    monthly_balance = with_nulls(monthly_balance, 0.012)
+
+    return pd.DataFrame({
+        'ID': hex_ids('0x', np.arange(n) + 0x1602), 'Customer_ID': per_customer(customer_ids),
+        'Month': np.array(MONTHS, dtype=object)[month], 'Name': names, 'Age': age, 'SSN': ssn, 'Occupation': occupation,
+        'Annual_Income': annual_income, 'Monthly_Inhand_Salary': monthly_salary, 'Num_Bank_Accounts': num_bank_accounts,
+        'Num_Credit_Card': num_credit_card, 'Interest_Rate': interest_rate, 'Num_of_Loan': num_of_loan,
+        'Type_of_Loan': type_of_loan, 'Delay_from_due_date': delay_from_due_date,
+        'Num_of_Delayed_Payment': num_of_delayed_payment, 'Changed_Credit_Limit': changed_credit_limit,
+        'Num_Credit_Inquiries': num_credit_inquiries, 'Credit_Mix': credit_mix, 'Outstanding_Debt': outstanding_debt,
+        'Credit_Utilization_Ratio': credit_utilization_ratio, 'Credit_History_Age': credit_history_age,
+        'Payment_of_Min_Amount': payment_of_min_amount, 'Total_EMI_per_month': total_emi_per_month,
+        'Amount_invested_monthly': amount_invested_monthly, 'Payment_Behaviour': payment_behaviour,
+        'Monthly_Balance': monthly_balance, 'Credit_Score': rng.choice(['Good', 'Standard', 'Poor'], n).astype(object),
+    })
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Os módulos do ETL ficam em notebooks/ e se importam pelo nome (import ETL).
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'notebooks'))
+
+import ETL
+import benchmark
+import synthetic
+
+
+
+
+# Amostra sintética pequena com o schema do train.csv (8 meses por cliente).
+@pytest.fixture
+def raw():
+    return synthetic.generate(2_000, seed=0)
+
+
+# Pipeline do ETL (etapas do str_pipe) sem ajuste.
+@pytest.fixture
+def make_pipeline():
+    return lambda: ETL.ETLPipeline(benchmark.pipeline_steps())
@@ -0,0 +1,72 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+import arrow_io
+import synthetic
+
+
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'raw.csv'
+    synthetic.generate(2_000, seed=5).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def parquet_path(csv_path, tmp_path):
+    return arrow_io.csv_to_parquet(csv_path, str(tmp_path / 'raw.parquet'))
+
+
+# Valores da coluna como objetos do Python, com nulos como None (dtypes ignorados).
+def as_values(column):
+    column = column.astype(object)
+    return column.where(column.notna(), None)
+
+
+def test_projection(csv_path, parquet_path, make_pipeline):
+    pipeline = make_pipeline()
+    X = arrow_io.read_parquet(parquet_path, pipeline=pipeline, extra_columns=['ID'])
+    used = arrow_io.pipeline_columns(pipeline) | {'ID'}
+    assert set(X.columns) == used & set(pd.read_csv(csv_path).columns)
+
+
+def test_pipeline_on_parquet(csv_path, parquet_path, make_pipeline):
+    expected = make_pipeline().fit_transform(pd.read_csv(csv_path))
+    pipeline = make_pipeline()
+    result = pipeline.fit_transform(arrow_io.read_parquet(parquet_path, pipeline=pipeline))
+    pd.testing.assert_frame_equal(result, expected[result.columns])
+
+
+# Colunas string[pyarrow]: mesmos valores do pipeline sobre o CSV, com as colunas de texto mantidas como string[pyarrow].
+def test_pipeline_on_arrow_strings(csv_path, parquet_path, make_pipeline):
+    expected = make_pipeline().fit_transform(pd.read_csv(csv_path))
+    pipeline = make_pipeline()
+    X = arrow_io.read_parquet(parquet_path, pipeline=pipeline, string_dtype=True, extra_columns=['ID'])
+    assert (X.dtypes == pd.StringDtype('pyarrow')).any()
+
+    result = pipeline.fit_transform(X)
+    assert (result.dtypes == pd.StringDtype('pyarrow')).any()
+    for column_name in result.columns:
+        pd.testing.assert_series_equal(as_values(result[column_name]), as_values(expected[column_name]), check_dtype=False)
+
+
+@pytest.mark.parametrize('partition_by', ['Month', 'customer_hash'])
+def test_partitioned_round_trip(raw, tmp_path, partition_by):
+    path = arrow_io.write_parquet(raw, str(tmp_path / 'out'), partition_by=partition_by, n_buckets=4)
+    assert len(os.listdir(path)) == (raw['Month'].nunique() if partition_by == 'Month' else 4)
+
+    back = arrow_io.read_parquet(path)
+    if partition_by == 'customer_hash':
+        # Todos os meses de um cliente na mesma partição.
+        assert (back.groupby('Customer_ID', observed=True)[arrow_io.BUCKET_COLUMN].nunique() == 1).all()
+        back = back.drop(columns=arrow_io.BUCKET_COLUMN)
+    back = back[raw.columns].sort_values('ID').reset_index(drop=True)
+    expected = raw.sort_values('ID').reset_index(drop=True)
+    for column_name in raw.columns:
+        pd.testing.assert_series_equal(as_values(back[column_name]), as_values(expected[column_name]), check_dtype=False)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+
+import ETL
+import backends
+import benchmark
+import synthetic
+
+
+
+
+# Amostra sintética com algumas linhas sem Customer_ID.
+@pytest.fixture
+def data():
+    X = synthetic.generate(1_200, seed=3)
+    X.loc[np.random.default_rng(0).random(len(X)) < 0.02, 'Customer_ID'] = np.nan
+    return X
+
+
+def test_pandas_parity(data):
+    assert backends.check_parity(Pipeline(benchmark.pipeline_steps()), data, backends=('pandas',)) == {'pandas': {}}
+
+
+def test_polars_parity(data):
+    pytest.importorskip('polars')
+    assert backends.check_parity(Pipeline(benchmark.pipeline_steps()), data, backends=('polars',)) == {'polars': {}}
+
+
+def test_polars_parity_with_spill(data, tmp_path):
+    pytest.importorskip('polars')
+    report = backends.check_parity(Pipeline(benchmark.pipeline_steps()), data, backends=('polars',),
+                                   backend_params={'polars': {'spill_directory': str(tmp_path)}})
+    assert report == {'polars': {}}
+
+
+def test_dask_parity(data):
+    pytest.importorskip('dask')
+    report = backends.check_parity(Pipeline(benchmark.pipeline_steps()), data, backends=('dask',),
+                                   backend_params={'dask': {'npartitions': 3, 'scheduler': 'synchronous'}})
+    assert report == {'dask': {}}
+
+
+# Sem o numba instalado o NumbaBackend executa as etapas no pandas: o teste cobre os dois caminhos, sem skip.
+def test_numba_parity(data):
+    pipeline = Pipeline(benchmark.pipeline_steps())
+    assert backends.check_parity(pipeline, data, backends=('numba',), per_step=True) == {'numba': {}}
+
+
+# Kernels compilados (ou a execução no pandas) no ETLPipeline, in-place, e no transform de um pipeline já ajustado.
+def test_numba_fit_and_transform(data, make_pipeline):
+    reference = make_pipeline().fit(data)
+    pipeline = make_pipeline()
+    backend = backends.NumbaBackend()
+    result = backend.fit_transform(pipeline, data)
+
+    pd.testing.assert_frame_equal(result, reference.transform(data))
+    pd.testing.assert_frame_equal(pipeline.transform(data), reference.transform(data))
+    pd.testing.assert_frame_equal(backend.transform(reference, data), reference.transform(data))
+
+
+# Estado aprendido pela etapa, com as Series como dict.
+def learned(step):
+    return {name: (value.to_dict() if isinstance(value, pd.Series) else value) for name, value in step._learned().items()}
+
+
+# Núcleos do numba executados como funções do Python (sem a compilação), comparados com as etapas do pandas: cobre os
+# núcleos com ou sem o numba instalado. Clientes com modas empatadas e sem valores entram na amostra.
+@pytest.mark.parametrize('position', [5, 8, 17])
+def test_numba_kernels_as_python(data, monkeypatch, position):
+    for name in ('_sorted_group_modes', '_group_size_rows', '_delayed_payment_rows'):
+        kernel = getattr(backends, name)
+        monkeypatch.setattr(backends, name, getattr(kernel, 'py_func', kernel))
+
+    steps = benchmark.pipeline_steps()
+    X = ETL.ETLPipeline(steps[:position]).fit_transform(data)
+    column_name = steps[position][1].column_name
+    customers = X['Customer_ID'].dropna().unique()
+    X.loc[X['Customer_ID'] == customers[0], column_name] = [1, 1, 2, 2, 3, 3, 0, 0][:(X['Customer_ID'] == customers[0]).sum()]
+    X.loc[X['Customer_ID'] == customers[1], column_name] = np.nan
+
+    reference, step = clone(steps[position][1]), clone(steps[position][1])
+    expected = reference.fit_transform(X)
+    result = backends._NUMBA_KERNELS[type(step)](step, X, True)
+    assert result is not None
+    pd.testing.assert_frame_equal(result, expected)
+    assert learned(step) == learned(reference)
+    pd.testing.assert_frame_equal(backends._NUMBA_KERNELS[type(step)](step, X.iloc[::-1], False), reference.transform(X.iloc[::-1]))
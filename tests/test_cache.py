@@ -0,0 +1,121 @@
+import pickle
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+import ETL
+import benchmark
+import cache
+
+
+
+
+def test_fingerprint(raw):
+    assert cache.fingerprint(raw) == cache.fingerprint(raw.copy())
+    changed = raw.copy()
+    changed.iloc[5, 4] = '33'
+    assert cache.fingerprint(changed) != cache.fingerprint(raw)
+
+
+def test_resumes_from_deepest_cached_step(raw, make_pipeline, tmp_path):
+    expected = make_pipeline().fit_transform(raw)
+    step_cache = cache.StepCache(str(tmp_path), min_seconds=0)
+
+    pd.testing.assert_frame_equal(step_cache.fit_transform(make_pipeline(), raw), expected)
+    assert step_cache.resumed_from_ is None
+
+    pipeline = make_pipeline()
+    pd.testing.assert_frame_equal(step_cache.fit_transform(pipeline, raw), expected)
+    assert step_cache.resumed_from_ == pipeline.steps[-1][0]
+    pd.testing.assert_frame_equal(pipeline.transform(raw), make_pipeline().fit(raw).transform(raw))
+
+    # Alterando os parâmetros de uma etapa: a execução retoma da etapa anterior.
+    steps = benchmark.pipeline_steps()
+    steps[16] = ('TreatingOutliersWithMode', ETL.TreatingOutliersWithMode(column_names=['Num_Bank_Accounts', 'Num_of_Loan']))
+    result = step_cache.fit_transform(ETL.ETLPipeline(steps), raw)
+    assert step_cache.resumed_from_ == steps[15][0]
+    pd.testing.assert_frame_equal(result, ETL.ETLPipeline(benchmark.pipeline_steps()[:16] + steps[16:]).fit_transform(raw))
+
+
+def test_evicts_least_recently_used(raw, make_pipeline, tmp_path):
+    step_cache = cache.StepCache(str(tmp_path), min_seconds=0)
+    step_cache.fit_transform(make_pipeline(), raw)
+    limit = step_cache.size() // 2
+
+    small = cache.StepCache(str(tmp_path), max_bytes=limit)
+    small._evict()
+    assert 0 < small.size() <= limit
+
+
+# Classe que deixa de existir depois de gravada no cache (entrada gravada por outra versão do código).
+class Removed:
+    pass
+
+
+# Entradas gravadas com uma classe ou um módulo que não existem mais são tratadas como ausentes e removidas.
+@pytest.mark.parametrize('missing', ['class', 'module'])
+def test_stale_entry_is_evicted(raw, make_pipeline, tmp_path, monkeypatch, missing):
+    expected = make_pipeline().fit_transform(raw)
+    step_cache = cache.StepCache(str(tmp_path), min_seconds=0)
+    step_cache.fit_transform(make_pipeline(), raw)
+    pipeline = make_pipeline()
+    key = step_cache._step_keys(pipeline.steps, raw)[-1]
+
+    if missing == 'class':
+        stale = pickle.dumps(Removed())
+        monkeypatch.delattr(sys.modules[__name__], 'Removed')
+    else:
+        module = types.ModuleType('removed_module')
+        exec('class Removed:\n    pass', module.__dict__)
+        monkeypatch.setitem(sys.modules, 'removed_module', module)
+        stale = pickle.dumps(module.Removed())
+        monkeypatch.delitem(sys.modules, 'removed_module')
+    with open(step_cache._path(key), 'wb') as file:
+        file.write(stale)
+
+    pd.testing.assert_frame_equal(step_cache.fit_transform(pipeline, raw), expected)
+    assert step_cache.resumed_from_ == pipeline.steps[-2][0]
+    assert step_cache._load(key) is not None  # Entrada gravada novamente.
+
+    with open(step_cache._path(key), 'wb') as file:
+        file.write(stale)
+    assert step_cache._load(key) is None
+    assert not (tmp_path / (key + cache.CACHE_SUFFIX)).exists()
+
+
+# Alterar uma função auxiliar do ETL muda a versão das etapas que a utilizam (e apenas delas).
+def test_code_version_covers_module_helpers(monkeypatch):
+    bank_accounts = ETL.CleaningNumBankAccounts(column_name='Num_Bank_Accounts')
+    transform_to_null = ETL.TransformToNull(column_names=['Occupation'])
+    before = cache._code_version(bank_accounts), cache._code_version(transform_to_null)
+
+    version, sources = cache._MODULE_SOURCES[ETL.__file__]
+    source, names = sources['GroupStatistics']
+    monkeypatch.setitem(cache._MODULE_SOURCES, ETL.__file__, (version, {**sources, 'GroupStatistics': (source + '\n# alterada', names)}))
+
+    assert cache._code_version(bank_accounts) != before[0]
+    assert cache._code_version(transform_to_null) == before[1]
+
+
+def test_code_version_covers_module_constants(monkeypatch):
+    step = ETL.TransformToNull(column_names=['Occupation'])
+    before = cache._code_version(step)
+
+    version, sources = cache._MODULE_SOURCES[ETL.__file__]
+    source, names = sources['_SPECIAL_CHARS']
+    monkeypatch.setitem(cache._MODULE_SOURCES, ETL.__file__, (version, {**sources, '_SPECIAL_CHARS': (source.replace('NM', 'NA'), names)}))
+    assert cache._code_version(step) != before
+
+
+# O estado em memória do módulo (ex.: caches e tamanho do cache de valores) não altera a versão.
+def test_code_version_ignores_runtime_state():
+    step = ETL.TransformToNull(column_names=['Occupation'])
+    before = cache._code_version(step)
+    ETL.set_value_cache(10)
+    try:
+        step.fit_transform(pd.DataFrame({'Occupation': ['a', '_', 'NM']}))
+        assert cache._code_version(step) == before
+    finally:
+        ETL.set_value_cache(0)
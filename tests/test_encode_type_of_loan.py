@@ -0,0 +1,67 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ETL
+
+
+
+
+# Máscara esperada: tipos do vocabulário presentes na lista (nulos, valores não str e tipos desconhecidos não contam).
+def expected_mask(value, loan_types=ETL.LOAN_TYPES):
+    if not isinstance(value, str):
+        return 0
+    mask = 0
+    for part in re.split(ETL._LOAN_SEPARATOR, value):
+        if part.strip() in loan_types:
+            mask |= 1 << loan_types.index(part.strip())
+    return mask
+
+
+@pytest.fixture
+def loans(raw):
+    values = raw['Type_of_Loan'].copy()
+    values.iloc[:5] = ['Auto Loan, Auto Loan, and Not Specified', 'Auto Loan and Student Loan', 'Foo Loan, Payday Loan', 123, '']
+    return raw.assign(Type_of_Loan=values)
+
+
+def test_masks_and_counts(loans):
+    step = ETL.EncodeTypeOfLoan(count_columns=True)
+    X = step.fit_transform(loans)
+
+    assert X['Type_of_Loan'].dtype == np.uint16
+    assert X['Type_of_Loan'].tolist() == [expected_mask(value) for value in loans['Type_of_Loan']]
+    assert X.loc[0, 'Type_of_Loan_Auto_Loan'] == 2 and X.loc[0, 'Type_of_Loan_Not_Specified'] == 1
+    assert step.decode(X.loc[1, 'Type_of_Loan']) == ('Auto Loan', 'Student Loan')
+    assert step.decode(X.loc[2, 'Type_of_Loan']) == ('Payday Loan',)
+    assert (X.loc[3:4, 'Type_of_Loan'] == 0).all()
+    assert step._output_columns() == {'Type_of_Loan', *step._count_column_names()}
+
+
+# Coluna category (ETL.read_csv): a lista é separada uma vez por categoria.
+def test_categorical_input(loans):
+    categorical = loans['Type_of_Loan'].where(loans['Type_of_Loan'].map(type) == str).astype('category')
+    result = ETL.EncodeTypeOfLoan().fit_transform(loans.assign(Type_of_Loan=categorical))
+    assert result['Type_of_Loan'].tolist() == [expected_mask(value) for value in categorical.astype(object)]
+
+
+def test_loan_mask_and_indicator_matrix(loans):
+    step = ETL.EncodeTypeOfLoan(count_columns=True)
+    X = step.fit_transform(loans)
+
+    matrix = step.indicator_matrix(X)
+    assert matrix.shape == (len(X), len(ETL.LOAN_TYPES))
+    np.testing.assert_array_equal(matrix.toarray(), (X[step._count_column_names()].to_numpy() > 0).astype(np.uint8))
+
+    mask = step.loan_mask('Auto Loan', 'Payday Loan')
+    assert mask == 1 | 1 << ETL.LOAN_TYPES.index('Payday Loan')
+    assert ((X['Type_of_Loan'] & mask) != 0).sum() == ((X['Type_of_Loan_Auto_Loan'] > 0) | (X['Type_of_Loan_Payday_Loan'] > 0)).sum()
+    with pytest.raises(ValueError):
+        step.loan_mask('Foo Loan')
+
+
+def test_vocabulary_limit(loans):
+    with pytest.raises(ValueError):
+        ETL.EncodeTypeOfLoan(loan_types=[str(i) for i in range(17)]).fit_transform(loans)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+import ETL
+import export
+
+
+
+
+# Saída do str_pipe com os dtypes compactos e alguns nulos no Occupation.
+@pytest.fixture
+def cleaned(raw, make_pipeline):
+    X = ETL.OptimizeDtypes().fit_transform(make_pipeline().fit_transform(raw))
+    X.loc[X.index[:5], 'Occupation'] = np.nan
+    return X
+
+
+# Matriz esperada com o pandas: colunas numéricas e get_dummies das categóricas.
+def expected_matrix(X, names):
+    numeric = [name for name in names if name in X.columns]
+    dummies = pd.get_dummies(X[list(export.CATEGORICAL_FEATURES)], dtype=np.float32)
+    return np.hstack([X[numeric].astype(np.float64).to_numpy().astype(np.float32), dummies.to_numpy()]), numeric
+
+
+def test_dense_onehot(cleaned):
+    matrix, names = export.to_feature_matrix(cleaned, chunksize=500)
+    expected, numeric = expected_matrix(cleaned, names)
+
+    assert matrix.dtype == np.float32 and matrix.flags['C_CONTIGUOUS']
+    assert len(names) == matrix.shape[1] and matrix.shape[0] == len(cleaned)
+    assert names[len(numeric):] == list(pd.get_dummies(cleaned[list(export.CATEGORICAL_FEATURES)]).columns)
+    np.testing.assert_array_equal(matrix, expected)
+
+
+def test_ordinal(cleaned):
+    features = export.FeatureMatrix(encoding='ordinal', chunksize=700).fit(cleaned)
+    matrix = features.transform(cleaned)
+    occupation = list(features.get_feature_names_out()).index('Occupation')
+
+    assert np.isnan(matrix[:5, occupation]).all()
+    np.testing.assert_array_equal(matrix[5:, occupation], cleaned['Occupation'].cat.codes[5:])
+
+
+def test_sparse_and_disk_exports(cleaned, tmp_path):
+    dense, names = export.to_feature_matrix(cleaned)
+
+    matrix, _ = export.to_feature_matrix(cleaned, sparse=True, chunksize=777)
+    assert sparse.isspmatrix_csr(matrix)
+    np.testing.assert_array_equal(matrix.toarray(), dense)
+
+    memmap, _ = export.to_feature_matrix(cleaned, path=str(tmp_path / 'features.npy'), chunksize=1000)
+    assert isinstance(memmap, np.memmap)
+    np.testing.assert_array_equal(np.asarray(memmap), dense)
+    np.testing.assert_array_equal(np.load(tmp_path / 'features.npy'), dense)
+
+    # Export a partir de uma sequência de blocos (ex.: StreamingETL.iter_transform), com o fit no primeiro bloco.
+    features = export.FeatureMatrix(chunksize=300)
+    blocks = (cleaned.iloc[start:start + 900] for start in range(0, len(cleaned), 900))
+    np.testing.assert_array_equal(np.asarray(features.export(blocks, str(tmp_path / 'blocks.npy'))), dense)
+    assert features.feature_names_ == names
+
+    export.FeatureMatrix(sparse=True).fit(cleaned).export(cleaned, str(tmp_path / 'features.npz'))
+    np.testing.assert_array_equal(sparse.load_npz(tmp_path / 'features.npz').toarray(), dense)
+
+
+# Categorias não vistas no fit ficam com todas as colunas do one-hot iguais a 0.
+def test_unseen_category(cleaned):
+    features = export.FeatureMatrix().fit(cleaned)
+    X = cleaned.head(10).astype({'Occupation': object})
+    X.loc[X.index[6], 'Occupation'] = 'Astronaut'
+    matrix = features.transform(X)
+
+    occupation = [i for i, name in enumerate(features.feature_names_) if name.startswith('Occupation_')]
+    assert matrix[6, occupation].sum() == 0
+    assert (matrix[7:, occupation].sum(axis=1) == 1).all()
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ETL
+
+
+
+
+QUANTILES = [0.0, 0.01, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+
+# Colunas com muitos empates (a interpolação entre valores repetidos e vizinhos), valores contínuos, nulos e um único valor.
+@pytest.mark.parametrize('values', [
+    np.random.default_rng(0).integers(0, 6, size=101).astype(np.float64),
+    np.random.default_rng(1).normal(size=1_000),
+    np.r_[np.random.default_rng(2).integers(-3, 3, size=50), [np.nan] * 10],
+    np.repeat([1.0, 2.0], [3, 1]),
+    np.full(7, 4.0),
+    np.array([5.0]),
+], ids=['ties', 'continuous', 'nulls', 'two-values', 'single-value', 'single-row'])
+def test_quantile_from_counts_matches_series_quantile(values):
+    series = pd.Series(values)
+    counts = ETL._value_counts(series)
+
+    np.testing.assert_allclose(ETL._quantile_from_counts(counts, QUANTILES), series.quantile(QUANTILES).to_numpy(), rtol=1e-12)
+    for q in QUANTILES:
+        assert ETL._quantile_from_counts(counts, q) == pytest.approx(series.quantile(q), rel=1e-12)
+
+
+# Coluna só com nulos (nenhuma contagem): NaN, como no Series.quantile.
+def test_quantile_from_counts_all_nan():
+    series = pd.Series([np.nan] * 5)
+    counts = ETL._value_counts(series)
+
+    assert np.isnan(ETL._quantile_from_counts(counts, 0.5)) and np.isnan(series.quantile(0.5))
+    assert np.isnan(ETL._quantile_from_counts(counts, QUANTILES)).all()
+    assert ETL._quantile_from_counts(counts, QUANTILES).shape == (len(QUANTILES),)
+
+
+# Contagens combinadas de blocos e a remoção de um bloco (IncrementalETL) dão o quantil da coluna restante.
+def test_quantile_from_merged_counts():
+    rng = np.random.default_rng(3)
+    first, second = pd.Series(rng.integers(0, 20, size=200)), pd.Series(rng.integers(10, 40, size=150))
+    counts = ETL._merge_counts(ETL._value_counts(first), ETL._value_counts(second))
+    np.testing.assert_allclose(ETL._quantile_from_counts(counts, QUANTILES), pd.concat([first, second]).quantile(QUANTILES).to_numpy())
+
+    counts = ETL._merge_counts(counts, ETL._value_counts(second), sign=-1)
+    assert counts.index.max() < 20
+    np.testing.assert_allclose(ETL._quantile_from_counts(counts, QUANTILES), first.quantile(QUANTILES).to_numpy())
+
+
+# Distância (em fração das linhas) entre o rank q * (n - 1) e o intervalo de ranks do valor retornado na coluna ordenada.
+def rank_error(ordered, value, q):
+    low, high = np.searchsorted(ordered, value, side='left'), np.searchsorted(ordered, value, side='right') - 1
+    rank = q * (len(ordered) - 1)
+    return max(low - rank, rank - high, 0) / len(ordered)
+
+
+# Um sketch KLL por bloco, combinados em agrupamentos diferentes: (a + b) + c e a + (b + c).
+def kll_sketches(blocks, k, seed):
+    sketches = [ETL.KLLSketch(k=k, seed=seed + i).update(block) for i, block in enumerate(blocks)]
+    left = ETL.KLLSketch(k=k, seed=seed)
+    for sketch in sketches:
+        left.merge(sketch)
+    right = ETL.KLLSketch(k=k, seed=seed).merge(sketches[0])
+    inner = ETL.KLLSketch(k=k, seed=seed)
+    for sketch in sketches[1:]:
+        inner.merge(sketch)
+    return left, right.merge(inner)
+
+
+# O rank de cada quantil fica dentro do erro documentado (2.7 / k) em sketches atualizados, combinados em qualquer ordem
+# e a partir das contagens, com o mínimo e o máximo exatos.
+@pytest.mark.parametrize('seed', range(5))
+def test_kll_rank_error_bound(seed):
+    k = 200
+    rng = np.random.default_rng(seed)
+    values = np.r_[rng.lognormal(size=60_000), rng.integers(0, 50, size=40_000)]
+    rng.shuffle(values)
+    ordered = np.sort(values)
+    blocks = np.array_split(values, 7)
+
+    sketches = [ETL.KLLSketch(k=k, seed=seed).update(values), *kll_sketches(blocks, k, seed),
+                ETL.KLLSketch(k=k, seed=seed).update_counts(ETL._value_counts(pd.Series(values)))]
+    for sketch in sketches:
+        assert sketch.n == len(values) and sum(len(level) << i for i, level in enumerate(sketch.levels)) == len(values)
+        assert len(np.concatenate(sketch.levels)) <= 3 * k + len(sketch.levels) * 2
+        assert sketch.quantile(0.0) == ordered[0] and sketch.quantile(1.0) == ordered[-1]
+        for q, value in zip(QUANTILES, sketch.quantile(QUANTILES)):
+            assert rank_error(ordered, value, q) <= 2.7 / k
+
+
+# Misra-Gries: cada contagem é subestimada em no máximo error <= n / (k + 1), também após o merge em qualquer ordem.
+@pytest.mark.parametrize('k', [10, 50])
+def test_heavy_hitters_bound(k):
+    rng = np.random.default_rng(k)
+    values = pd.Series(np.r_[rng.zipf(1.5, size=20_000) % 500, np.full(3_000, 7)])
+    exact = values.value_counts()
+    blocks = [values.iloc[i::5] for i in range(5)]
+
+    left = ETL.HeavyHitters(k=k)
+    for block in blocks:
+        left.merge(ETL.HeavyHitters(k=k).update(block))
+    inner = ETL.HeavyHitters(k=k)
+    for block in blocks[1:]:
+        inner.merge(ETL.HeavyHitters(k=k).update(block))
+    right = ETL.HeavyHitters(k=k).update(blocks[0]).merge(inner)
+
+    for sketch in (ETL.HeavyHitters(k=k).update(values), left, right):
+        assert sketch.n == len(values) and len(sketch.counts) <= k
+        assert sketch.error <= len(values) / (k + 1)
+        estimated = sketch.counts.reindex(exact.index, fill_value=0)
+        assert (estimated <= exact).all() and (estimated >= exact - sketch.error).all()
+        # Moda exata: a frequência do 1 supera a do segundo valor em mais de error.
+        assert exact.iloc[0] - exact.iloc[1] > sketch.error and sketch.mode() == exact.index[0] == values.mode()[0]
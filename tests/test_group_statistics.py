@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ETL
+
+
+
+
+# Clientes com modas empatadas, grupos só com nulos e linhas sem Customer_ID.
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(7)
+    keys = rng.choice(['C1', 'C2', 'C3', 'C4', 'C5', 'C6'], size=300).astype(object)
+    keys[rng.random(300) < 0.1] = None
+    values = rng.integers(0, 4, size=300).astype(np.float64)
+    values[rng.random(300) < 0.2] = np.nan
+    values[keys == 'C6'] = np.nan  # Grupo sem valores.
+    return pd.DataFrame({'Customer_ID': keys, 'value': values})
+
+
+# Modas de cada grupo pelo pandas (Series.mode), com NaN para os grupos sem a k-ésima moda.
+def expected_modes(frame, n):
+    modes = frame.groupby('Customer_ID')['value'].agg(lambda values: list(values.mode()))
+    return pd.DataFrame({k: modes.map(lambda found: found[k] if len(found) > k else np.nan) for k in range(n)}), modes.map(len)
+
+
+# Empates entre valores numéricos ficam em ordem crescente (como na Series.mode) e grupos sem valores recebem NaN.
+def test_mode_matches_series_mode(frame):
+    groups = ETL.GroupStatistics(frame['Customer_ID'])
+    modes, n_modes = groups.mode(frame['value'], n=2)
+    expected, expected_n_modes = expected_modes(frame, 2)
+
+    pd.testing.assert_frame_equal(modes, expected, check_names=False, check_dtype=False)
+    assert n_modes.tolist() == expected_n_modes.tolist()
+    assert np.isnan(modes.loc['C6']).all() and n_modes[list(groups.uniques).index('C6')] == 0
+
+
+# Empate entre valores de tipos não comparáveis: a ordem de primeira ocorrência, igual à Series.mode.
+def test_mode_tie_between_mixed_types():
+    keys = pd.Series(['A', 'A', 'A', 'A', 'B', 'B', 'B'])
+    values = pd.Series(['x', 2, 'x', 2, 3, 1, 1], dtype=object)
+    modes, n_modes = ETL.GroupStatistics(keys).mode(values, n=2)
+
+    assert modes.loc['A'].tolist() == ['x', 2]
+    assert modes.loc['B'].tolist()[0] == 1 and n_modes.tolist() == [2, 1]
+
+
+# Mediana de cada grupo igual ao groupby do pandas, com NaN para o grupo só com nulos.
+def test_median_matches_groupby(frame):
+    median = ETL.GroupStatistics(frame['Customer_ID']).median(frame['value'])
+    pd.testing.assert_series_equal(median, frame.groupby('Customer_ID')['value'].median(), check_names=False, check_index_type=False)
+    assert np.isnan(median['C6'])
+
+
+# Linhas sem Customer_ID não pertencem a nenhum grupo: ficam fora das estatísticas, recebem fill_value no broadcast e
+# mantêm o valor no fill.
+def test_null_keys(frame):
+    groups = ETL.GroupStatistics(frame['Customer_ID'])
+    null = frame['Customer_ID'].isna().to_numpy()
+
+    assert (groups.codes[null] == -1).all() and groups.n_groups == frame['Customer_ID'].nunique()
+    assert np.isnan(groups.broadcast(np.arange(groups.n_groups, dtype=np.float64))[null]).all()
+    assert (groups.broadcast(np.ones(groups.n_groups), fill_value=0)[null] == 0).all()
+
+    filled = groups.fill(frame['value'])
+    expected = frame.groupby('Customer_ID')['value'].transform(lambda values: values.bfill().ffill())
+    pd.testing.assert_series_equal(filled[~null], expected[~null])
+    pd.testing.assert_series_equal(filled[null], frame['value'][null])
+
+    cumcount = groups.cumcount()
+    assert cumcount[~null].tolist() == frame[~null].groupby('Customer_ID').cumcount().tolist()
+
+
+# O agrupamento compartilhado é reaproveitado entre DataFrames diferentes com o mesmo Customer_ID e recalculado quando o
+# Customer_ID muda, inclusive ao voltar para um DataFrame anterior. Fora do bloco cada chamada fatora novamente.
+def test_shared_groups_across_frames(frame):
+    other = frame.assign(value=0)
+    changed = frame.assign(Customer_ID=frame['Customer_ID'].shift(1))
+
+    with ETL._shared_customer_groups() as shared:
+        groups = ETL._customer_groups(frame)
+        assert ETL._customer_groups(other) is groups
+        assert ETL._customer_groups(frame.copy()) is groups
+
+        regrouped = ETL._customer_groups(changed)
+        assert regrouped is not groups
+        assert ETL._customer_groups(frame) is not groups and ETL._customer_groups(frame).n_groups == groups.n_groups
+
+        shared.clear()
+        assert ETL._customer_groups(frame) is not groups
+
+        # Blocos aninhados não enxergam o agrupamento do bloco externo.
+        outer = ETL._customer_groups(frame)
+        with ETL._shared_customer_groups():
+            assert ETL._customer_groups(frame) is not outer
+        assert ETL._customer_groups(frame) is outer
+
+    assert ETL._customer_groups(frame) is not ETL._customer_groups(frame)
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ETL
+import benchmark
+import incremental
+import synthetic
+
+
+
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August']
+
+
+@pytest.fixture
+def data():
+    return synthetic.generate(3_000, seed=4)
+
+
+# Cada atualização tem o mesmo resultado do pipeline completo sobre todo o histórico recebido até ela.
+def check_updates(make_pipeline, history, updates, **params):
+    etl = incremental.IncrementalETL(make_pipeline(), **params).fit(history)
+    for X in updates:
+        history = pd.concat([history, X], ignore_index=True)
+        etl.update(X)
+        pd.testing.assert_frame_equal(etl.result(), make_pipeline().fit_transform(history))
+    return etl
+
+
+# Poucos clientes por atualização: apenas as linhas desses clientes são reprocessadas.
+def test_update_few_customers(data, make_pipeline):
+    history = data[data['Month'] != 'August'].reset_index(drop=True)
+    august = data[data['Month'] == 'August']
+    customers = august['Customer_ID'].dropna().unique()
+    updates = [august[august['Customer_ID'].isin(customers[i:i + 20])] for i in (0, 20, 40)]
+    check_updates(make_pipeline, history, updates)
+
+
+# Um mês por vez para todos os clientes (reprocessamento completo acima do recompute_fraction) e sem o limite.
+@pytest.mark.parametrize('recompute_fraction', [0.5, 1.0])
+def test_update_month_by_month(data, make_pipeline, recompute_fraction):
+    history = data[data['Month'].isin(MONTHS[:5])].reset_index(drop=True)
+    updates = [data[data['Month'] == month] for month in MONTHS[5:]]
+    check_updates(make_pipeline, history, updates, recompute_fraction=recompute_fraction)
+
+
+# Clientes novos e linhas sem Customer_ID na atualização.
+def test_update_new_and_null_customers(data, make_pipeline):
+    customers = data['Customer_ID'].dropna().unique()
+    history = data[data['Customer_ID'].isin(customers[:-10])].reset_index(drop=True)
+    X = data[data['Customer_ID'].isin(customers[-10:])].copy()
+    X.loc[X.index[::5], 'Customer_ID'] = np.nan
+    check_updates(make_pipeline, history, [X])
+
+
+# A atualização não altera os DataFrames recebidos.
+def test_update_does_not_modify_input(data, make_pipeline):
+    history = data[data['Month'] != 'August'].reset_index(drop=True)
+    X = data[data['Month'] == 'August'].head(40)
+    history_copy, X_copy = history.copy(), X.copy()
+    incremental.IncrementalETL(make_pipeline()).fit(history).update(X)
+    pd.testing.assert_frame_equal(history, history_copy)
+    pd.testing.assert_frame_equal(X, X_copy)
+
+
+# Etapas globais com sketches (approximate=True) são ajustadas novamente na entrada guardada da etapa.
+def test_update_approximate_steps(data):
+    def make_pipeline():
+        steps = benchmark.pipeline_steps()
+        steps[9] = ('CleaningMissingMonthlyBalance', ETL.CleaningMissingMonthlyBalance(column_name='Monthly_Balance', approximate=True))
+        steps[15] = ('TreatingOutliersWithQuantile', ETL.TreatingOutliersWithQuantile(column_names=['Age', 'Num_Credit_Card', 'Outstanding_Debt', 'Amount_invested_monthly'], approximate=True))
+        return ETL.ETLPipeline(steps)
+
+    history = data[data['Month'] != 'August'].reset_index(drop=True)
+    august = data[data['Month'] == 'August']
+    check_updates(make_pipeline, history, [august[august['Customer_ID'].isin(august['Customer_ID'].dropna().unique()[:30])]])
+
+
+# Uma nova moda do Monthly_Balance altera as linhas nulas de outros clientes (e linhas sem Customer_ID, removidas depois
+# pelo ModifyMonthCreditHistory): essas linhas entram na atualização a partir da etapa, sem reprocessar o histórico.
+def test_update_global_statistic_change(data, make_pipeline):
+    history = data[data['Month'] != 'August'].reset_index(drop=True)
+    history.loc[history.index[history['Monthly_Balance'].isna()][:5], 'Customer_ID'] = np.nan
+    history.loc[history.index[:3], ['Customer_ID', 'Monthly_Balance']] = np.nan
+    august = data[data['Month'] == 'August']
+    X = august[august['Customer_ID'].isin(august['Customer_ID'].dropna().unique()[:8])].assign(Monthly_Balance='250')
+
+    etl = check_updates(make_pipeline, history, [X], recompute_fraction=1.0)
+    assert etl.steps_[9].mode_ == 250
+    assert len(etl.outputs_) == 1  # Blocos compactados no result.
+
+    # Apenas as colunas lidas ou alteradas a partir de cada etapa global são guardadas.
+    for position, inputs in etl.inputs_.items():
+        assert set(inputs.columns) < set(etl.columns_[position])
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+import parallel
+
+
+
+
+# Resultado na ordem das linhas (a execução serial reordena as linhas pelo Customer_ID).
+def by_id(X):
+    return X.sort_values('ID').reset_index(drop=True)
+
+
+# Estatísticas aprendidas por cada etapa, sem as contagens de valores: valores inteiros acima de 2**53 inferidos como
+# int64 em uma partição e float64 no DataFrame inteiro entram nas contagens com chaves arredondadas de forma diferente.
+def learned(pipeline):
+    def normalize(value):
+        if isinstance(value, pd.Series):
+            return normalize(value.to_dict())
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items()}
+        return None if pd.isna(value) else value
+    return [normalize({name: value for name, value in step._learned().items() if name != 'value_counts_'})
+            for _, step in pipeline.steps]
+
+
+@pytest.mark.parametrize('n_jobs, n_partitions, backend', [(1, 4, 'sequential'), (2, 3, 'loky')])
+def test_parallel_matches_pipeline(raw, make_pipeline, n_jobs, n_partitions, backend):
+    reference = make_pipeline()
+    expected = reference.fit_transform(raw)
+
+    pipeline = make_pipeline()
+    etl = parallel.ParallelETL(pipeline, n_jobs=n_jobs, n_partitions=n_partitions, backend=backend)
+    result = etl.fit_transform(raw)
+
+    # Mesmo index e ordem da entrada, mesmos valores e mesmo estado ajustado da execução serial.
+    assert result.index.equals(raw.index)
+    assert (result['ID'].to_numpy() == raw['ID'].to_numpy()).all()
+    pd.testing.assert_frame_equal(by_id(result), by_id(expected))
+    assert learned(pipeline) == learned(reference)
+
+    # Transform com as etapas já ajustadas.
+    pd.testing.assert_frame_equal(by_id(etl.transform(raw)), by_id(reference.transform(raw)))
+
+
+# A entrada não é alterada (as partições são cópias).
+def test_parallel_does_not_modify_input(raw, make_pipeline):
+    raw_copy = raw.copy()
+    parallel.ParallelETL(make_pipeline(), n_jobs=1, n_partitions=3, backend='sequential').fit_transform(raw)
+    pd.testing.assert_frame_equal(raw, raw_copy)
+
+
+# Linhas sem Customer_ID são removidas por ModifyMonthCreditHistory: o index fica com as linhas restantes.
+def test_parallel_null_customers(raw, make_pipeline):
+    X = raw.copy()
+    X.loc[X.index[::97], 'Customer_ID'] = None
+    expected = make_pipeline().fit_transform(X)
+
+    result = parallel.ParallelETL(make_pipeline(), n_jobs=1, n_partitions=3, backend='sequential').fit_transform(X)
+    kept = X.index[X['Customer_ID'].notna()]
+    assert len(result) == len(expected) == len(kept)
+    assert result.index.equals(kept)
+    assert (result['ID'].to_numpy() == X.loc[kept, 'ID'].to_numpy()).all()
+    pd.testing.assert_frame_equal(by_id(result), by_id(expected))
@@ -0,0 +1,129 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import clone
+from sklearn.exceptions import NotFittedError
+
+import ETL
+import benchmark
+
+
+
+
+def test_pipeline_copies_input_once(raw, make_pipeline):
+    original = raw.copy()
+    pipeline = make_pipeline()
+    result = pipeline.fit_transform(raw)
+
+    pd.testing.assert_frame_equal(raw, original)
+    pd.testing.assert_frame_equal(pipeline.transform(raw), result)
+    assert all(step.copy for _, step in pipeline.steps)
+
+
+def test_steps_copy_by_default(raw):
+    original = raw.copy()
+    step = ETL.TransformToNull(column_names=['Occupation', 'SSN'])
+    step.fit_transform(raw)
+    pd.testing.assert_frame_equal(raw, original)
+
+    step.copy = False
+    assert step.fit_transform(raw) is raw
+
+
+# A execução in-place de uma thread não desliga a cópia das chamadas feitas em outras threads.
+def test_inplace_is_per_thread(raw):
+    step = ETL.TransformToNull(column_names=['Occupation', 'SSN'])
+    inside, checked = threading.Event(), threading.Event()
+
+    def run_inplace():
+        with ETL._inplace():
+            inside.set()
+            checked.wait()
+
+    thread = threading.Thread(target=run_inplace)
+    thread.start()
+    inside.wait()
+    try:
+        original = raw.copy()
+        assert step.fit_transform(raw) is not raw
+        pd.testing.assert_frame_equal(raw, original)
+        with ETL._inplace():
+            assert step.fit_transform(raw) is raw
+    finally:
+        checked.set()
+        thread.join()
+
+
+# Chamadas concorrentes do mesmo pipeline (ex.: pool de threads do service.py) não alteram o DataFrame de quem chamou.
+def test_concurrent_transforms(raw, make_pipeline):
+    pipeline = make_pipeline().fit(raw)
+    expected = pipeline.transform(raw)
+    original = raw.copy()
+    results, errors = [], []
+
+    def run():
+        try:
+            for _ in range(3):
+                results.append(pipeline.transform(raw))
+        except Exception as error:  # pragma: no cover - falha reportada abaixo
+            errors.append(error)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    pd.testing.assert_frame_equal(raw, original)
+    for result in results:
+        pd.testing.assert_frame_equal(result, expected)
+
+
+# Customer_ID não vistos no fit (e linhas sem Customer_ID) recebem a moda/mediana global das estatísticas por cliente.
+def test_unseen_customers_use_global_statistics():
+    X = pd.DataFrame({'Customer_ID': ['A', 'A', 'A', 'B', 'B', 'C'],
+                      'Num_of_Delayed_Payment': [2, 2, 3, 5, 5, 5],
+                      'Delay_from_due_date': 0,
+                      'Monthly_Inhand_Salary': [1000.0, np.nan, 1000.0, 2000.0, 2000.0, 4000.0]})
+    new = pd.DataFrame({'Customer_ID': ['Z', None, 'A'],
+                        'Num_of_Delayed_Payment': [np.nan, np.nan, np.nan],
+                        'Delay_from_due_date': 0,
+                        'Monthly_Inhand_Salary': [np.nan, np.nan, np.nan]})
+
+    delayed = ETL.CleaningMissingDelayedPayment(column_name='Num_of_Delayed_Payment').fit(X)
+    assert delayed.global_mode_ == 5
+    assert delayed.transform(new)['Num_of_Delayed_Payment'].tolist() == [5, 5, 2]
+
+    salary = ETL.CleaningMissingMonthlySalary(column_name='Monthly_Inhand_Salary').fit(X)
+    assert salary.global_median_ == 2000.0
+    assert salary.transform(new)['Monthly_Inhand_Salary'].tolist() == [2000.0, 2000.0, 1000.0]
+
+
+# Etapas com estatísticas aprendidas no fit não executam o transform antes do fit.
+@pytest.mark.parametrize('position', [position for position, (name, step) in enumerate(benchmark.pipeline_steps())
+                                      if name in ('CleaningMissingDelayedPayment', 'CleaningMissingMonthlySalary', 'CleaningMissingMonthlyBalance',
+                                                  'CreateDateCreditHistoryColumn', 'TreatingOutliersWithQuantile', 'TreatingOutliersWithMode')])
+def test_transform_before_fit_raises(raw, position):
+    step = clone(benchmark.pipeline_steps()[position][1])
+    with pytest.raises(NotFittedError):
+        step.transform(raw)
+    assert not step._learned()
+
+
+# Valores fora do padrão "X Years and Y Months" (texto, nulos e números) viram NaT, inclusive em colunas string[pyarrow],
+# e o transform antes do fit não calcula datas com o mês atual.
+@pytest.mark.parametrize('dtype', [object, 'string[pyarrow]', 'category'])
+def test_date_credit_history(dtype):
+    values = ['2 Years and 3 Months', 'NA', None, 'Years and Months', '10 Years and 0 Months', '3 Months', '']
+    X = pd.DataFrame({'Credit_History_Age': pd.Series(values, dtype=dtype)})
+    step = ETL.CreateDateCreditHistoryColumn(column_name='Credit_History_Age', reference_date='2024-01-01')
+
+    with pytest.raises(NotFittedError):
+        step.transform(X)
+
+    dates = step.fit(X).transform(X)['Credit_History_Age_Date']
+    expected = pd.to_datetime(['2021-10-01', None, None, None, '2014-01-01', None, None])
+    pd.testing.assert_series_equal(dates, pd.Series(expected, name='Credit_History_Age_Date'))
@@ -0,0 +1,92 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import ETL
+import benchmark
+import planner
+
+
+
+
+def test_planner_matches_pipeline(raw, make_pipeline):
+    expected = make_pipeline().fit_transform(raw)
+    plan = planner.PipelinePlanner(make_pipeline())
+
+    pd.testing.assert_frame_equal(plan.fit_transform(raw), expected)
+    pd.testing.assert_frame_equal(plan.transform(raw), make_pipeline().fit(raw).transform(raw))
+    assert len(plan.stages_) < len(plan.steps_)
+
+
+def test_planner_removes_idempotent_repeats(raw, make_pipeline):
+    steps = benchmark.pipeline_steps()
+    steps.insert(3, ('CleaningMissingCreditCardAgain', ETL.CleaningMissingCreditCard(column_name='Num_Credit_Card')))
+    plan = planner.PipelinePlanner(ETL.ETLPipeline(steps))
+
+    assert plan.removed_ == [('CleaningMissingCreditCardAgain', 'CleaningMissingCreditCard')]
+    assert 'CleaningMissingCreditCardAgain' in plan.explain()
+    pd.testing.assert_frame_equal(plan.fit_transform(raw), make_pipeline().fit_transform(raw))
+
+
+# Frames com o mesmo tamanho e clientes diferentes não podem compartilhar o agrupamento.
+def test_shared_groups_are_keyed_on_customer_ids():
+    first = pd.DataFrame({'Customer_ID': ['A', 'A', 'B', 'B']})
+    second = pd.DataFrame({'Customer_ID': ['A', 'B', 'C', 'D']})
+    with ETL._shared_customer_groups():
+        assert ETL._customer_groups(first).n_groups == 2
+        assert ETL._customer_groups(second).n_groups == 4
+        assert ETL._customer_groups(second) is ETL._customer_groups(second.copy())
+
+
+# Cada thread (ex.: workers do service.py) utiliza apenas os seus próprios blocos de agrupamento.
+def test_shared_groups_are_per_thread():
+    frames = [pd.DataFrame({'Customer_ID': ['A', 'A', 'B', 'B']}), pd.DataFrame({'Customer_ID': ['A', 'B', 'C', 'D']})]
+    inside, computed, done = threading.Barrier(2), threading.Barrier(2), threading.Barrier(2)
+    n_groups = {}
+
+    def run(i):
+        with ETL._shared_customer_groups():
+            inside.wait()  # As duas threads estão com um bloco aberto.
+            if i == 1:
+                computed.wait()  # A thread 0 já guardou o seu agrupamento.
+            n_groups[i] = ETL._customer_groups(frames[i]).n_groups
+            if i == 0:
+                computed.wait()
+            done.wait()  # Os dois blocos continuam abertos até as duas threads consultarem o agrupamento.
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert n_groups == {0: 2, 1: 4}
+
+
+def test_fused_step_matches_steps(raw, make_pipeline):
+    steps = benchmark.pipeline_steps()[:8]
+    fused = planner.FusedStep(steps)
+    expected = ETL.ETLPipeline(benchmark.pipeline_steps()[:8]).fit_transform(raw)
+
+    result = fused.fit_transform(raw)
+    pd.testing.assert_frame_equal(result, expected)
+    assert not np.shares_memory(result['Customer_ID'].to_numpy(), raw['Customer_ID'].to_numpy())
+
+
+# Um array de chaves novo é comparado uma única vez (pelo hash); depois é reconhecido pela identidade.
+def test_shared_groups_compare_new_keys_once(monkeypatch):
+    first = pd.DataFrame({'Customer_ID': ['A', 'A', 'B', None]})
+    copy = first.copy()
+    calls = []
+    hash_keys = ETL._hash_keys
+    monkeypatch.setattr(ETL, '_hash_keys', lambda keys: calls.append(len(keys)) or hash_keys(keys))
+
+    with ETL._shared_customer_groups():
+        groups = ETL._customer_groups(first)
+        for _ in range(3):
+            assert ETL._customer_groups(first) is groups
+        assert calls == []
+        for _ in range(3):
+            assert ETL._customer_groups(copy) is groups
+        assert calls == [4, 4]  # Hash das chaves guardadas e do array novo, uma vez cada.
+        assert ETL._customer_groups(pd.DataFrame({'Customer_ID': ['A', 'B', 'B', None]})) is not groups
@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ETL
+
+
+
+
+# Etapa que aloca (e libera) um array de size bytes e depois executa a etapa interna, quando houver.
+class Allocating(ETL.BaseTransformer):
+
+    def __init__(self, size, inner=None, column_name='a', copy=True):
+        self.size = size
+        self.inner = inner
+        self.column_name = column_name
+        self.copy = copy
+
+    def transform(self, X):
+        X_transformed = self._get_input(X)
+        block = np.ones(self.size // 8)
+        del block
+        if self.inner is not None:
+            X_transformed = self.inner.transform(X_transformed)
+        return X_transformed
+
+
+# Uma etapa executada dentro de outra não apaga o pico de memória da etapa externa (o tracemalloc tem um único pico).
+def test_nested_step_keeps_outer_peak():
+    X = pd.DataFrame({'a': [1, 2, 3]})
+    outer = Allocating(40_000_000, inner=Allocating(1_000_000))
+
+    with ETL.profile() as report:
+        outer.transform(X)
+
+    inner_record, outer_record = report.records
+    assert inner_record['peak_memory'] < 10_000_000
+    assert outer_record['peak_memory'] >= 40_000_000
+
+
+# O relatório tem um registro por fit e transform de cada etapa, com os nomes do pipeline, as linhas e os nulos das colunas
+# da etapa antes e depois, enviados aos callbacks assim que cada etapa termina.
+def test_profile_report(raw, make_pipeline, tmp_path):
+    pipeline = make_pipeline()
+    received = []
+    with ETL.profile(pipeline, callbacks=[received.append]) as report:
+        result = pipeline.fit_transform(raw)
+
+    names = [name for name, _ in pipeline.steps]
+    assert received == report.records
+    assert [record['step'] for record in report.records if record['method'] == 'transform'] == names
+    assert {record['method'] for record in report.records} == {'fit', 'transform'}
+
+    frame = report.to_frame()
+    assert list(frame.columns) == ['step', 'class', 'method', 'wall_time', 'cpu_time', 'peak_memory', 'rows_in', 'rows_out',
+                                   'nulls_before', 'nulls_after']
+    transforms = frame[frame['method'] == 'transform'].reset_index(drop=True)
+    assert transforms['rows_in'].iloc[0] == len(raw) and transforms['rows_out'].iloc[-1] == len(result)
+    assert (transforms['rows_in'].iloc[1:].to_numpy() == transforms['rows_out'].iloc[:-1].to_numpy()).all()
+    assert (frame['peak_memory'] >= 0).all() and (frame['wall_time'] >= 0).all()
+    assert frame.loc[frame['method'] == 'fit', ['rows_out', 'nulls_before', 'nulls_after']].isna().all().all()
+
+    # Nulos por coluna: o CleaningMissingMonthlySalary preenche todos os nulos do Monthly_Inhand_Salary.
+    nulls = report.null_counts()
+    salary = nulls[(nulls['step'] == 'CleaningMissingMonthlySalary') & (nulls['column'] == 'Monthly_Inhand_Salary')].iloc[0]
+    assert salary['nulls_before'] == raw['Monthly_Inhand_Salary'].isna().sum() > 0 and salary['nulls_after'] == 0
+    assert transforms['nulls_before'].sum() == nulls['nulls_before'].sum()
+
+    path = tmp_path / 'report.json'
+    assert json.loads(report.to_json(path)) == json.loads(path.read_text()) == report.to_dict()
+
+
+# Sem medição de memória o pico fica vazio; fora do bloco nada é registrado e o tracemalloc é desligado.
+def test_profile_without_memory(raw):
+    step = ETL.TransformToNull(column_names=['Occupation'])
+    with ETL.profile(memory=False) as report:
+        step.fit_transform(raw)
+    step.transform(raw)
+
+    assert [record['method'] for record in report.records] == ['fit', 'transform']
+    assert all(record['peak_memory'] is None for record in report.records)
+    assert report.records[1]['nulls_after'] == {'Occupation': int(step.transform(raw)['Occupation'].isna().sum())}
+
+
+# Erros da etapa não deixam medições abertas e não geram registro.
+def test_profile_step_error():
+    with ETL.profile() as report:
+        with pytest.raises(AttributeError):
+            Allocating(8).transform(None)
+    assert report.records == [] and ETL._OPEN_MEASUREMENTS == []
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ETL
+import benchmark
+import record
+import synthetic
+
+
+
+
+# Etapas do str_pipe com data de referência fixa, CreateRollingFeatures e OptimizeDtypes (etapa final recomendada).
+def record_steps():
+    steps = benchmark.pipeline_steps()
+    steps[11] = ('CreateDateCreditHistoryColumn', ETL.CreateDateCreditHistoryColumn(column_name='Credit_History_Age', reference_date='2024-01-01'))
+    steps.append(('CreateRollingFeatures', ETL.CreateRollingFeatures(column_names=['Num_of_Delayed_Payment', 'Outstanding_Debt'],
+                                                                     windows=(3,), statistics=('mean', 'max', 'slope'), lags=(1, 4),
+                                                                     diffs=(1,), expanding=('mean', 'count'))))
+    steps.append(('OptimizeDtypes', ETL.OptimizeDtypes()))
+    return steps
+
+
+# Compara dois valores do registro (nulos iguais entre si, números com tolerância relativa).
+def same_value(expected, value):
+    if pd.isna(expected):
+        return pd.isna(value)
+    if isinstance(expected, (int, float, np.number)) and not isinstance(expected, bool):
+        return np.isclose(float(expected), float(value), rtol=1e-9)
+    return expected == value
+
+
+# Cada registro pontuado sozinho é igual à última linha do pipeline vetorizado sobre o histórico do cliente.
+def check_records(history, records):
+    pipeline = ETL.ETLPipeline(record_steps())
+    scorer = record.RecordScorer(pipeline).fit(history)
+    groups = {customer: group for customer, group in history.groupby('Customer_ID', sort=False)}
+
+    for row in records:
+        scored = scorer(dict(row))
+        batch = pd.concat([groups[row['Customer_ID']], pd.DataFrame([row])], ignore_index=True)
+        expected = pipeline.transform(batch).iloc[-1].to_dict()
+        assert [name for name in expected if not same_value(expected[name], scored.get(name))] == []
+
+
+def test_record_matches_pipeline():
+    full = synthetic.generate(4_000, seed=5)
+    history = full[full['Month'] != 'August'].reset_index(drop=True)
+    check_records(history, full[full['Month'] == 'August'].to_dict('records')[:150])
+
+
+# O CleaningNotNumbers não altera a coluna quando nenhum valor do histórico do cliente e do registro contém números
+# (nem o ConvertDtypeToNumeric: 'inf' continua texto); com números no histórico ou no registro, vira NaN.
+def test_record_not_numbers_without_digits():
+    full = synthetic.generate(1_000, seed=6)
+    customers = full['Customer_ID'].dropna().unique()[:3]
+    full.loc[full['Customer_ID'] == customers[0], 'Changed_Credit_Limit'] = 'inf'
+    full.loc[(full['Customer_ID'] == customers[1]) & (full['Month'] == 'August'), 'Changed_Credit_Limit'] = 'inf'
+    full.loc[(full['Customer_ID'] == customers[2]) & (full['Month'] != 'August'), 'Changed_Credit_Limit'] = 'inf'
+    history = full[full['Month'] != 'August'].reset_index(drop=True)
+    records = full[(full['Month'] == 'August') & full['Customer_ID'].isin(customers)].to_dict('records')
+
+    check_records(history, records)
+    scorer = record.RecordScorer(ETL.ETLPipeline(record_steps())).fit(history)
+    scored = {row['Customer_ID']: scorer(row)['Changed_Credit_Limit'] for row in records}
+    assert scored[customers[0]] == 'inf' and np.isnan(scored[customers[1]]) and scored[customers[2]] > 0
+
+
+# Registros sem Customer_ID recebem as variáveis temporais nulas.
+def test_record_rolling_without_customer():
+    history = synthetic.generate(400, seed=1)
+    steps = [('CreateMonthNumberColumn', ETL.CreateMonthNumberColumn(column_name='Month')),
+             ('CreateRollingFeatures', ETL.CreateRollingFeatures(column_names=['Interest_Rate'], windows=(2,), lags=(1,)))]
+    scorer = record.RecordScorer(ETL.ETLPipeline(steps)).fit(history)
+
+    scored = scorer({**history.iloc[0].to_dict(), 'Customer_ID': None})
+    assert np.isnan(scored['Interest_Rate_rolling2_mean'])
+    assert np.isnan(scored['Interest_Rate_lag1'])
+
+
+# Etapas sem regra são rejeitadas no fit com o nome da etapa.
+def test_record_rejects_unsupported_step(raw):
+    class Unsupported(ETL.BaseTransformer):
+        def transform(self, X):
+            return X
+
+    pipeline = ETL.ETLPipeline([('TransformToNull', ETL.TransformToNull(column_names=['Occupation'])), ('minha_etapa', Unsupported())])
+    with pytest.raises(TypeError, match="'minha_etapa' \\(Unsupported\\)"):
+        record.RecordScorer(pipeline).fit(raw)
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ETL
+
+
+
+
+COLUMNS = ['a', 'b']
+
+
+# Clientes com quantidades diferentes de meses, meses fora de ordem, nulos e linhas sem Customer_ID.
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    sizes = rng.integers(1, 9, 200)
+    n = sizes.sum()
+    X = pd.DataFrame({'Customer_ID': np.repeat([f'C{i}' for i in range(len(sizes))], sizes).astype(object),
+                      'Number_Month': np.concatenate([rng.permutation(size) + 1 for size in sizes]).astype(float),
+                      'a': rng.normal(size=n) * 100, 'b': rng.integers(0, 30, n).astype(float)})
+    X.loc[rng.random(n) < 0.1, 'a'] = np.nan
+    X.loc[rng.random(n) < 0.02, 'Customer_ID'] = None
+    return X.sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+# Resultado esperado com o groupby do pandas.
+def expected(X, windows, statistics, lags, diffs, expanding):
+    grouped = X.sort_values(['Customer_ID', 'Number_Month'], kind='stable').groupby('Customer_ID', sort=False)
+    features = {}
+    for column_name in COLUMNS:
+        for window in windows:
+            rolling = grouped[column_name].rolling(window)
+            for statistic in statistics:
+                features[f'{column_name}_rolling{window}_{statistic}'] = getattr(rolling, statistic)().reset_index(level=0, drop=True)
+        for lag in lags:
+            features[f'{column_name}_lag{lag}'] = grouped[column_name].shift(lag)
+        for diff in diffs:
+            features[f'{column_name}_diff{diff}'] = grouped[column_name].diff(diff)
+        for statistic in expanding:
+            features[f'{column_name}_expanding_{statistic}'] = getattr(grouped[column_name].expanding(), statistic)().reset_index(level=0, drop=True)
+    return pd.DataFrame(features).reindex(X.index)
+
+
+def test_matches_pandas_groupby(frame):
+    params = dict(windows=(2, 3), statistics=('mean', 'sum', 'min', 'max', 'std'), lags=(1, 2), diffs=(1,),
+                  expanding=('mean', 'sum', 'min', 'max', 'count'))
+    step = ETL.CreateRollingFeatures(COLUMNS, **params)
+    result = step.fit_transform(frame)
+
+    reference = expected(frame, **params)
+    assert list(result.columns[len(frame.columns):]) == step._feature_names()
+    pd.testing.assert_frame_equal(result[reference.columns], reference, check_exact=False, rtol=1e-9, atol=1e-7)
+    pd.testing.assert_frame_equal(result[frame.columns], frame)
+
+
+def test_slope_is_least_squares_trend():
+    X = pd.DataFrame({'Customer_ID': ['A'] * 4, 'Number_Month': [4., 3., 2., 1.], 'a': [7., 5., 3., 1.], 'b': 0.})
+    result = ETL.CreateRollingFeatures(['a'], windows=(3,), statistics=('slope',), lags=(), diffs=()).fit_transform(X)
+    np.testing.assert_array_equal(result['a_rolling3_slope'], [2., 2., np.nan, np.nan])
+
+
+def test_idempotent(frame):
+    step = ETL.CreateRollingFeatures(COLUMNS, windows=(3,), statistics=('mean', 'max'), expanding=('sum',))
+    result = step.fit_transform(frame)
+    pd.testing.assert_frame_equal(step.transform(result), result)
+
+
+# Lotes menores que a maior defasagem, diferença ou janela (ex.: um único cliente sendo pontuado).
+@pytest.mark.parametrize('n_rows', [0, 1, 5])
+def test_frames_shorter_than_lags_and_windows(n_rows):
+    X = pd.DataFrame({'Customer_ID': ['A'] * n_rows, 'Number_Month': np.arange(n_rows, dtype=float),
+                      'a': np.arange(n_rows, dtype=float), 'b': 1.})
+    step = ETL.CreateRollingFeatures(COLUMNS, windows=(3, 12), statistics=('mean', 'std'), lags=(1, 7), diffs=(9,),
+                                     expanding=('max',))
+    result = step.fit_transform(X)
+
+    assert len(result) == n_rows
+    assert result['a_lag7'].isna().all() and result['a_diff9'].isna().all() and result['a_rolling12_mean'].isna().all()
+    if n_rows:
+        np.testing.assert_array_equal(result['a_lag1'], np.r_[np.nan, np.arange(n_rows - 1)])
+        np.testing.assert_array_equal(result['a_expanding_max'], np.arange(n_rows))
+
+
+def test_rejects_unknown_statistics(frame):
+    with pytest.raises(ValueError):
+        ETL.CreateRollingFeatures(COLUMNS, statistics=('median',)).fit_transform(frame)
+    with pytest.raises(ValueError):
+        ETL.CreateRollingFeatures(COLUMNS, lags=(0,)).fit_transform(frame)
@@ -0,0 +1,135 @@
+import asyncio
+import functools
+import json
+import threading
+
+import pytest
+
+import ETL
+import record
+import service
+import synthetic
+import test_record
+
+
+
+
+# Envia bytes brutos ao servidor e retorna (status, corpo JSON) da resposta, ou None quando a conexão é fechada sem resposta.
+async def send_raw(port, data):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(data)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            return None
+        length = 0
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return int(status_line.split()[1]), json.loads(await reader.readexactly(length))
+    finally:
+        writer.close()
+
+
+# Executa a corrotina com um servidor (MicroBatcher com uma função de eco) em uma porta livre.
+def with_server(coroutine):
+    async def run():
+        async with service.MicroBatcher(lambda records: records, max_wait=0.0) as batcher:
+            async with service.HTTPServer(batcher, port=0) as server:
+                return await coroutine(server.port)
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('request_bytes', [
+    b'GARBAGE\r\n\r\n',
+    b'POST /score HTTP/1.1\r\nContent-Length: abc\r\n\r\n{}',
+    b'POST /score HTTP/1.1\r\nContent-Length: -1\r\n\r\n{}',
+])
+def test_malformed_request_returns_400(request_bytes):
+    async def check(port):
+        assert await send_raw(port, request_bytes) == (400, {'error': 'bad request'})
+        # O servidor continua atendendo novas conexões.
+        assert await send_raw(port, b'GET /health HTTP/1.1\r\n\r\n') == (200, {'status': 'ok', 'batches': 0, 'records': 0})
+    with_server(check)
+
+
+def test_invalid_json_and_score():
+    async def check(port):
+        assert await send_raw(port, b'POST /score HTTP/1.1\r\nContent-Length: 3\r\n\r\n{x}') == (400, {'error': 'invalid json'})
+        body = json.dumps([{'a': 1}, {'a': 2}]).encode()
+        request = b'POST /score HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body)
+        assert await send_raw(port, request) == (200, [{'a': 1}, {'a': 2}])
+    with_server(check)
+
+
+# O resultado de cada registro não depende do micro-lote: lotes de 1 e de 64 registros dão o resultado do RecordScorer.
+def test_batching_does_not_change_results():
+    full = synthetic.generate(1_500, seed=2)
+    history = full[full['Month'] != 'August']
+    records = [{key: service._json_value(value) for key, value in row.items()}
+               for row in full[full['Month'] == 'August'].head(60).to_dict('records')]
+    records[3]['Customer_ID'] = None
+    scorer = record.RecordScorer(ETL.ETLPipeline(test_record.record_steps())).fit(history)
+    expected = service._to_json(scorer.transform(records))
+
+    async def run(max_batch_size):
+        async with service.MicroBatcher(functools.partial(service.score_records, scorer), max_batch_size, max_wait=0.01) as batcher:
+            results = await asyncio.gather(*(batcher.submit(row) for row in records))
+        return service._to_json(list(results)), batcher.n_batches
+
+    for max_batch_size in (1, 64):
+        results, n_batches = asyncio.run(run(max_batch_size))
+        assert results == expected
+        assert n_batches == (len(records) if max_batch_size == 1 else 1)
+    assert expected[3] is None
+
+
+# O stop aguarda o lote em execução e encerra com erro os registros que ainda estão na fila.
+def test_stop_resolves_queued_records():
+    release = threading.Event()
+
+    def function(records):
+        release.wait()
+        return records
+
+    async def run():
+        batcher = await service.MicroBatcher(function, max_batch_size=2, max_wait=0.0).start()
+        futures = [asyncio.ensure_future(batcher.submit({'a': i})) for i in range(5)]
+        await asyncio.sleep(0.05)
+        stopping = asyncio.ensure_future(batcher.stop())
+        await asyncio.sleep(0.05)
+        release.set()
+        await stopping
+        results = await asyncio.wait_for(asyncio.gather(*futures, return_exceptions=True), 1)
+        with pytest.raises(RuntimeError):
+            await batcher.submit({'a': 5})
+        return results
+
+    results = asyncio.run(run())
+    assert results[:2] == [{'a': 0}, {'a': 1}]
+    assert all(isinstance(result, RuntimeError) for result in results[2:])
+
+
+# O stop do servidor responde os pedidos em andamento antes de fechar as conexões.
+def test_server_stop_answers_pending_request():
+    release = threading.Event()
+
+    def function(records):
+        release.wait()
+        return records
+
+    async def run():
+        async with service.MicroBatcher(function, max_wait=0.0) as batcher:
+            server = await service.HTTPServer(batcher, port=0).start()
+            body = b'{"a": 1}'
+            request = asyncio.ensure_future(send_raw(server.port, b'POST /score HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body)))
+            await asyncio.sleep(0.05)
+            stopping = asyncio.ensure_future(server.stop())
+            await asyncio.sleep(0.05)
+            release.set()
+            await stopping
+            return await asyncio.wait_for(request, 1)
+
+    assert asyncio.run(run()) == (200, {'a': 1})
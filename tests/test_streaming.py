@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+import ETL
+import benchmark
+import streaming
+import synthetic
+
+
+
+
+# Colunas com texto misturado a números, lidas como texto em todos os blocos (como no train.csv).
+DTYPE = {column_name: object for column_name in ['Age', 'Annual_Income', 'Num_of_Loan', 'Num_of_Delayed_Payment', 'Changed_Credit_Limit',
+                                                 'Outstanding_Debt', 'Amount_invested_monthly', 'Monthly_Balance',
+                                                 'Credit_History_Age', 'Type_of_Loan', 'Name']}
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'raw.csv'
+    synthetic.generate(3_000, seed=3).to_csv(path, index=False)
+    return str(path)
+
+
+def test_chunks_keep_customers_together(csv_path):
+    chunks = list(streaming.iter_customer_chunks(csv_path, chunksize=701, dtype=DTYPE))
+    assert len(chunks) > 1
+    assert sum(len(chunk) for chunk in chunks) == len(pd.read_csv(csv_path, dtype=DTYPE))
+    customers = [set(chunk['Customer_ID'].dropna()) for chunk in chunks]
+    assert all(not (customers[i] & customers[j]) for i in range(len(chunks)) for j in range(i + 1, len(chunks)))
+
+
+# Colunas category continuam category em todos os blocos (as categorias dos blocos são unidas no concat das linhas levadas
+# para o bloco seguinte), com os mesmos valores da leitura do arquivo inteiro.
+def test_chunks_keep_category_dtype(csv_path):
+    dtype = {**DTYPE, 'Customer_ID': 'category', 'Occupation': 'category', 'Credit_Mix': 'category'}
+    chunks = list(streaming.iter_customer_chunks(csv_path, chunksize=97, dtype=dtype))
+    for chunk in chunks:
+        assert all(isinstance(chunk[column_name].dtype, pd.CategoricalDtype) for column_name in ('Customer_ID', 'Occupation', 'Credit_Mix'))
+
+    result = pd.concat(chunks).astype({'Customer_ID': object, 'Occupation': object, 'Credit_Mix': object})
+    pd.testing.assert_frame_equal(result, pd.read_csv(csv_path, dtype=DTYPE))
+
+
+# Um Customer_ID que reaparece depois de um bloco já retornado (linhas do cliente fora de ordem no arquivo) gera erro.
+def test_chunks_reject_non_contiguous_customers(csv_path, tmp_path):
+    raw = pd.read_csv(csv_path, dtype=DTYPE)
+    customers = raw['Customer_ID'].dropna().unique()
+    path = tmp_path / 'unsorted.csv'
+    pd.concat([raw[raw['Customer_ID'] != customers[0]], raw[raw['Customer_ID'] == customers[0]]]).to_csv(path, index=False)
+    assert len(list(streaming.iter_customer_chunks(str(path), chunksize=701, dtype=DTYPE))) > 1
+
+    # Linhas sem Customer_ID no fim de um bloco não separam as linhas do cliente seguinte.
+    path = tmp_path / 'nulls.csv'
+    nulls = raw.copy()
+    nulls.loc[nulls.index[698:701], 'Customer_ID'] = None  # Cliente das linhas 696 a 703, o bloco termina na linha 700.
+    nulls.to_csv(path, index=False)
+    chunks = list(streaming.iter_customer_chunks(str(path), chunksize=701, dtype=DTYPE))
+    assert sum(len(chunk) for chunk in chunks) == len(raw)
+
+    path = tmp_path / 'split.csv'
+    first = raw[raw['Customer_ID'] == customers[0]]
+    pd.concat([first.iloc[:4], raw[~raw['Customer_ID'].isin([customers[0]])], first.iloc[4:]]).to_csv(path, index=False)
+    with pytest.raises(ValueError, match=str(customers[0])):
+        list(streaming.iter_customer_chunks(str(path), chunksize=701, dtype=DTYPE))
+
+
+# O resultado em blocos é igual ao pipeline sobre o arquivo inteiro (a ordem das linhas muda apenas entre blocos).
+def test_streaming_matches_pipeline(csv_path, tmp_path):
+    expected = ETL.ETLPipeline(benchmark.pipeline_steps()).fit_transform(pd.read_csv(csv_path, dtype=DTYPE))
+    expected_path = tmp_path / 'expected.csv'
+    expected.to_csv(expected_path, index=False)
+
+    pipeline = ETL.ETLPipeline(benchmark.pipeline_steps())
+    etl = streaming.StreamingETL(pipeline, chunksize=701, read_csv_kwargs={'dtype': DTYPE})
+    output_path = etl.fit_transform(csv_path, str(tmp_path / 'output.csv'))
+
+    read = lambda path: pd.read_csv(path, dtype={'Credit_History_Age_Date': str}).sort_values('ID').reset_index(drop=True)
+    pd.testing.assert_frame_equal(read(output_path), read(expected_path))
+
+    # Estatísticas globais aprendidas em blocos iguais às do arquivo inteiro.
+    reference = ETL.ETLPipeline(benchmark.pipeline_steps()).fit(pd.read_csv(csv_path, dtype=DTYPE))
+    assert pipeline.named_steps['CleaningMissingMonthlyBalance'].mode_ == reference.named_steps['CleaningMissingMonthlyBalance'].mode_
+    assert pipeline.named_steps['TreatingOutliersWithQuantile'].upper_bounds_ == reference.named_steps['TreatingOutliersWithQuantile'].upper_bounds_
+    assert pipeline.named_steps['TreatingOutliersWithMode'].modes_ == reference.named_steps['TreatingOutliersWithMode'].modes_
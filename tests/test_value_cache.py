@@ -0,0 +1,124 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ETL
+
+
+
+
+@pytest.fixture
+def value_cache():
+    ETL.set_value_cache(50)
+    yield
+    ETL.set_value_cache(0)
+
+
+# Com o cache ativo (e pequeno, forçando remoções) o resultado dos lotes é o mesmo da execução sem cache.
+def test_cached_batches_match_uncached(raw, make_pipeline, value_cache):
+    pipeline = make_pipeline().fit(raw)
+    batches = [raw.iloc[start:start + 400] for start in range(0, len(raw), 400)]
+    cached = [pipeline.transform(batch) for batch in batches]
+
+    ETL.set_value_cache(0)
+    for batch, result in zip(batches, cached):
+        pd.testing.assert_frame_equal(result, pipeline.transform(batch))
+
+
+# Regra de teste que registra os valores avaliados em cada chamada.
+def counting_rule(calls):
+    def rule(values):
+        calls.append(list(values))
+        return values.map(lambda value: value.upper() if isinstance(value, str) else 'null')
+    return rule
+
+
+# Colunas string[pyarrow] e object (com nulos) têm o mesmo resultado no _map_unique, com e sem cache, e nas etapas.
+@pytest.mark.parametrize('maxsize', [0, 50])
+def test_arrow_and_object_paths_match(raw, make_pipeline, maxsize):
+    values = pd.Series(['a', None, 'b', 'a', np.nan, 'c', 'b'], dtype=object)
+    ETL.set_value_cache(maxsize)
+    try:
+        for rule in (None, ('test', 'parity')):
+            expected = ETL._map_unique(values, counting_rule([]), rule=rule)
+            result = ETL._map_unique(values.astype('string[pyarrow]'), counting_rule([]), rule=rule)
+            assert result.tolist() == expected.tolist() == ['A', 'null', 'B', 'A', 'null', 'C', 'B']
+
+        text = raw.select_dtypes(object).columns.drop('Customer_ID')
+        arrow = raw.astype({column: 'string[pyarrow]' for column in text})
+        pipeline = make_pipeline().fit(raw)
+        expected, result = pipeline.transform(raw), pipeline.transform(arrow)
+        pd.testing.assert_frame_equal(result.astype(object).where(result.notna()), expected.astype(object).where(expected.notna()))
+    finally:
+        ETL.set_value_cache(0)
+
+
+# Com maxsize valores guardados, o valor usado há mais tempo é removido e volta a ser avaliado quando reaparece.
+def test_cache_evicts_least_recently_used():
+    calls = []
+    ETL.set_value_cache(3)
+    try:
+        rule = ('test', 'lru')
+        for batch in (['a', 'b', 'c'], ['a'], ['d'], ['b', 'a']):
+            ETL._map_unique(pd.Series(batch, dtype=object), counting_rule(calls), rule=rule)
+
+        assert calls == [['a', 'b', 'c'], ['d'], ['b']]
+        assert list(ETL._VALUE_CACHES[rule].entries) == ['d', 'a', 'b']
+        assert ETL.value_cache_info()[rule] == {'hits': 2, 'misses': 5, 'size': 3}
+    finally:
+        ETL.set_value_cache(0)
+
+
+# Apenas os valores distintos ainda não vistos são avaliados: cada valor repetido nas linhas ou nos lotes é um acerto.
+def test_cache_hits_by_distinct_value(value_cache):
+    calls = []
+    rule = ('test', 'hits')
+    batches = [['a', 'a', 'b', None], ['b', 'c', 'c', None], ['a', 'b', 'c']]
+    results = [ETL._map_unique(pd.Series(batch, dtype=object), counting_rule(calls), rule=rule) for batch in batches]
+
+    assert [result.tolist() for result in results] == [['A', 'A', 'B', 'null'], ['B', 'C', 'C', 'null'], ['A', 'B', 'C']]
+    # O nulo não é guardado (apenas valores str) e é avaliado em todos os lotes em que aparece.
+    assert [[value if isinstance(value, str) else None for value in call] for call in calls] == [['a', 'b', None], ['c', None]]
+    assert ETL.value_cache_info()[rule] == {'hits': 4, 'misses': 5, 'size': 3}
+
+    ETL.set_value_cache(50)
+    assert ETL.value_cache_info() == {}
+
+
+def test_cache_info_counts_hits(raw, value_cache):
+    step = ETL.CreateMonthNumberColumn(column_name='Month')
+    step.fit_transform(raw)
+    step.fit_transform(raw)
+
+    info = ETL.value_cache_info()
+    (rule, counts), = info.items()
+    assert rule[0] == 'CreateMonthNumberColumn'
+    assert counts == {'hits': 8, 'misses': 8, 'size': 8}
+
+
+# O cache é compartilhado entre threads (ex.: pool de threads do service.py).
+def test_cache_is_thread_safe(raw, make_pipeline, value_cache):
+    pipeline = make_pipeline().fit(raw)
+    ETL.set_value_cache(0)
+    expected = pipeline.transform(raw)
+    ETL.set_value_cache(20)
+    results, errors = [], []
+
+    def run():
+        try:
+            for _ in range(3):
+                results.append(pipeline.transform(raw))
+        except Exception as error:  # pragma: no cover - falha reportada abaixo
+            errors.append(error)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    for result in results:
+        pd.testing.assert_frame_equal(result, expected)